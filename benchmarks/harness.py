@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+
+
+def git_commit() -> str:
+    """Короткий хеш поточного коміту (або 'unknown' поза git)"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARKS_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def time_call(fn: Callable[[], object], min_time: float = 0.2, repeat: int = 5,
+              setup: Optional[Callable[[], object]] = None) -> Dict:
+    """Час одного виклику fn: кількість викликів у серії підбирається до min_time,
+    повертаються медіана та мінімум серед repeat серій (секунди на виклик)"""
+    if setup is not None:
+        setup()
+    fn()  # прогрів: ліниві ініціалізації не потрапляють у вимірювання
+
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 10 or number >= 1_000_000:
+            break
+        number *= 10
+
+    number = max(1, round(number * min_time / max(elapsed, 1e-9)))
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+
+    return {
+        'median_s': float(np.median(timings)),
+        'min_s': float(np.min(timings)),
+        'number': number,
+        'repeat': repeat
+    }
+
+
+class BenchmarkSuite:
+    """Набір бенчмарків: name -> функція параметрів, що повертає (fn, setup)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cases: List[Dict] = []
+
+    def add(self, name: str, factory: Callable, sweep: Optional[List[Dict]] = None):
+        """Бенчмарк name для кожного набору параметрів sweep (factory(**params) -> fn або (fn, setup))"""
+        for params in sweep or [{}]:
+            self.cases.append({'name': name, 'params': params, 'factory': factory})
+
+    def run(self, pattern: Optional[str] = None, min_time: float = 0.2, repeat: int = 5,
+            verbose: bool = True) -> Dict:
+        results = {}
+        for case in self.cases:
+            key = case_key(case['name'], case['params'])
+            if pattern and pattern not in key:
+                continue
+
+            prepared = case['factory'](**case['params'])
+            fn, setup = prepared if isinstance(prepared, tuple) else (prepared, None)
+            result = time_call(fn, min_time=min_time, repeat=repeat, setup=setup)
+            result['params'] = case['params']
+            results[key] = result
+            if verbose:
+                print(f"{key:<60} {format_seconds(result['median_s']):>12}  (x{result['number']})")
+
+        return {
+            'suite': self.name,
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'results': results
+        }
+
+
+def case_key(name: str, params: Dict) -> str:
+    if not params:
+        return name
+    return name + '[' + ','.join(f"{k}={v}" for k, v in params.items()) + ']'
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (('с', 1.0), ('мс', 1e-3), ('мкс', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} нс"
+
+
+def save_results(report: Dict, results_dir: str = RESULTS_DIR) -> str:
+    """Збереження звіту в results/<suite>-<commit>.json"""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{report['suite']}-{report['commit']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_report(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def update_baseline(report: Dict, path: str = DEFAULT_BASELINE):
+    """Запис результатів набору в базовий файл (інші набори зберігаються)"""
+    baseline = load_report(path) or {}
+    baseline[report['suite']] = report
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+
+
+def compare(report: Dict, baseline_path: str = DEFAULT_BASELINE, threshold: float = 0.2) -> List[Dict]:
+    """Регресії: бенчмарки, медіана яких гірша за базову більш ніж на threshold"""
+    baseline = (load_report(baseline_path) or {}).get(report['suite'])
+    if baseline is None:
+        return []
+
+    regressions = []
+    for key, result in report['results'].items():
+        reference = baseline['results'].get(key)
+        if reference is None:
+            continue
+        ratio = result['median_s'] / max(reference['median_s'], 1e-12)
+        if ratio > 1 + threshold:
+            regressions.append({'benchmark': key, 'baseline_s': reference['median_s'],
+                                'current_s': result['median_s'], 'ratio': ratio})
+    return regressions
+
+
+def report_regressions(regressions: List[Dict], baseline_commit: str = '') -> None:
+    if not regressions:
+        print("Регресій відносно базових результатів не виявлено")
+        return
+    print(f"Регресії відносно базових результатів {baseline_commit}:")
+    for item in regressions:
+        print(f"  {item['benchmark']:<58} {format_seconds(item['baseline_s'])} -> "
+              f"{format_seconds(item['current_s'])} (x{item['ratio']:.2f})")
+
+
+def run_cli(suite: BenchmarkSuite, argv: Optional[List[str]] = None) -> int:
+    """Спільний запуск набору з командного рядка; код 1 - є регресії"""
+    parser = argparse.ArgumentParser(description=f"Бенчмарки: {suite.name}")
+    parser.add_argument('-k', '--filter', help="лише бенчмарки, назва яких містить рядок")
+    parser.add_argument('--min-time', type=float, default=0.2, help="мінімальний час серії, с")
+    parser.add_argument('--repeat', type=int, default=5, help="кількість серій")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="файл базових результатів")
+    parser.add_argument('--threshold', type=float, default=0.2, help="допустиме сповільнення (0.2 = 20%%)")
+    parser.add_argument('--update-baseline', action='store_true', help="записати результати як базові")
+    parser.add_argument('--no-save', action='store_true', help="не зберігати results/<suite>-<commit>.json")
+    args = parser.parse_args(argv)
+
+    report = suite.run(pattern=args.filter, min_time=args.min_time, repeat=args.repeat)
+    if not args.no_save:
+        print(f"Результати: {save_results(report)}")
+
+    if args.update_baseline:
+        update_baseline(report, args.baseline)
+        print(f"Базові результати оновлено: {args.baseline}")
+        return 0
+
+    baseline = (load_report(args.baseline) or {}).get(suite.name)
+    if baseline is None:
+        print("Базових результатів немає - запустіть з --update-baseline")
+        return 0
+    regressions = compare(report, args.baseline, args.threshold)
+    report_regressions(regressions, baseline.get('commit', ''))
+    return 1 if regressions else 0
@@ -0,0 +1,167 @@
+"""Мікробенчмарки радіо- та хендовер-ядер
+
+Запуск з кореня репозиторію:
+    python -m benchmarks.micro                      # усі бенчмарки, порівняння з baseline.json
+    python -m benchmarks.micro -k rsrp              # лише бенчмарки з 'rsrp' у назві
+    python -m benchmarks.micro --update-baseline    # записати поточні результати як базові
+"""
+import sys
+from datetime import datetime, timedelta
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.harness import BenchmarkSuite, run_cli
+from benchmarks.networks import build_engine, grid_cells, random_users
+from core.handover_algorithm import HandoverAlgorithm
+from core.user_equipment import UserEquipment
+from utils import calculations
+
+CELL_SWEEP = [{'cells': n} for n in (6, 50, 200)]
+UE_CELL_SWEEP = [{'ues': u, 'cells': c} for u in (10, 100, 1000) for c in (6, 50, 200)]
+
+suite = BenchmarkSuite('micro')
+
+
+def _engine(cells: int, ues: int = 0, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    cell_configs = grid_cells(cells, spacing_km=8.0 / max(np.sqrt(cells), 1))
+    # UE додаються без пошуку найкращої соти: бенчмарк вимірює ядра, а не ініціалізацію
+    engine = build_engine(cell_configs, seed=seed)
+    serving = next(iter(engine.base_stations.values()))
+    for config in random_users(ues, cell_configs, rng):
+        engine.users[config['id']] = UserEquipment(config['id'], config['lat'], config['lon'],
+                                                   speed_kmh=config['speed'], direction=config['direction'],
+                                                   rng=engine.rng)
+        engine.users[config['id']].serving_bs = serving.bs_id
+    return engine
+
+
+def bench_calculate_rsrp():
+    engine = _engine(6)
+    bs = next(iter(engine.base_stations.values()))
+    return lambda: engine.calculate_rsrp(49.24, 28.49, bs)
+
+
+def bench_calculate_rsrq():
+    engine = _engine(6)
+    return lambda: engine.calculate_rsrq(-85.0)
+
+
+def bench_find_best_base_station(cells: int):
+    engine = _engine(cells)
+    return lambda: engine.find_best_base_station(49.24, 28.49)
+
+
+def bench_check_handover_for_user(cells: int):
+    engine = _engine(cells, ues=1)
+    ue = next(iter(engine.users.values()))
+    serving = ue.serving_bs
+
+    def setup():
+        # Повернення UE до початкової соти, щоб кожна серія вимірювала той самий стан
+        for bs in engine.base_stations.values():
+            bs.connected_users.discard(ue.ue_id)
+        ue.serving_bs = serving
+        engine.base_stations[serving].connected_users.add(ue.ue_id)
+
+    return (lambda: engine.check_handover_for_user(ue)), setup
+
+
+def _handover_measurements(cells: int) -> Dict:
+    """Вимірювання, за яких умова хендовера виконується (обслуговуюча сота найслабша)"""
+    rng = np.random.default_rng(1)
+    measurements = {f"C{k:05d}": {'rsrp': float(rng.uniform(-110, -70)), 'rsrq': -10.0, 'distance': 1.0}
+                    for k in range(cells)}
+    measurements['C00000']['rsrp'] = -120.0
+    return measurements
+
+
+def bench_check_handover_condition(cells: int):
+    # Без ue_id: лише оцінка умови, без таймерів TTT (шлях не залежить від годинника)
+    algorithm = HandoverAlgorithm()
+    measurements = _handover_measurements(cells)
+    return lambda: algorithm.check_handover_condition('C00000', measurements)
+
+
+def bench_check_handover_condition_ttt_wait(cells: int):
+    # Таймер запущено "в майбутньому": кожен виклик потрапляє в гілку відліку TTT
+    algorithm = HandoverAlgorithm()
+    measurements = _handover_measurements(cells)
+    target = max((bs_id for bs_id in measurements if bs_id != 'C00000'), key=lambda bs_id: measurements[bs_id]['rsrp'])
+
+    def setup():
+        algorithm.trigger_timers['UE000001'] = {'start_time': float('inf'), 'target_bs': target, 'trigger_count': 1}
+
+    return (lambda: algorithm.check_handover_condition('C00000', measurements, ue_id='UE000001')), setup
+
+
+def bench_check_handover_condition_ttt_expiry(cells: int):
+    # Спрацювання видаляє таймер, тому кожен виклик починається з простроченого таймера
+    algorithm = HandoverAlgorithm()
+    measurements = _handover_measurements(cells)
+    target = max((bs_id for bs_id in measurements if bs_id != 'C00000'), key=lambda bs_id: measurements[bs_id]['rsrp'])
+    timers = algorithm.trigger_timers
+
+    def run():
+        timers['UE000001'] = {'start_time': 0.0, 'target_bs': target, 'trigger_count': 1}
+        return algorithm.check_handover_condition('C00000', measurements, ue_id='UE000001')
+
+    return run
+
+
+def bench_detect_pingpong(history: int):
+    algorithm = HandoverAlgorithm()
+    now = datetime.now()
+    # Історія без ping-pong у межах вікна: перевіряються всі пари
+    events = [{'timestamp': now - timedelta(milliseconds=10 * k), 'old_bs': f"C{k}", 'new_bs': f"C{k + 1}"}
+              for k in range(history)]
+    events.reverse()
+    return lambda: algorithm.detect_pingpong('UE000001', events, window_seconds=3600)
+
+
+def bench_compute_rsrp_matrix(ues: int, cells: int):
+    engine = _engine(cells, ues)
+    users = list(engine.users.values())
+    return lambda: engine.compute_rsrp_matrix(users)
+
+
+def bench_step_simulation(ues: int, cells: int):
+    engine = _engine(cells, ues)
+    return lambda: engine.step_simulation(1.0)
+
+
+def bench_simulate_handover_success_rate(simulations: int):
+    return lambda: calculations.simulate_handover_success_rate(280, 4, 0, num_simulations=simulations)
+
+
+def bench_optimize_handover_parameters():
+    return lambda: calculations.optimize_handover_parameters()
+
+
+def bench_calculate_path_loss():
+    return lambda: calculations.calculate_path_loss(2.5, 1800)
+
+
+suite.add('rsrp.calculate_rsrp', bench_calculate_rsrp)
+suite.add('rsrp.calculate_rsrq', bench_calculate_rsrq)
+suite.add('rsrp.find_best_base_station', bench_find_best_base_station, CELL_SWEEP)
+suite.add('rsrp.compute_rsrp_matrix', bench_compute_rsrp_matrix, UE_CELL_SWEEP)
+suite.add('handover.check_handover_for_user', bench_check_handover_for_user, CELL_SWEEP)
+suite.add('handover.check_handover_condition', bench_check_handover_condition,
+          [{'cells': n} for n in (6, 50, 200, 1000)])
+suite.add('handover.check_handover_condition_ttt_wait', bench_check_handover_condition_ttt_wait,
+          [{'cells': n} for n in (6, 200)])
+suite.add('handover.check_handover_condition_ttt_expiry', bench_check_handover_condition_ttt_expiry,
+          [{'cells': n} for n in (6, 200)])
+suite.add('handover.detect_pingpong', bench_detect_pingpong, [{'history': n} for n in (10, 100, 1000)])
+suite.add('engine.step_simulation', bench_step_simulation,
+          [{'ues': u, 'cells': c} for u in (10, 100, 1000) for c in (6, 50)])
+suite.add('calculations.calculate_path_loss', bench_calculate_path_loss)
+suite.add('calculations.simulate_handover_success_rate', bench_simulate_handover_success_rate,
+          [{'simulations': n} for n in (100, 1000)])
+suite.add('calculations.optimize_handover_parameters', bench_optimize_handover_parameters)
+
+
+if __name__ == '__main__':
+    sys.exit(run_cli(suite))
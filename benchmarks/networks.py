@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.network_engine import LTENetworkEngine
+
+VINNYTSIA_CENTER = (49.2328, 28.4810)
+KM_PER_DEG_LAT = 111.32
+
+
+def grid_cells(n_cells: int, center: Tuple[float, float] = VINNYTSIA_CENTER, spacing_km: float = 1.0,
+               power: float = 43, frequency: int = 1800, prefix: str = 'C') -> List[Dict]:
+    """Конфігурації n_cells сот на квадратній сітці з кроком spacing_km навколо center"""
+    side = int(np.ceil(np.sqrt(n_cells)))
+    lat0, lon0 = center
+    km_per_deg_lon = KM_PER_DEG_LAT * np.cos(np.radians(lat0))
+    cells = []
+    for k in range(n_cells):
+        row, col = divmod(k, side)
+        cells.append({
+            'id': f"{prefix}{k:05d}",
+            'name': f"Сота {k}",
+            'lat': lat0 + (row - (side - 1) / 2) * spacing_km / KM_PER_DEG_LAT,
+            'lon': lon0 + (col - (side - 1) / 2) * spacing_km / km_per_deg_lon,
+            'power': power,
+            'frequency': frequency
+        })
+    return cells
+
+
+def random_users(n_users: int, cells: List[Dict], rng: np.random.Generator,
+                 speeds_kmh=(5, 20, 60, 90), prefix: str = 'UE') -> List[Dict]:
+    """Конфігурації UE, рівномірно розкиданих у межах області сот"""
+    lats = np.array([c['lat'] for c in cells])
+    lons = np.array([c['lon'] for c in cells])
+    margin = 0.005
+    return [{
+        'id': f"{prefix}{k:06d}",
+        'lat': float(rng.uniform(lats.min() - margin, lats.max() + margin)),
+        'lon': float(rng.uniform(lons.min() - margin, lons.max() + margin)),
+        'speed': float(rng.choice(speeds_kmh)),
+        'direction': float(rng.uniform(0, 360))
+    } for k in range(n_users)]
+
+
+def area_bounds(cells: List[Dict], margin: float = 0.01) -> Tuple[float, float, float, float]:
+    """Межі руху UE (lat_min, lat_max, lon_min, lon_max) навколо області сот"""
+    lats = [c['lat'] for c in cells]
+    lons = [c['lon'] for c in cells]
+    return min(lats) - margin, max(lats) + margin, min(lons) - margin, max(lons) + margin
+
+
+def build_engine(cells: List[Dict], users: Optional[List[Dict]] = None, seed: int = 42,
+                 bounds: Optional[Tuple[float, float, float, float]] = None) -> LTENetworkEngine:
+    """Ініціалізований та запущений LTENetworkEngine із заданими сотами та UE"""
+    engine = LTENetworkEngine(seed=seed)
+    engine.area_bounds = bounds
+    engine.initialize_network(cells)
+    if users:
+        engine.add_users(users)
+    engine.start_simulation()
+    return engine
@@ -0,0 +1,296 @@
+"""Наскрізні еталонні сценарії LTENetworkEngine з бюджетами пропускної здатності та KPI
+
+Кожен сценарій будує мережу, запускає двигун на фіксовану кількість хвилин
+симульованого часу та звітує кроки/с, піковий RSS процесу і KPI (частота
+хендоверів, частка ping-pong, середня RSRP). Сценарії виконуються в окремих
+процесах, щоб піковий RSS відносився лише до одного сценарію.
+
+Запуск з кореня репозиторію:
+    python -m benchmarks.scenarios                      # усі сценарії, порівняння з baseline.json
+    python -m benchmarks.scenarios -k city              # лише сценарії з 'city' у назві
+    python -m benchmarks.scenarios --minutes 1          # скорочений прогін (окремі базові результати)
+    python -m benchmarks.scenarios --update-baseline    # записати поточні результати як базові
+"""
+import argparse
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.harness import DEFAULT_BASELINE, git_commit, load_report, save_results, update_baseline
+from benchmarks.networks import KM_PER_DEG_LAT, VINNYTSIA_CENTER, area_bounds, build_engine, grid_cells, random_users
+
+# Допуски дрейфу KPI відносно базових результатів: ('rel', частка) або ('abs', одиниці KPI)
+KPI_TOLERANCES = {
+    'handover_rate': ('rel', 0.25),
+    'pingpong_rate': ('abs', 5.0),
+    'mean_rsrp_dbm': ('abs', 2.0)
+}
+
+
+def _vinnytsia_6(rng: np.random.Generator):
+    from utils.network import VinnytsiaLTENetwork
+
+    cells = [{'id': bs_id, 'name': bs['name'], 'lat': bs['lat'], 'lon': bs['lon'],
+              'power': bs['power'], 'frequency': bs['frequency']}
+             for bs_id, bs in VinnytsiaLTENetwork().base_stations.items()]
+    return cells, random_users(60, cells, rng), None
+
+
+def _city_100(rng: np.random.Generator):
+    cells = grid_cells(100, spacing_km=0.8)
+    bounds = area_bounds(cells)
+    return cells, random_users(2000, cells, rng), bounds
+
+
+def _region_2000(rng: np.random.Generator):
+    cells = grid_cells(2000, spacing_km=2.0, power=46)
+    bounds = area_bounds(cells)
+    return cells, random_users(4000, cells, rng, speeds_kmh=(5, 20, 60, 90, 110)), bounds
+
+
+def _highway(rng: np.random.Generator):
+    # Траса схід-захід: соти вздовж дороги із зсувом у шаховому порядку,
+    # межі руху - вузький коридор уздовж дороги
+    lat0, lon0 = VINNYTSIA_CENTER
+    km_per_deg_lon = KM_PER_DEG_LAT * np.cos(np.radians(lat0))
+    cells = [{
+        'id': f"H{k:05d}",
+        'name': f"Траса {k}",
+        'lat': lat0 + (0.3 if k % 2 else -0.3) / KM_PER_DEG_LAT,
+        'lon': lon0 + k * 1.5 / km_per_deg_lon,
+        'power': 46,
+        'frequency': 800
+    } for k in range(30)]
+    corridor = 0.1 / KM_PER_DEG_LAT
+    bounds = (lat0 - corridor, lat0 + corridor, cells[0]['lon'], cells[-1]['lon'])
+    users = [{
+        'id': f"UE{k:06d}",
+        'lat': float(lat0 + rng.uniform(-corridor, corridor)),
+        'lon': float(rng.uniform(bounds[2], bounds[3])),
+        'speed': float(rng.uniform(90, 130)),
+        'direction': float(rng.choice((90.0, 270.0)))
+    } for k in range(600)]
+    return cells, users, bounds
+
+
+def _crowd(rng: np.random.Generator):
+    # Масовий захід: тисячі повільних UE на ~300 м навколо стадіону, щільна мережа сот поруч
+    lat0, lon0 = VINNYTSIA_CENTER
+    km_per_deg_lon = KM_PER_DEG_LAT * np.cos(np.radians(lat0))
+    cells = grid_cells(9, spacing_km=0.5, power=40, frequency=2600)
+    for cell in cells:
+        cell['max_users'] = 400  # тимчасово розширена ємність сот на час заходу
+    radius_km = 0.3
+    bounds = (lat0 - radius_km / KM_PER_DEG_LAT, lat0 + radius_km / KM_PER_DEG_LAT,
+              lon0 - radius_km / km_per_deg_lon, lon0 + radius_km / km_per_deg_lon)
+    users = [{
+        'id': f"UE{k:06d}",
+        'lat': float(rng.uniform(bounds[0], bounds[1])),
+        'lon': float(rng.uniform(bounds[2], bounds[3])),
+        'speed': float(rng.choice((0.0, 3.0, 5.0))),
+        'direction': float(rng.uniform(0, 360))
+    } for k in range(3000)]
+    return cells, users, bounds
+
+
+SCENARIOS = {
+    'vinnytsia_6': {'description': "Мережа Вінниці, 6 eNodeB, 60 UE", 'minutes': 30, 'build': _vinnytsia_6,
+                    'handover_controller': True},
+    'city_100': {'description': "Місто, 100 сот, 2 000 UE", 'minutes': 10, 'build': _city_100},
+    'region_2000': {'description': "Область, 2 000 сот, 4 000 UE", 'minutes': 1, 'build': _region_2000},
+    'highway': {'description': "Траса, 30 сот, 600 UE на 90-130 км/год", 'minutes': 10, 'build': _highway},
+    'crowd': {'description': "Масовий захід, 9 сот, 3 000 UE на 300 м", 'minutes': 10, 'build': _crowd}
+}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Піковий RSS поточного процесу в МБ (None, якщо модуль resource недоступний)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux повертає КБ, macOS - байти
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(name: str, minutes: Optional[float] = None, seed: int = 42,
+                 metrics_port: Optional[int] = None, memory_every: Optional[int] = None) -> Dict:
+    """Прогін одного сценарію: пропускна здатність, піковий RSS та KPI"""
+    spec = SCENARIOS[name]
+    minutes = spec['minutes'] if minutes is None else minutes
+    rng = np.random.default_rng(seed)
+
+    started = time.perf_counter()
+    cells, users, bounds = spec['build'](rng)
+    engine = build_engine(cells, users, seed=seed, bounds=bounds)
+    setup_s = time.perf_counter() - started
+    if metrics_port is not None:
+        engine.serve_metrics(port=metrics_port)
+    controller = None
+    if memory_every:
+        engine.enable_memory_tracking(every_n_steps=memory_every)
+        if spec.get('handover_controller') and engine.users:
+            # Контролер хендовера з utils/handover.py (модель мережі Вінниці) супроводжує перший UE,
+            # щоб його measurements_history теж потрапила під відстеження
+            from utils.handover import HandoverController
+            from utils.network import VinnytsiaLTENetwork
+
+            controller = HandoverController(VinnytsiaLTENetwork())
+            engine.handover_controllers.append(controller)
+            followed = next(iter(engine.users.values()))
+
+    steps = max(1, int(round(minutes * 60 / engine.time_step)))
+    step_times = np.empty(steps)
+    rsrp_sum = 0.0
+    active_sum = 0
+    for k in range(steps):
+        step_started = time.perf_counter()
+        result = engine.step_simulation(engine.time_step)
+        step_times[k] = time.perf_counter() - step_started
+        if controller is not None:
+            controller.check_handover_condition(controller.measure_all_cells(followed.latitude, followed.longitude))
+        rsrp_sum += engine.network_metrics['average_rsrp']
+        active_sum += result['active_users']
+
+    total_handovers = engine.network_metrics['total_handovers']
+    mean_active = active_sum / steps
+    simulated_min = steps * engine.time_step / 60
+    result = {
+        'description': spec['description'],
+        'cells': len(engine.base_stations),
+        'ues': len(engine.users),
+        'simulated_min': simulated_min,
+        'steps': steps,
+        'setup_s': setup_s,
+        'steps_per_s': steps / step_times.sum(),
+        'step_p95_s': float(np.percentile(step_times, 95)),
+        'peak_rss_mb': peak_rss_mb(),
+        'handovers': total_handovers,
+        # Хендовери на UE за хвилину симульованого часу
+        'handover_rate': total_handovers / max(mean_active, 1) / simulated_min,
+        'pingpong_rate': engine.network_metrics['pingpong_handovers'] / max(total_handovers, 1) * 100,
+        'mean_rsrp_dbm': rsrp_sum / steps
+    }
+    if memory_every:
+        # Режим пам'яті сповільнює кроки (tracemalloc), тому лише звітує, а не порівнюється
+        memory = engine.get_memory_report()
+        result['memory'] = {
+            'structures': memory['structures'],
+            'top_sites': memory['top_sites'],
+            'alerts': [{key: value for key, value in alert.items() if key != 'timestamp'}
+                       for alert in memory['alerts']]
+        }
+        engine.disable_memory_tracking()
+    engine.stop_metrics()
+    return result
+
+
+def run_scenarios(names: List[str], minutes: Optional[float] = None, isolate: bool = True,
+                  verbose: bool = True, metrics_port: Optional[int] = None,
+                  memory_every: Optional[int] = None) -> Dict:
+    results = {}
+    for name in names:
+        if isolate:
+            # Свіжий процес на кожен сценарій: піковий RSS не накопичується між сценаріями
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                result = pool.submit(run_scenario, name, minutes, metrics_port=metrics_port,
+                                     memory_every=memory_every).result()
+        else:
+            result = run_scenario(name, minutes, metrics_port=metrics_port, memory_every=memory_every)
+        results[name] = result
+        if verbose:
+            rss = f"{result['peak_rss_mb']:.0f} МБ" if result['peak_rss_mb'] is not None else "н/д"
+            print(f"{name:<14} {result['steps_per_s']:>9.2f} кроків/с  RSS {rss:>8}  "
+                  f"HO {result['handover_rate']:.3f}/UE/хв  ping-pong {result['pingpong_rate']:.1f}%  "
+                  f"RSRP {result['mean_rsrp_dbm']:.1f} дБм")
+            for structure, stats in result.get('memory', {}).get('structures', {}).items():
+                print(f"    {structure:<42} {stats['items']:>9} ел.  {stats['bytes'] / 1024:>9.0f} КБ  "
+                      f"{stats.get('growth_bytes_per_1k', 0) / 1024:+.0f} КБ/1000 кроків")
+
+    return {
+        'suite': 'scenarios' if minutes is None else f"scenarios-{minutes:g}min",
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def compare_scenarios(report: Dict, baseline_path: str = DEFAULT_BASELINE, threshold: float = 0.2) -> List[Dict]:
+    """Порушення бюджетів: падіння кроків/с більш ніж на threshold або дрейф KPI понад KPI_TOLERANCES"""
+    baseline = (load_report(baseline_path) or {}).get(report['suite'])
+    if baseline is None:
+        return []
+
+    violations = []
+    for name, result in report['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        if result['steps_per_s'] < reference['steps_per_s'] * (1 - threshold):
+            violations.append({'scenario': name, 'metric': 'steps_per_s',
+                               'baseline': reference['steps_per_s'], 'current': result['steps_per_s']})
+        for metric, (kind, tolerance) in KPI_TOLERANCES.items():
+            drift = abs(result[metric] - reference[metric])
+            allowed = tolerance * abs(reference[metric]) if kind == 'rel' else tolerance
+            if drift > allowed:
+                violations.append({'scenario': name, 'metric': metric,
+                                   'baseline': reference[metric], 'current': result[metric]})
+    return violations
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Запуск сценаріїв з командного рядка; код 1 - порушено бюджет пропускної здатності або KPI"""
+    parser = argparse.ArgumentParser(description="Наскрізні сценарії LTENetworkEngine")
+    parser.add_argument('-k', '--filter', help="лише сценарії, назва яких містить рядок")
+    parser.add_argument('--minutes', type=float, help="симульований час кожного сценарію, хв")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="файл базових результатів")
+    parser.add_argument('--threshold', type=float, default=0.2, help="допустиме падіння кроків/с (0.2 = 20%%)")
+    parser.add_argument('--in-process', action='store_true', help="без окремих процесів (RSS накопичується)")
+    parser.add_argument('--update-baseline', action='store_true', help="записати результати як базові")
+    parser.add_argument('--no-save', action='store_true', help="не зберігати results/<suite>-<commit>.json")
+    parser.add_argument('--metrics-port', type=int, help="ендпоінт Prometheus /metrics на час прогону")
+    parser.add_argument('--memory-every', type=int, help="відстеження пам'яті: знімок кожні N кроків")
+    parser.add_argument('--list', action='store_true', help="показати сценарії та вийти")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, spec in SCENARIOS.items():
+            print(f"{name:<14} {spec['minutes']:>4} хв  {spec['description']}")
+        return 0
+
+    names = [name for name in SCENARIOS if not args.filter or args.filter in name]
+    report = run_scenarios(names, minutes=args.minutes, isolate=not args.in_process,
+                           metrics_port=args.metrics_port, memory_every=args.memory_every)
+    if not args.no_save:
+        print(f"Результати: {save_results(report)}")
+
+    if args.update_baseline:
+        update_baseline(report, args.baseline)
+        print(f"Базові результати оновлено: {args.baseline}")
+        return 0
+
+    baseline = (load_report(args.baseline) or {}).get(report['suite'])
+    if baseline is None:
+        print("Базових результатів немає - запустіть з --update-baseline")
+        return 0
+    violations = compare_scenarios(report, args.baseline, args.threshold)
+    if not violations:
+        print("Бюджети пропускної здатності та KPI дотримано")
+        return 0
+    print(f"Порушення відносно базових результатів {baseline.get('commit', '')}:")
+    for item in violations:
+        print(f"  {item['scenario']:<14} {item['metric']:<14} {item['baseline']:.3f} -> {item['current']:.3f}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
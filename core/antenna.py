@@ -0,0 +1,86 @@
+import numpy as np
+import os
+from typing import Optional
+
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    """Векторизований початковий азимут з точки 1 на точку 2 (0-360°, підтримує broadcasting)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    d_lon = lon2 - lon1
+    x = np.sin(d_lon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lon)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+
+class AntennaPattern:
+    """Горизонтальна діаграма спрямованості секторної антени з кроком 1°
+
+    Таблиця містить відносне посилення (дБ, 0 на осі сектора) для кутів
+    0..359° від азимута сектора, тому посилення для будь-якої кількості
+    пар UE x сектор - одна операція np.take.
+    """
+
+    def __init__(self, gains_db: np.ndarray, name: str = "custom"):
+        gains_db = np.asarray(gains_db, dtype=np.float64)
+        if gains_db.shape != (360,):
+            raise ValueError("Діаграма повинна містити 360 значень (крок 1°)")
+        self.gains_db = gains_db - gains_db.max()
+        self.name = name
+
+    @classmethod
+    def parabolic(cls, beamwidth_deg: float = 65.0, max_attenuation_db: float = 20.0) -> 'AntennaPattern':
+        """Параболічна модель 3GPP: A(θ) = -min(12 * (θ / θ3dB)^2, Am)"""
+        angles = np.arange(360)
+        angles = np.where(angles > 180, angles - 360, angles)
+        gains = -np.minimum(12 * (angles / beamwidth_deg) ** 2, max_attenuation_db)
+        return cls(gains, name=f"3gpp_{beamwidth_deg:g}")
+
+    @classmethod
+    def from_file(cls, path: str, name: Optional[str] = None) -> 'AntennaPattern':
+        """Завантаження діаграми з файлу MSI/Planet (.msi, .pln) або CSV (кут, посилення дБ)
+
+        У файлах MSI горизонтальна секція задає послаблення (додатні дБ),
+        у CSV - посилення; проміжні кути інтерполюються до кроку 1°.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.msi', '.pln', '.txt'):
+            angles, gains = cls._read_msi(path)
+        else:
+            data = np.loadtxt(path, delimiter=',', comments='#', ndmin=2)
+            angles, gains = data[:, 0], data[:, 1]
+
+        if len(angles) == 0:
+            raise ValueError(f"Файл діаграми не містить даних: {path}")
+
+        order = np.argsort(angles % 360)
+        table = np.interp(np.arange(360), (angles % 360)[order], gains[order], period=360)
+        return cls(table, name=name or os.path.splitext(os.path.basename(path))[0])
+
+    @staticmethod
+    def _read_msi(path: str):
+        """Горизонтальна секція файлу MSI: рядки 'кут послаблення' після 'HORIZONTAL N'"""
+        angles, gains = [], []
+        with open(path, encoding='utf-8', errors='ignore') as f:
+            in_horizontal = False
+            remaining = 0
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                keyword = parts[0].upper()
+                if keyword == 'HORIZONTAL':
+                    in_horizontal = True
+                    remaining = int(parts[1]) if len(parts) > 1 else 360
+                    continue
+                if in_horizontal and remaining > 0:
+                    angles.append(float(parts[0]))
+                    gains.append(-float(parts[1]))
+                    remaining -= 1
+                    if remaining == 0:
+                        break
+        return np.array(angles), np.array(gains)
+
+    def gain(self, relative_angle_deg) -> np.ndarray:
+        """Відносне посилення для кутів від осі сектора (довільна форма масиву)"""
+        index = np.rint(relative_angle_deg).astype(np.int64) % 360
+        return self.gains_db.take(index)
@@ -1,6 +1,6 @@
 import numpy as np
 from datetime import datetime
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 import uuid
 
 class BaseStation:
@@ -8,7 +8,13 @@ class BaseStation:
     
     def __init__(self, bs_id: str, name: str, latitude: float, longitude: float,
                  power_dbm: float = 43, frequency_mhz: float = 1800,
-                 operator: str = "Unknown", max_users: int = 100):
+                 operator: str = "Unknown", max_users: int = 100,
+                 bandwidth_mhz: float = 20, site_id: Optional[str] = None,
+                 sector_azimuth: Optional[float] = None,
+                 antenna_pattern: Optional[str] = None,
+                 antenna_gain_db: float = 15):
+        from .scheduler import prbs_for_bandwidth
+        
         self.bs_id = bs_id
         self.name = name
         self.latitude = latitude
@@ -17,12 +23,20 @@ class BaseStation:
         self.frequency_mhz = frequency_mhz
         self.operator = operator
         self.max_users = max_users
+        self.bandwidth_mhz = bandwidth_mhz
+        self.total_prbs = prbs_for_bandwidth(bandwidth_mhz)
+        
+        # Секторизація: сектор - окрема сота на спільному сайті
+        self.site_id = site_id or bs_id
+        self.sector_azimuth = sector_azimuth  # None - всеспрямована антена
+        self.antenna_pattern = antenna_pattern  # назва діаграми в LTENetworkEngine.antenna_patterns
         
         # Поточний стан
         self.connected_users: Set[str] = set()
         self.load_percentage = 0.0
         self.throughput_mbps = 0.0
         self.interference_level = 0.0
+        self.used_prbs = 0.0  # PRB, розподілені планувальником на останньому кроці
         
         # Статистика
         self.total_handovers_in = 0
@@ -31,8 +45,8 @@ class BaseStation:
         self.creation_time = datetime.now()
         
         # Технічні параметри
-        self.azimuth_angles = [0, 120, 240]  # 3 сектори
-        self.antenna_gain_db = 15
+        self.azimuth_angles = [sector_azimuth] if sector_azimuth is not None else [0, 120, 240]  # 3 сектори
+        self.antenna_gain_db = antenna_gain_db
         self.range_km = self._calculate_range()
         
         # Метрики якості
@@ -175,6 +189,7 @@ class BaseStation:
         self.load_percentage = 0.0
         self.throughput_mbps = 0.0
         self.interference_level = 0.0
+        self.used_prbs = 0.0
         self.total_handovers_in = 0
         self.total_handovers_out = 0
         self.creation_time = datetime.now()
@@ -184,15 +199,20 @@ class BaseStation:
         return {
             'bs_id': self.bs_id,
             'name': self.name,
+            'site_id': self.site_id,
+            'sector_azimuth': self.sector_azimuth,
             'latitude': self.latitude,
             'longitude': self.longitude,
             'power_dbm': self.power_dbm,
             'frequency_mhz': self.frequency_mhz,
+            'bandwidth_mhz': self.bandwidth_mhz,
             'operator': self.operator,
             'connected_users': len(self.connected_users),
             'max_users': self.max_users,
             'load_percentage': self.load_percentage,
             'throughput_mbps': self.throughput_mbps,
+            'used_prbs': self.used_prbs,
+            'total_prbs': self.total_prbs,
             'interference_level': self.interference_level,
             'average_rsrp': self.average_rsrp,
             'average_rsrq': self.average_rsrq,
@@ -0,0 +1,211 @@
+import threading
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+def _event_time(event: Dict) -> float:
+    timestamp = event['timestamp']
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class _Rollup:
+    """Агрегати хендоверів за інтервал: загалом, за результатом та за парою сот"""
+
+    __slots__ = ('start', 'count', 'successful', 'improvement_sum', 'outcomes', 'pairs')
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = start
+        self.count = 0
+        self.successful = 0
+        self.improvement_sum = 0.0
+        self.outcomes = Counter()
+        self.pairs: Dict[Tuple[str, str], List] = {}  # (old_bs, new_bs) -> [count, successful, improvement_sum]
+
+    def add(self, event: Dict):
+        success = bool(event['success'])
+        improvement = float(event['improvement'])
+        self.count += 1
+        self.successful += success
+        self.improvement_sum += improvement
+        self.outcomes[event.get('type', 'successful' if success else 'failed')] += 1
+
+        pair = self.pairs.get((event['old_bs'], event['new_bs']))
+        if pair is None:
+            self.pairs[(event['old_bs'], event['new_bs'])] = [1, int(success), improvement]
+        else:
+            pair[0] += 1
+            pair[1] += success
+            pair[2] += improvement
+
+    def merge(self, other: '_Rollup'):
+        self.count += other.count
+        self.successful += other.successful
+        self.improvement_sum += other.improvement_sum
+        self.outcomes.update(other.outcomes)
+        for key, (count, successful, improvement_sum) in other.pairs.items():
+            pair = self.pairs.get(key)
+            if pair is None:
+                self.pairs[key] = [count, successful, improvement_sum]
+            else:
+                pair[0] += count
+                pair[1] += successful
+                pair[2] += improvement_sum
+
+    def to_dict(self) -> Dict:
+        bs_out = Counter()
+        bs_in = Counter()
+        for (old_bs, new_bs), (count, _, _) in self.pairs.items():
+            bs_out[old_bs] += count
+            bs_in[new_bs] += count
+
+        return {
+            'total': self.count,
+            'successful': self.successful,
+            'failed': self.count - self.successful,
+            'success_rate': self.successful / self.count * 100 if self.count else 0.0,
+            'avg_improvement': self.improvement_sum / self.count if self.count else 0.0,
+            'by_outcome': dict(self.outcomes),
+            'by_pair': {key: {'count': count, 'successful': successful,
+                              'avg_improvement': improvement_sum / count}
+                        for key, (count, successful, improvement_sum) in self.pairs.items()},
+            'bs_out': dict(bs_out),
+            'bs_in': dict(bs_in)
+        }
+
+
+class HandoverEventStore:
+    """Журнал подій хендовера з поступово оновлюваними хвилинними агрегатами
+
+    Кожна подія одразу додається до агрегату свого інтервалу bucket_s
+    (кількість, успішні, покращення RSRP, результати, пари сот) та до
+    загального підсумку. Запит за вікном [since, now] знаходить перший
+    інтервал бінарним пошуком і сумує лише інтервали вікна; неповний
+    перший інтервал дораховується з подій, теж знайдених бінарним пошуком.
+    Поля подій також зберігаються стовпцями, тому to_frame() будує
+    DataFrame вікна без перетворення списку словників.
+    Усі методи потокобезпечні (запис - у потоці симуляції, читання - зі сторінок).
+    """
+
+    COLUMNS = ('timestamp', 'user_id', 'old_bs', 'new_bs', 'old_rsrp', 'new_rsrp',
+               'improvement', 'success', 'type')
+
+    def __init__(self, bucket_s: int = 60):
+        if bucket_s <= 0:
+            raise ValueError("Тривалість інтервалу агрегації має бути додатною")
+        self.bucket_s = bucket_s
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.events: List[Dict] = []
+            self.times: List[float] = []          # час подій, відсортований
+            self.bucket_starts: List[float] = []  # початки інтервалів, відсортовані
+            self.bucket_first: List[int] = []     # індекс першої події інтервалу
+            self._buckets: List[_Rollup] = []
+            self._totals = _Rollup()
+            self.columns: Dict[str, List] = {name: [] for name in self.COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def append(self, event: Dict):
+        """Додавання події та оновлення агрегатів за O(1)"""
+        t = _event_time(event)
+        with self._lock:
+            if self.times and t < self.times[-1]:
+                t = self.times[-1]  # годинник пішов назад - зберігаємо впорядкованість
+            start = t - t % self.bucket_s
+            if not self.bucket_starts or start > self.bucket_starts[-1]:
+                self.bucket_starts.append(start)
+                self.bucket_first.append(len(self.events))
+                self._buckets.append(_Rollup(start))
+
+            self.events.append(event)
+            self.times.append(t)
+            for name, values in self.columns.items():
+                values.append(event.get(name))
+            self._buckets[-1].add(event)
+            self._totals.add(event)
+
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+
+    def _window_locked(self, since: Optional[float]) -> List[_Rollup]:
+        """Агрегати інтервалів вікна; неповний перший інтервал рахується з подій"""
+        if since is None:
+            return list(self._buckets)
+
+        i = bisect_left(self.bucket_starts, since - since % self.bucket_s)
+        if i == len(self._buckets):
+            return []
+        if self.bucket_starts[i] >= since:
+            return self._buckets[i:]
+
+        # Перший інтервал захоплено частково
+        partial = _Rollup(self.bucket_starts[i])
+        end = self.bucket_first[i + 1] if i + 1 < len(self.bucket_first) else len(self.events)
+        for event in self.events[bisect_left(self.times, since, lo=self.bucket_first[i], hi=end):end]:
+            partial.add(event)
+        return [partial] + self._buckets[i + 1:]
+
+    def summary(self, since: Optional[datetime] = None) -> Dict:
+        """Підсумок за вікно від since (None - за весь час)"""
+        with self._lock:
+            if since is None:
+                return self._totals.to_dict()
+            rollup = _Rollup()
+            for bucket in self._window_locked(since.timestamp()):
+                rollup.merge(bucket)
+        return rollup.to_dict()
+
+    def series(self, since: Optional[datetime] = None, resolution_s: int = 3600) -> List[Dict]:
+        """Часовий ряд агрегатів з кроком resolution_s (кратним bucket_s)"""
+        resolution_s = max(resolution_s, self.bucket_s)
+        with self._lock:
+            buckets = self._window_locked(since.timestamp() if since is not None else None)
+            rows: List[_Rollup] = []
+            for bucket in buckets:
+                start = bucket.start - bucket.start % resolution_s
+                if not rows or rows[-1].start != start:
+                    rows.append(_Rollup(start))
+                rows[-1].merge(bucket)
+
+        return [{
+            'time': datetime.fromtimestamp(row.start),
+            'total': row.count,
+            'successful': row.successful,
+            'avg_improvement': row.improvement_sum / row.count if row.count else 0.0
+        } for row in rows]
+
+    def index_since(self, since: Optional[datetime] = None) -> int:
+        """Індекс першої події вікна (разом з len() однозначно визначає вікно)"""
+        if since is None:
+            return 0
+        with self._lock:
+            return bisect_left(self.times, since.timestamp())
+
+    def recent(self, n: int) -> List[Dict]:
+        """Останні n подій (O(n), незалежно від розміру журналу)"""
+        with self._lock:
+            return self.events[-n:] if n > 0 else []
+
+    def events_since(self, since: Optional[datetime] = None) -> List[Dict]:
+        """Сирі події вікна (зріз за бінарним пошуком, без перебору історії)"""
+        with self._lock:
+            if since is None:
+                return list(self.events)
+            return self.events[bisect_left(self.times, since.timestamp()):]
+
+    def to_frame(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        """Події вікна як DataFrame зі стовпцевого сховища"""
+        with self._lock:
+            start = 0 if since is None else bisect_left(self.times, since.timestamp())
+            return pd.DataFrame({name: values[start:] for name, values in self.columns.items()})
@@ -0,0 +1,162 @@
+import numpy as np
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+METERS_PER_DEG_LAT = 111111.0
+
+
+class ShadowFadingMap:
+    """Просторово корельоване затінення (модель Гудмундсона) з одного спільного поля
+
+    Поле генерується один раз для заданого seed як періодичне (кругова
+    згортка FFT без доповнення), тому координати за межами періоду
+    загортаються без розривів і без прив'язки до краю. Кожен сайт (позиція
+    BS) читає спільне поле зі своїм детермінованим зсувом: соти одного
+    сайту мають однакове затінення, різні сайти - практично незалежне, а
+    пам'ять не залежить від кількості сот. Той самий UE у тій самій точці
+    завжди бачить те саме затінення.
+    """
+
+    def __init__(self, sigma_db: float = 4.0, decorrelation_m: float = 50.0,
+                 resolution_m: float = 20.0, extent_m: float = 3000.0,
+                 seed: Optional[int] = None):
+        self.sigma_db = sigma_db
+        self.decorrelation_m = decorrelation_m  # відстань, на якій кореляція падає до 1/e
+        self.resolution_m = resolution_m
+        self.extent_m = extent_m  # півперіод спільного поля
+        self.seed = seed
+
+        self._cells: Dict[str, Tuple[float, float]] = {}
+        self._offsets: Dict[str, Tuple[float, float]] = {}  # сайт -> зсув у спільному полі (вузли сітки)
+        self._field: Optional[np.ndarray] = None
+        self._size = 2 * int(np.ceil(extent_m / resolution_m))
+
+    @staticmethod
+    def site_key(latitude: float, longitude: float) -> str:
+        """Ключ сайту: соти з однаковою позицією (з точністю ~1 м) ділять затінення"""
+        return f"{latitude:.5f},{longitude:.5f}"
+
+    def register_cell(self, cell_id: str, latitude: float, longitude: float):
+        """Реєстрація соти (зсув сайту призначається при першій появі сайту)"""
+        self._cells[cell_id] = (latitude, longitude)
+        site = self.site_key(latitude, longitude)
+        if site not in self._offsets:
+            offset = self._rng(site).uniform(0, self._size, 2)
+            self._offsets[site] = (float(offset[0]), float(offset[1]))
+
+    def _rng(self, key: Optional[str] = None) -> np.random.Generator:
+        """Детермінований генератор: однаковий seed -> однакове поле та зсуви сайтів"""
+        if self.seed is None:
+            return np.random.default_rng()
+        if key is None:
+            return np.random.default_rng(self.seed)
+        return np.random.default_rng([self.seed, zlib.crc32(key.encode())])
+
+    def _generate_field(self) -> np.ndarray:
+        """Періодичне поле з експоненційною автокореляцією exp(-d/d_corr) через FFT"""
+        noise = self._rng().standard_normal((self._size, self._size))
+
+        # Спектральна густина 2D експоненційної кореляції: (1 + (2*pi*k*d)^2)^(-3/2)
+        k = np.fft.fftfreq(self._size, d=self.resolution_m)
+        k2 = k[:, None] ** 2 + k[None, :] ** 2
+        spectrum = (1 + (2 * np.pi * self.decorrelation_m) ** 2 * k2) ** -1.5
+
+        field = np.fft.ifft2(np.fft.fft2(noise) * np.sqrt(spectrum)).real
+        field = (field - field.mean()) / (field.std() + 1e-12) * self.sigma_db
+        return field.astype(np.float32)
+
+    def field(self) -> np.ndarray:
+        if self._field is None:
+            self._field = self._generate_field()
+        return self._field
+
+    def lookup(self, cell_id: str, latitudes, longitudes):
+        """Затінення (дБ) для позицій UE - білінійна інтерполяція по спільному полю"""
+        if self.sigma_db <= 0 or cell_id not in self._cells:
+            return np.zeros(np.shape(latitudes)) if np.ndim(latitudes) else 0.0
+
+        field = self.field()
+        cell_lat, cell_lon = self._cells[cell_id]
+        offset_x, offset_y = self._offsets[self.site_key(cell_lat, cell_lon)]
+
+        y = (np.asarray(latitudes) - cell_lat) * METERS_PER_DEG_LAT
+        x = (np.asarray(longitudes) - cell_lon) * METERS_PER_DEG_LAT * np.cos(np.radians(cell_lat))
+
+        # Поле періодичне: позиції за межами періоду загортаються
+        size = self._size
+        gx = np.mod(x / self.resolution_m + offset_x, size)
+        gy = np.mod(y / self.resolution_m + offset_y, size)
+        x0 = np.floor(gx).astype(np.int64) % size
+        y0 = np.floor(gy).astype(np.int64) % size
+        fx = gx - np.floor(gx)
+        fy = gy - np.floor(gy)
+        x1 = (x0 + 1) % size
+        y1 = (y0 + 1) % size
+
+        value = (field[y0, x0] * (1 - fx) * (1 - fy) + field[y0, x1] * fx * (1 - fy) +
+                 field[y1, x0] * (1 - fx) * fy + field[y1, x1] * fx * fy)
+        return float(value) if np.ndim(value) == 0 else value
+
+    def memory_bytes(self) -> int:
+        return self._field.nbytes if self._field is not None else 0
+
+
+class FastFadingProcess:
+    """Часово корельований швидкий фединг для всіх пар UE x сота (процес Гауса-Маркова)
+
+    Коефіцієнт кореляції між кроками rho = exp(-v*dt/d_coh) залежить від
+    пройденої UE відстані, а весь стан оновлюється одним векторним кроком.
+    """
+
+    def __init__(self, sigma_db: float = 2.0, coherence_m: float = 5.0, rng=None):
+        from .random_pool import get_default_pool
+        
+        self.sigma_db = sigma_db
+        self.coherence_m = coherence_m
+        self.rng = rng if rng is not None else get_default_pool()
+
+        self.ue_ids: List[str] = []
+        self.cell_ids: List[str] = []
+        self._ue_index: Dict[str, int] = {}
+        self._cell_index: Dict[str, int] = {}
+        self.state = np.zeros((0, 0))
+
+    def _sync(self, ue_ids: List[str], cell_ids: List[str]):
+        """Узгодження рядків/стовпців стану з поточними UE та сотами"""
+        if ue_ids == self.ue_ids and cell_ids == self.cell_ids:
+            return
+
+        # Нові пари стартують зі стаціонарного розподілу
+        new_state = self.rng.normals((len(ue_ids), len(cell_ids)), scale=self.sigma_db)
+        rows = [(i, self._ue_index[u]) for i, u in enumerate(ue_ids) if u in self._ue_index]
+        cols = [(j, self._cell_index[c]) for j, c in enumerate(cell_ids) if c in self._cell_index]
+        if rows and cols:
+            new_rows, old_rows = map(np.array, zip(*rows))
+            new_cols, old_cols = map(np.array, zip(*cols))
+            new_state[np.ix_(new_rows, new_cols)] = self.state[np.ix_(old_rows, old_cols)]
+
+        self.ue_ids = list(ue_ids)
+        self.cell_ids = list(cell_ids)
+        self._ue_index = {u: i for i, u in enumerate(self.ue_ids)}
+        self._cell_index = {c: j for j, c in enumerate(self.cell_ids)}
+        self.state = new_state
+
+    def advance(self, delta_time: float, ue_ids: List[str], speeds_kmh: np.ndarray,
+                cell_ids: List[str]) -> np.ndarray:
+        """Один крок процесу для всієї матриці UE x сота"""
+        self._sync(ue_ids, cell_ids)
+        if self.state.size == 0:
+            return self.state
+
+        distance_m = np.asarray(speeds_kmh, dtype=np.float64) / 3.6 * delta_time
+        rho = np.exp(-distance_m / self.coherence_m)[:, None]
+        innovation = self.rng.normals(self.state.shape)
+        self.state = rho * self.state + np.sqrt(1 - rho ** 2) * self.sigma_db * innovation
+        return self.state
+
+    def value(self, ue_id: str, cell_id: str) -> float:
+        i = self._ue_index.get(ue_id)
+        j = self._cell_index.get(cell_id)
+        if i is None or j is None:
+            return 0.0
+        return float(self.state[i, j])
@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix
+
+# Поля агрегату пари (джерело, ціль)
+MATRIX_FIELDS = ('count', 'successful', 'pingpong', 'improvement_sum')
+
+
+class HandoverMatrix:
+    """Розріджена матриця хендоверів сота -> сота, що оновлюється онлайн
+
+    Для кожної пари (source, target) зберігаються кількість хендоверів,
+    успішні, ping-pong та сума покращень RSRP; запис події - O(1)
+    (словник по парі індексів сот). Експорт у scipy.sparse або DataFrame
+    будується лише з ненульових пар, тому аналіз сусідства та балансу
+    не залежить від квадрату кількості сот.
+    """
+
+    def __init__(self, cell_ids: Optional[List[str]] = None):
+        self.cell_index: Dict[str, int] = {}
+        self.cell_ids: List[str] = []
+        self.pairs: Dict[tuple, List] = {}  # (i, j) -> [count, successful, pingpong, improvement_sum]
+        for cell_id in cell_ids or []:
+            self.register_cell(cell_id)
+
+    def register_cell(self, cell_id: str) -> int:
+        index = self.cell_index.get(cell_id)
+        if index is None:
+            index = len(self.cell_ids)
+            self.cell_index[cell_id] = index
+            self.cell_ids.append(cell_id)
+        return index
+
+    @property
+    def shape(self):
+        return len(self.cell_ids), len(self.cell_ids)
+
+    def record(self, source: str, target: str, successful: bool, pingpong: bool, improvement: float):
+        """Облік однієї події хендовера"""
+        key = (self.register_cell(source), self.register_cell(target))
+        pair = self.pairs.get(key)
+        if pair is None:
+            self.pairs[key] = [1, int(successful), int(pingpong), float(improvement)]
+        else:
+            pair[0] += 1
+            pair[1] += successful
+            pair[2] += pingpong
+            pair[3] += improvement
+
+    def clear(self):
+        """Скидання лічильників (індекс сот зберігається)"""
+        self.pairs.clear()
+
+    def _arrays(self):
+        if not self.pairs:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros((0, len(MATRIX_FIELDS)))
+        keys = np.array(list(self.pairs.keys()), dtype=np.int64)
+        values = np.array(list(self.pairs.values()), dtype=np.float64)
+        return keys[:, 0], keys[:, 1], values
+
+    def to_sparse(self, field: str = 'count') -> csr_matrix:
+        """Матриця source x target для поля count/successful/pingpong/improvement_sum
+        або mean_improvement (середнє покращення лише для ненульових пар)"""
+        rows, cols, values = self._arrays()
+        if field == 'mean_improvement':
+            data = values[:, 3] / np.maximum(values[:, 0], 1)
+        elif field in MATRIX_FIELDS:
+            data = values[:, MATRIX_FIELDS.index(field)]
+        else:
+            raise ValueError(f"Невідоме поле матриці хендоверів: {field}")
+        return coo_matrix((data, (rows, cols)), shape=self.shape).tocsr()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Ненульові пари у вигляді таблиці (source, target, лічильники, середнє покращення)"""
+        rows, cols, values = self._arrays()
+        ids = np.asarray(self.cell_ids, dtype=object)
+        count = values[:, 0]
+        return pd.DataFrame({
+            'source': ids[rows] if len(rows) else [],
+            'target': ids[cols] if len(cols) else [],
+            'count': count.astype(np.int64),
+            'successful': values[:, 1].astype(np.int64),
+            'pingpong': values[:, 2].astype(np.int64),
+            'mean_improvement': values[:, 3] / np.maximum(count, 1)
+        })
+
+    def cell_balance(self) -> pd.DataFrame:
+        """Вихідні/вхідні хендовери та баланс по сотах (суми рядків і стовпців)"""
+        counts = self.to_sparse('count')
+        outgoing = np.asarray(counts.sum(axis=1)).ravel().astype(np.int64)
+        incoming = np.asarray(counts.sum(axis=0)).ravel().astype(np.int64)
+        return pd.DataFrame({'outgoing': outgoing, 'incoming': incoming, 'balance': incoming - outgoing},
+                            index=pd.Index(self.cell_ids, name='cell_id'))
+
+    def neighbours(self, cell_id: str, top: int = 10) -> pd.DataFrame:
+        """Найчастіші цілі хендоверів із соти cell_id"""
+        frame = self.to_frame()
+        return frame[frame['source'] == cell_id].nlargest(top, 'count')
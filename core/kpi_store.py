@@ -0,0 +1,211 @@
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Рівні агрегації за замовчуванням: (крок, с; кількість інтервалів) - 1 доба по 10 с,
+# 1 тиждень по 1 хв, 100 діб по 15 хв
+DEFAULT_LEVELS = ((10, 8640), (60, 10080), (900, 9600))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Індекси точок за Largest-Triangle-Three-Buckets (перша й остання зберігаються)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Внутрішні точки 1..n-2 ділимо на n_out-2 інтервалів
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+class _Level:
+    """Один рівень агрегації ряду: закриті інтервали (min/mean/max) та поточний"""
+
+    __slots__ = ('resolution', 'closed', 'open')
+
+    def __init__(self, resolution: float, capacity: int):
+        self.resolution = resolution
+        self.closed = deque(maxlen=capacity)  # (start, min, mean, max)
+        self.open = None  # [start, min, max, sum, n]
+
+    def add(self, t: float, value: float):
+        start = t - t % self.resolution
+        bucket = self.open
+        if bucket is not None and bucket[0] == start:
+            if value < bucket[1]:
+                bucket[1] = value
+            if value > bucket[2]:
+                bucket[2] = value
+            bucket[3] += value
+            bucket[4] += 1
+            return
+        if bucket is not None:
+            self.closed.append((bucket[0], bucket[1], bucket[3] / bucket[4], bucket[2]))
+        self.open = [start, value, value, value, 1]
+
+    def points(self) -> List[Tuple]:
+        points = list(self.closed)
+        if self.open is not None:
+            start, low, high, total, n = self.open
+            points.append((start, low, total / n, high))
+        return points
+
+    @property
+    def oldest(self) -> Optional[float]:
+        if self.closed:
+            return self.closed[0][0]
+        return self.open[0] if self.open is not None else None
+
+
+class _Series:
+    __slots__ = ('raw', 'levels', 'first_time')
+
+    def __init__(self, raw_capacity: int, levels: Sequence[Tuple[float, int]]):
+        self.raw = deque(maxlen=raw_capacity)  # (t, value)
+        self.levels = [_Level(resolution, capacity) for resolution, capacity in levels]
+        self.first_time: Optional[float] = None
+
+
+class KPITimeSeriesStore:
+    """Багаторівневе сховище часових рядів KPI для довгих прогонів
+
+    Останні raw_capacity значень кожного ряду зберігаються як є, а також
+    агрегуються в інтервали 10 с, 1 хв та 15 хв (min/mean/max) з обмеженою
+    кількістю інтервалів, тому пам'ять не росте з тривалістю прогону. Запит
+    бере найдетальніший рівень, що покриває період, і проріджує результат
+    LTTB до max_points, тож графіки за кілька діб будуються миттєво.
+    """
+
+    def __init__(self, raw_capacity: int = 3600, levels: Sequence[Tuple[float, int]] = DEFAULT_LEVELS):
+        self.raw_capacity = raw_capacity
+        self.levels = tuple(sorted(levels))
+        self._lock = threading.Lock()
+        self._series: Dict[str, _Series] = {}
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return sorted(self._series)
+
+    def record(self, t: float, values: Dict[str, float]):
+        """Запис значень кількох рядів на момент t (секунди)"""
+        with self._lock:
+            for key, value in values.items():
+                if value is None:
+                    continue
+                value = float(value)
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _Series(self.raw_capacity, self.levels)
+                    series.first_time = t
+                series.raw.append((t, value))
+                for level in series.levels:
+                    level.add(t, value)
+
+    def query(self, key: str, start: Optional[float] = None, end: Optional[float] = None,
+              max_points: int = 500) -> Dict[str, np.ndarray]:
+        """Ряд за період [start, end]: t, mean, min, max та використаний крок (0 - сирі дані)"""
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                empty = np.zeros(0)
+                return {'t': empty, 'mean': empty, 'min': empty, 'max': empty, 'resolution': 0}
+
+            since = series.first_time if start is None else max(start, series.first_time)
+            if series.raw and series.raw[0][0] <= since:
+                points = [(t, value, value, value) for t, value in series.raw]
+                resolution = 0
+            else:
+                # Найдетальніший рівень, що покриває період, інакше найгрубший
+                level = next((level for level in series.levels
+                              if level.oldest is not None and level.oldest <= since), series.levels[-1])
+                points = [(t, mean, low, high) for t, low, mean, high in level.points()]
+                resolution = level.resolution
+
+        data = np.array(points, dtype=np.float64).reshape(-1, 4)
+        mask = np.ones(len(data), dtype=bool)
+        if start is not None:
+            mask &= data[:, 0] >= start - resolution
+        if end is not None:
+            mask &= data[:, 0] <= end
+        data = data[mask]
+
+        if len(data) > max_points:
+            data = data[lttb_indices(data[:, 0], data[:, 1], max_points)]
+
+        return {'t': data[:, 0], 'mean': data[:, 1], 'min': data[:, 2], 'max': data[:, 3],
+                'resolution': resolution}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class EngineKPIRecorder:
+    """Запис KPI мережі, сот та вибраних UE у KPITimeSeriesStore після кожного кроку
+
+    Підписується на подію 'step' LTENetworkEngine. Час запису - час
+    симуляції, або clock() (напр. time.time для дашборду).
+    """
+
+    def __init__(self, engine, store: KPITimeSeriesStore, ue_ids: Optional[Iterable[str]] = None,
+                 clock: Optional[Callable[[], float]] = None, record_cells: bool = True):
+        self.engine = engine
+        self.store = store
+        self.ue_ids = set(ue_ids or [])
+        self.clock = clock
+        self.record_cells = record_cells
+        engine.add_listener(self.on_event)
+
+    def detach(self):
+        self.engine.remove_listener(self.on_event)
+
+    def track_ue(self, ue_id: str):
+        self.ue_ids.add(ue_id)
+
+    def untrack_ue(self, ue_id: str):
+        self.ue_ids.discard(ue_id)
+
+    def set_tracked_ues(self, ue_ids: Iterable[str]):
+        self.ue_ids = set(ue_ids)
+
+    def on_event(self, topic: str, payload: Dict):
+        if topic != 'step':
+            return
+
+        t = self.clock() if self.clock is not None else payload['simulation_time']
+        values = {
+            'network.active_users': payload['active_users'],
+            'network.average_rsrp': payload['average_rsrp'],
+            'network.throughput': payload['network_throughput'],
+            'network.handovers': payload['handovers']
+        }
+
+        if self.record_cells:
+            for bs_id, bs in self.engine.base_stations.items():
+                values[f'cell.{bs_id}.users'] = len(bs.connected_users)
+                values[f'cell.{bs_id}.load'] = bs.load_percentage
+                values[f'cell.{bs_id}.throughput'] = bs.throughput_mbps
+
+        for ue_id in self.ue_ids:
+            ue = self.engine.users.get(ue_id)
+            if ue is not None and ue.active:
+                values[f'ue.{ue_id}.rsrp'] = ue.rsrp
+                values[f'ue.{ue_id}.throughput'] = ue.throughput
+
+        self.store.record(t, values)
@@ -0,0 +1,90 @@
+import numpy as np
+from typing import Dict, Optional
+
+from .scheduler import PRB_BANDWIDTH_MHZ
+from .user_equipment import UserEquipment
+
+# Пороги SINR (дБ) для CQI 1..15 при BLER 10%
+CQI_SINR_THRESHOLDS = np.array([
+    -6.7, -4.7, -2.3, 0.2, 2.4, 4.3, 5.9, 8.1, 10.3, 11.7, 14.1, 16.3, 18.7, 21.0, 22.7
+])
+
+# Спектральна ефективність CQI 0..15 (3GPP TS 36.213, табл. 7.2.3-1), біт/с/Гц
+CQI_EFFICIENCY = np.array([
+    0.0, 0.1523, 0.2344, 0.3770, 0.6016, 0.8770, 1.1758, 1.4766,
+    1.9141, 2.4063, 2.7305, 3.3223, 3.9023, 4.5234, 5.1152, 5.5547
+])
+
+# CQI -> MCS (CQI 0 - передача неможлива, MCS -1)
+CQI_TO_MCS = np.array([-1, 0, 2, 4, 6, 8, 11, 13, 15, 18, 20, 22, 24, 26, 27, 28])
+
+# Ефективність MCS 0..28: значення CQI у відповідних точках, між ними - інтерполяція
+MCS_EFFICIENCY = np.interp(np.arange(29), CQI_TO_MCS[1:], CQI_EFFICIENCY[1:])
+
+# Кількість просторових потоків MIMO за категорією UE
+CATEGORY_MAX_LAYERS = {1: 1, 4: 2, 6: 2, 9: 2, 12: 2, 16: 2}
+
+
+class LinkAdaptationTable:
+    """Передобчислені таблиці SINR -> CQI -> MCS -> ефективність для всієї популяції UE
+
+    Вибір CQI - один np.searchsorted за порогами SINR, решта - np.take
+    по таблицях, тому відображення не залежить від кількості UE.
+    """
+
+    def __init__(self, overhead: float = 0.25, rank2_sinr_db: float = 12.0):
+        self.overhead = overhead  # частка ресурсів на керування та опорні сигнали
+        self.rank2_sinr_db = rank2_sinr_db  # поріг переходу на 2 потоки MIMO
+
+        # Таблиці за категорією UE (індекс - номер категорії)
+        max_category = max(UserEquipment.CATEGORY_THROUGHPUT)
+        default_cap = UserEquipment.CATEGORY_THROUGHPUT.get(4, 150)
+        self.category_cap_mbps = np.full(max_category + 1, float(default_cap))
+        self.category_layers = np.ones(max_category + 1, dtype=np.int64)
+        for category, throughput in UserEquipment.CATEGORY_THROUGHPUT.items():
+            self.category_cap_mbps[category] = throughput
+            self.category_layers[category] = CATEGORY_MAX_LAYERS.get(category, 1)
+
+        # Ефективність за CQI (через MCS), з урахуванням накладних витрат
+        mcs = CQI_TO_MCS
+        self.cqi_efficiency = np.where(mcs >= 0, MCS_EFFICIENCY.take(np.maximum(mcs, 0)), 0.0)
+
+    def cqi_for_sinr(self, sinr_db) -> np.ndarray:
+        return np.searchsorted(CQI_SINR_THRESHOLDS, sinr_db, side='right')
+
+    def lookup(self, sinr_db: np.ndarray, categories: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """CQI, MCS, ефективність, швидкість на PRB та обмеження категорії для всіх UE"""
+        sinr_db = np.asarray(sinr_db, dtype=np.float64)
+        cqi = self.cqi_for_sinr(sinr_db)
+        mcs = CQI_TO_MCS.take(cqi)
+        efficiency = self.cqi_efficiency.take(cqi)
+
+        if categories is None:
+            categories = np.full(sinr_db.shape, 4, dtype=np.int64)
+        categories = np.clip(np.asarray(categories, dtype=np.int64), 0, len(self.category_cap_mbps) - 1)
+
+        layers = np.where(sinr_db >= self.rank2_sinr_db, self.category_layers.take(categories), 1)
+        prb_rate_mbps = efficiency * layers * PRB_BANDWIDTH_MHZ * (1 - self.overhead)
+
+        return {
+            'cqi': cqi,
+            'mcs': mcs,
+            'efficiency': efficiency,
+            'layers': layers,
+            'prb_rate_mbps': prb_rate_mbps,
+            'cap_mbps': self.category_cap_mbps.take(categories)
+        }
+
+    def max_efficiency(self) -> float:
+        return float(self.cqi_efficiency[-1])
+
+
+_default_table: Optional[LinkAdaptationTable] = None
+
+
+def get_default_table() -> LinkAdaptationTable:
+    """Спільна таблиця для скалярних розрахунків"""
+    global _default_table
+    if _default_table is None:
+        _default_table = LinkAdaptationTable()
+    return _default_table
@@ -0,0 +1,201 @@
+import os
+import sys
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Допустимий приріст структури за замовчуванням, байт на 1000 кроків
+DEFAULT_GROWTH_LIMIT = 1024 * 1024
+# Скільки кроків поспіль структура має рости, щоб зростання вважалось витоком
+DEFAULT_SUSTAINED_STEPS = 1000
+
+
+def deep_sizeof(obj, depth: int = 3) -> int:
+    """Розмір об'єкта з вкладеними контейнерами до глибини depth"""
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, depth - 1) + deep_sizeof(v, depth - 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, depth - 1) for item in obj)
+    return size
+
+
+def estimate_container(obj, sample: int = 64) -> Dict:
+    """Кількість елементів та оцінка розміру контейнера за вибіркою елементів"""
+    items = len(obj)
+    size = sys.getsizeof(obj)
+    if items:
+        if isinstance(obj, dict):
+            sampled = [deep_sizeof(k) + deep_sizeof(v) for k, v in islice(obj.items(), sample)]
+        elif isinstance(obj, (list, tuple, deque)):
+            stride = max(items // sample, 1)
+            sampled = [deep_sizeof(obj[k]) for k in range(0, items, stride)][:sample]
+        else:
+            sampled = [deep_sizeof(item) for item in islice(obj, sample)]
+        size += sum(sampled) / len(sampled) * items
+    return {'items': items, 'bytes': int(size)}
+
+
+class MemoryTracker:
+    """Відстеження зростання пам'яті двигуна в довгих прогонах
+
+    Кожні every_n_steps кроків знімаються розміри відомих структур двигуна
+    (журнал хендоверів, історії UE, таймери TTT тощо) та знімок tracemalloc.
+    Приріст структури між знімками перераховується на 1000 кроків. Попередження
+    (подія 'memory_alert' двигуна) виникає лише при стійкому зростанні:
+    кількість елементів збільшувалась між кожними двома знімками протягом
+    останніх sustained_steps кроків і приріст за цей період перевищує ліміт. Обмежені структури, що
+    лише заповнюються до своєї межі, тому не дають попереджень. Різниця
+    знімків tracemalloc показує рядки коду репозиторію, де виділяється нова пам'ять.
+    """
+
+    def __init__(self, engine, every_n_steps: int = 100, limits: Optional[Dict[str, float]] = None,
+                 default_limit: float = DEFAULT_GROWTH_LIMIT, top_sites: int = 10, start_tracemalloc: bool = True,
+                 sustained_steps: int = DEFAULT_SUSTAINED_STEPS):
+        self.engine = engine
+        self.every_n_steps = every_n_steps
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.top_sites = top_sites
+        self.sustained_steps = sustained_steps
+        self.probes: Dict[str, Callable[[], object]] = {}
+        # Історія має покривати вікно sustained_steps
+        self.history: deque = deque(maxlen=max(1000, sustained_steps // max(every_n_steps, 1) + 2))
+        self.alerts: deque = deque(maxlen=200)
+        self.sites: List[Dict] = []
+        self.steps = 0
+
+        self._previous: Optional[Dict] = None
+        self._previous_snapshot = None
+        self._started_tracemalloc = False
+        if start_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        self.add_probe('engine.handover_events', lambda: engine.handover_events)
+        self.add_probe('engine.last_handover_info', lambda: engine.last_handover_info)
+        self.add_probe('ue.handover_history', lambda: [ho for ue in engine.users.values() for ho in ue.handover_history])
+        self.add_probe('handover_algorithm.trigger_timers', lambda: engine.handover_algorithm.trigger_timers)
+        # Історії вимірювань контролерів, зареєстрованих у engine.handover_controllers
+        self.add_probe('handover_controller.measurements_history',
+                       lambda: [m for controller in engine.handover_controllers for m in controller.measurements_history])
+        engine.add_listener(self.on_event)
+
+    def add_probe(self, name: str, getter: Callable[[], object]):
+        """Додаткова структура для відстеження (getter повертає контейнер)"""
+        self.probes[name] = getter
+
+    def detach(self):
+        self.engine.remove_listener(self.on_event)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def on_event(self, topic: str, payload: Dict):
+        if topic != 'step':
+            return
+        self.steps += 1
+        if self.steps % self.every_n_steps == 0:
+            self.take_snapshot()
+
+    def measure_structures(self) -> Dict[str, Dict]:
+        structures = {}
+        for name, getter in self.probes.items():
+            try:
+                structures[name] = estimate_container(getter())
+            except Exception as e:
+                print(f"Помилка вимірювання структури {name}: {e}")
+        return structures
+
+    def take_snapshot(self) -> Dict:
+        """Розміри структур, пам'ять tracemalloc та перевірка лімітів зростання"""
+        record = {
+            'step': self.steps,
+            'simulation_time': self.engine.simulation_time,
+            'timestamp': datetime.now(),
+            'structures': self.measure_structures()
+        }
+        if tracemalloc.is_tracing():
+            record['traced_bytes'], record['traced_peak_bytes'] = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, os.path.join(REPO_ROOT, '*'))])
+            if self._previous_snapshot is not None:
+                self.sites = [{
+                    'site': f"{os.path.relpath(stat.traceback[0].filename, REPO_ROOT)}:{stat.traceback[0].lineno}",
+                    'size_diff': stat.size_diff,
+                    'count_diff': stat.count_diff,
+                    'size': stat.size
+                } for stat in snapshot.compare_to(self._previous_snapshot, 'lineno')[:self.top_sites]]
+            self._previous_snapshot = snapshot
+
+        if self._previous is not None:
+            steps = record['step'] - self._previous['step']
+            for name, current in record['structures'].items():
+                previous = self._previous['structures'].get(name)
+                if previous is None or steps <= 0:
+                    continue
+                current['growth_bytes_per_1k'] = (current['bytes'] - previous['bytes']) / steps * 1000
+                current['growth_items_per_1k'] = (current['items'] - previous['items']) / steps * 1000
+
+        self._previous = record
+        self.history.append(record)
+
+        window = self._sustained_window(record['step'])
+        if window:
+            steps = record['step'] - window[0]['step']
+            for name, current in record['structures'].items():
+                items = [r['structures'][name]['items'] for r in window if name in r['structures']]
+                if len(items) != len(window) or any(later <= earlier for earlier, later in zip(items, items[1:])):
+                    continue
+                first = window[0]['structures'][name]
+                current['sustained_growth_bytes_per_1k'] = (current['bytes'] - first['bytes']) / steps * 1000
+                limit = self.limits.get(name, self.default_limit)
+                if limit is not None and current['sustained_growth_bytes_per_1k'] > limit:
+                    self._alert(name, current, limit, record)
+        return record
+
+    def _sustained_window(self, step: int) -> List[Dict]:
+        """Знімки за останні sustained_steps кроків (порожньо, доки історія коротша)"""
+        start = None
+        for i in range(len(self.history) - 1, -1, -1):
+            if step - self.history[i]['step'] >= self.sustained_steps:
+                start = i
+                break
+        if start is None:
+            return []
+        return list(islice(self.history, start, len(self.history)))
+
+    def _alert(self, name: str, current: Dict, limit: float, record: Dict):
+        alert = {
+            'timestamp': record['timestamp'],
+            'step': record['step'],
+            'structure': name,
+            'items': current['items'],
+            'bytes': current['bytes'],
+            'growth_bytes_per_1k': current['sustained_growth_bytes_per_1k'],
+            'limit_bytes_per_1k': limit
+        }
+        self.alerts.append(alert)
+        print(f"Попередження пам'яті: {name} стійко зростає на "
+              f"{current['sustained_growth_bytes_per_1k'] / 1024:.0f} КБ за 1000 кроків протягом "
+              f"{self.sustained_steps} кроків (ліміт {limit / 1024:.0f} КБ), зараз {current['items']} елементів")
+        if self.engine.event_listeners:
+            self.engine._emit('memory_alert', alert)
+
+    def get_report(self) -> Dict:
+        """Останній знімок структур, найбільші місця виділення та попередження"""
+        latest = self.history[-1] if self.history else None
+        return {
+            'step': self.steps,
+            'every_n_steps': self.every_n_steps,
+            'structures': latest['structures'] if latest else {},
+            'traced_bytes': latest.get('traced_bytes') if latest else None,
+            'traced_peak_bytes': latest.get('traced_peak_bytes') if latest else None,
+            'top_sites': list(self.sites),
+            'alerts': list(self.alerts)
+        }
@@ -0,0 +1,170 @@
+import bisect
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Межі кошиків гістограми тривалості кроку, с
+STEP_DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HANDOVER_OUTCOMES = ('successful', 'failed', 'pingpong', 'rejected')
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def process_memory_bytes() -> Tuple[Optional[int], Optional[int]]:
+    """Поточний та піковий RSS процесу в байтах (None, якщо недоступно)"""
+    current = None
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    peak = None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux повертає КБ, macOS - байти
+        peak = peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    return current, peak
+
+
+class EngineMetrics:
+    """Лічильники та датчики LTENetworkEngine для експорту у форматі Prometheus
+
+    Оновлюються слухачем подій двигуна без блокувань: єдиний записувач -
+    потік симуляції, значення - прості числа та елементи списку, тож
+    читач /metrics бачить узгоджені з точністю до одного кроку значення.
+    Оновлення на крок - кілька додавань і один bisect.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.steps = 0
+        self.step_duration_counts = [0] * (len(STEP_DURATION_BUCKETS) + 1)  # останній - +Inf
+        self.step_duration_sum = 0.0
+        self.active_users = 0
+        self.cells = 0
+        self.rsrp_evaluations = 0
+        self.handovers = {outcome: 0 for outcome in HANDOVER_OUTCOMES}
+        self.simulation_time = 0.0
+        self.handover_events = 0
+        engine.add_listener(self.on_event)
+
+    def detach(self):
+        self.engine.remove_listener(self.on_event)
+
+    def on_event(self, topic: str, payload: Dict):
+        if topic == 'step':
+            duration = payload.get('duration_s', 0.0)
+            self.step_duration_counts[bisect.bisect_left(STEP_DURATION_BUCKETS, duration)] += 1
+            self.step_duration_sum += duration
+            self.active_users = payload['active_users']
+            self.cells = len(self.engine.base_stations)
+            # Кожен крок вимірює RSRP усіх активних UE від усіх сот
+            self.rsrp_evaluations += self.active_users * self.cells
+            self.simulation_time = payload['simulation_time']
+            self.steps += 1
+        elif topic == 'handover':
+            self.handovers[payload['type']] = self.handovers.get(payload['type'], 0) + 1
+            self.handover_events += 1
+        elif topic == 'handover_rejected':
+            self.handovers['rejected'] += 1
+
+    def render(self) -> str:
+        """Текстовий формат експозиції Prometheus 0.0.4"""
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        metric('lte_steps_total', 'counter', "Виконані кроки симуляції", [('', self.steps)])
+
+        counts = list(self.step_duration_counts)
+        cumulative, buckets = 0, []
+        for bound, count in zip(STEP_DURATION_BUCKETS, counts):
+            cumulative += count
+            buckets.append((f'{{le="{bound}"}}', cumulative))
+        buckets.append(('{le="+Inf"}', sum(counts)))
+        metric('lte_step_duration_seconds', 'histogram', "Тривалість кроку симуляції (реальний час)", buckets)
+        lines.append(f"lte_step_duration_seconds_sum {self.step_duration_sum}")
+        lines.append(f"lte_step_duration_seconds_count {sum(counts)}")
+
+        metric('lte_simulation_time_seconds', 'gauge', "Симульований час", [('', self.simulation_time)])
+        metric('lte_active_ues', 'gauge', "Активні UE на останньому кроці", [('', self.active_users)])
+        metric('lte_cells', 'gauge', "Кількість сот у мережі", [('', self.cells)])
+        # Швидкість обчислень - rate(lte_rsrp_evaluations_total[...]) на боці Prometheus
+        metric('lte_rsrp_evaluations_total', 'counter', "Обчислення RSRP для пар UE x сота",
+               [('', self.rsrp_evaluations)])
+        metric('lte_handover_attempts_total', 'counter', "Спроби хендовера за результатом",
+               [(f'{{outcome="{outcome}"}}', count) for outcome, count in list(self.handovers.items())])
+        metric('lte_handover_events_total', 'counter', "Події хендоверів, додані до журналу двигуна",
+               [('', self.handover_events)])
+
+        current, peak = process_memory_bytes()
+        if current is not None:
+            metric('process_resident_memory_bytes', 'gauge', "Поточний RSS процесу", [('', current)])
+        if peak is not None:
+            metric('process_peak_resident_memory_bytes', 'gauge', "Піковий RSS процесу", [('', peak)])
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Локальний HTTP-ендпоінт /metrics для EngineMetrics (опціональний)"""
+
+    def __init__(self, engine, host: str = '127.0.0.1', port: int = 9108):
+        self.metrics = EngineMetrics(engine)
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        return self._server.server_address[:2] if self._server is not None else None
+
+    def start(self) -> Tuple[str, int]:
+        if self._server is not None:
+            return self.address
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self):
+        """Зупинка HTTP-сервера (лічильники продовжують оновлюватись)"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def detach(self):
+        self.stop()
+        self.metrics.detach()
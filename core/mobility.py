@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+import os
+
+
+@dataclass
+class MobilityUpdate:
+    """Пакет нових позицій UE від зовнішнього джерела мобільності"""
+    ue_ids: List[str]
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    speeds_kmh: np.ndarray
+    directions: np.ndarray
+    finished_ue_ids: List[str] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.ue_ids)
+
+
+class TraceMobilitySource:
+    """Потокове відтворення GPS-треків (CSV або Parquet) з інтерполяцією до годинника симуляції
+
+    Файл має містити колонки ue_id, t, lat, lon і бути відсортованим за t.
+    У пам'яті зберігається лише вікно попереднього читання та по одній
+    опорній точці на UE, тому розмір треку не обмежений обсягом RAM.
+    Якщо наступна точка UE лежить за вікном, вікно подовжується до неї,
+    але не далі ніж на max_gap_s після останньої точки UE: UE без точок
+    протягом max_gap_s вважається таким, що завершив трек, щойно його
+    остання точка пройдена (пізніші точки того самого UE почнуть новий трек).
+    """
+
+    REQUIRED_COLUMNS = ['ue_id', 't', 'lat', 'lon']
+
+    def __init__(self, path: str, chunk_size: int = 100_000,
+                 lookahead_s: float = 60.0, time_origin: Optional[float] = None,
+                 file_format: Optional[str] = None, max_gap_s: float = 600.0):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.lookahead_s = lookahead_s  # на скільки секунд уперед тримати буфер
+        self.max_gap_s = max_gap_s  # найбільший проміжок між точками одного треку
+        self.time_origin = time_origin  # час треку, що відповідає simulation_time = 0
+        self._initial_time_origin = time_origin
+
+        if file_format is None:
+            file_format = 'parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv'
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f"Непідтримуваний формат треку: {file_format}")
+        self.file_format = file_format
+
+        self._chunks: Optional[Iterator[pd.DataFrame]] = None
+        self._exhausted = False
+
+        # Словник UE ID -> цілочисельний код та стан останньої пройденої точки
+        self._ue_codes: Dict[str, int] = {}
+        self._ue_ids: List[str] = []
+        self._prev_t = np.empty(0)
+        self._prev_lat = np.empty(0)
+        self._prev_lon = np.empty(0)
+        self._finished_reported = np.empty(0, dtype=bool)
+
+        # Буфер ще не пройдених точок (відсортований за часом)
+        self._buf_code = np.empty(0, dtype=np.int64)
+        self._buf_t = np.empty(0)
+        self._buf_lat = np.empty(0)
+        self._buf_lon = np.empty(0)
+
+    def _open(self):
+        """Відкриття потокового читача з відображенням файлу в пам'ять"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Файл треку не знайдено: {self.path}")
+
+        if self.file_format == 'csv':
+            self._chunks = iter(pd.read_csv(
+                self.path,
+                usecols=self.REQUIRED_COLUMNS,
+                dtype={'ue_id': str, 'lat': np.float64, 'lon': np.float64},
+                chunksize=self.chunk_size,
+                memory_map=True
+            ))
+        else:
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Для читання Parquet-треків потрібен пакет pyarrow") from e
+
+            parquet_file = pq.ParquetFile(self.path, memory_map=True)
+            self._chunks = (
+                batch.to_pandas()
+                for batch in parquet_file.iter_batches(batch_size=self.chunk_size,
+                                                       columns=self.REQUIRED_COLUMNS)
+            )
+
+    def _time_to_seconds(self, values: pd.Series) -> np.ndarray:
+        """Переведення колонки часу в секунди (число або дата/час)"""
+        if pd.api.types.is_numeric_dtype(values):
+            return values.to_numpy(dtype=np.float64)
+
+        timestamps = pd.to_datetime(values, utc=True)
+        return (timestamps - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy()
+
+    def _encode_ue_ids(self, ue_ids: pd.Series) -> np.ndarray:
+        """Присвоєння цілочисельних кодів UE (нові UE розширюють масиви стану)"""
+        for ue_id in ue_ids.unique():
+            if ue_id not in self._ue_codes:
+                self._ue_codes[ue_id] = len(self._ue_ids)
+                self._ue_ids.append(ue_id)
+
+        grow = len(self._ue_ids) - len(self._prev_t)
+        if grow > 0:
+            self._prev_t = np.concatenate([self._prev_t, np.full(grow, np.nan)])
+            self._prev_lat = np.concatenate([self._prev_lat, np.full(grow, np.nan)])
+            self._prev_lon = np.concatenate([self._prev_lon, np.full(grow, np.nan)])
+            self._finished_reported = np.concatenate(
+                [self._finished_reported, np.zeros(grow, dtype=bool)])
+
+        return ue_ids.map(self._ue_codes).to_numpy(dtype=np.int64)
+
+    def _read_chunk(self) -> bool:
+        """Читання наступного фрагмента треку в буфер"""
+        if self._chunks is None:
+            self._open()
+
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._exhausted = True
+            return False
+
+        if chunk.empty:
+            return True
+
+        t = self._time_to_seconds(chunk['t'])
+        if self.time_origin is None:
+            self.time_origin = float(t[0])
+
+        self._buf_code = np.concatenate([self._buf_code, self._encode_ue_ids(chunk['ue_id'].astype(str))])
+        self._buf_t = np.concatenate([self._buf_t, t - self.time_origin])
+        self._buf_lat = np.concatenate([self._buf_lat, chunk['lat'].to_numpy(dtype=np.float64)])
+        self._buf_lon = np.concatenate([self._buf_lon, chunk['lon'].to_numpy(dtype=np.float64)])
+        return True
+
+    def advance(self, simulation_time: float) -> MobilityUpdate:
+        """Позиції всіх відомих UE на момент simulation_time"""
+        # Дочитування треку до горизонту попереднього читання
+        while not self._exhausted and (
+                len(self._buf_t) == 0 or self._buf_t[-1] < simulation_time + self.lookahead_s):
+            self._read_chunk()
+
+        # Пройдені точки стають опорними (остання точка кожного UE)
+        split = int(np.searchsorted(self._buf_t, simulation_time, side='right'))
+        if split > 0:
+            passed_codes = self._buf_code[:split][::-1]
+            codes, last_idx = np.unique(passed_codes, return_index=True)
+            last_idx = split - 1 - last_idx
+            self._prev_t[codes] = self._buf_t[last_idx]
+            self._prev_lat[codes] = self._buf_lat[last_idx]
+            self._prev_lon[codes] = self._buf_lon[last_idx]
+            # Точки після завершення треку починають новий трек того самого UE
+            self._finished_reported[codes] = False
+
+            self._buf_code = self._buf_code[split:]
+            self._buf_t = self._buf_t[split:]
+            self._buf_lat = self._buf_lat[split:]
+            self._buf_lon = self._buf_lon[split:]
+
+        # Подовження вікна, доки кожен активний UE не матиме наступної точки
+        # або доки не стане відомо, що її немає протягом max_gap_s
+        while not self._exhausted:
+            in_buffer = np.zeros(len(self._prev_t), dtype=bool)
+            in_buffer[self._buf_code] = True
+            waiting = ~np.isnan(self._prev_t) & ~self._finished_reported & ~in_buffer
+            buffer_end = self._buf_t[-1] if len(self._buf_t) else simulation_time
+            if not np.any(self._prev_t[waiting] + self.max_gap_s > buffer_end):
+                break
+            self._read_chunk()
+        started = ~np.isnan(self._prev_t)
+        lat = self._prev_lat.copy()
+        lon = self._prev_lon.copy()
+        speed = np.zeros(len(lat))
+        direction = np.zeros(len(lat))
+
+        # Наступна точка кожного UE у буфері - лінійна інтерполяція
+        has_next = np.zeros(len(lat), dtype=bool)
+        if len(self._buf_code):
+            codes, first_idx = np.unique(self._buf_code, return_index=True)
+            # Точка далі ніж через max_gap_s належить уже новому треку UE
+            codes_next = started[codes] & (self._buf_t[first_idx] - self._prev_t[codes] <= self.max_gap_s)
+            codes, first_idx = codes[codes_next], first_idx[codes_next]
+            has_next[codes] = True
+
+            t0 = self._prev_t[codes]
+            t1 = self._buf_t[first_idx]
+            span = np.maximum(t1 - t0, 1e-9)
+            frac = np.clip((simulation_time - t0) / span, 0.0, 1.0)
+
+            lat1 = self._buf_lat[first_idx]
+            lon1 = self._buf_lon[first_idx]
+            dlat = lat1 - self._prev_lat[codes]
+            dlon = lon1 - self._prev_lon[codes]
+            lat[codes] = self._prev_lat[codes] + frac * dlat
+            lon[codes] = self._prev_lon[codes] + frac * dlon
+
+            # Швидкість та напрям руху за сегментом треку
+            north_m = dlat * 111111
+            east_m = dlon * 111111 * np.cos(np.radians(lat[codes]))
+            speed[codes] = np.hypot(north_m, east_m) / span * 3.6
+            direction[codes] = np.degrees(np.arctan2(east_m, north_m)) % 360
+
+        # UE без наступної точки (кінець файлу або проміжок понад max_gap_s)
+        # завершили трек і повідомляються один раз
+        finished_mask = started & ~has_next & ~self._finished_reported
+        self._finished_reported |= finished_mask
+        active = started & ~self._finished_reported
+        active_codes = np.flatnonzero(active)
+
+        return MobilityUpdate(
+            ue_ids=[self._ue_ids[i] for i in active_codes],
+            latitudes=lat[active_codes],
+            longitudes=lon[active_codes],
+            speeds_kmh=speed[active_codes],
+            directions=direction[active_codes],
+            finished_ue_ids=[self._ue_ids[i] for i in np.flatnonzero(finished_mask)]
+        )
+
+    def reset(self):
+        """Повернення до початку треку"""
+        self.__init__(self.path, self.chunk_size, self.lookahead_s,
+                      self._initial_time_origin, self.file_format, self.max_gap_s)
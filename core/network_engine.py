@@ -2,14 +2,20 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from geopy.distance import geodesic
-import random
 from typing import Dict, List, Tuple, Optional
 import time
 
 class LTENetworkEngine:
     """Основний движок симуляції LTE мережі"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        from .random_pool import RandomPool
+        from .handover_algorithm import HandoverAlgorithm
+        from .handover_matrix import HandoverMatrix
+        from .step_profiler import StepProfiler
+        
+        self.seed = seed
+        self.rng = RandomPool(seed)  # пул випадкових чисел для гарячого циклу
         self.base_stations = {}
         self.users = {}
         self.handover_events = []
@@ -17,10 +23,49 @@ class LTENetworkEngine:
         self.simulation_running = False
         self.simulation_time = 0.0
         self.time_step = 1.0  # секунди
+        self.mobility_source = None  # зовнішнє джерело позицій UE (треки тощо)
+        self.auto_add_mobility_users = True
+        self.shadow_fading = None  # просторово корельоване затінення (core/fading.py)
+        self.fast_fading = None    # опціональний часово корельований фединг
+        self.interference = None   # пакетний розрахунок RSRQ/SINR (core/interference.py)
+        self.scheduler = None      # розподіл PRB між UE (core/scheduler.py)
+        self.link_adaptation = None  # таблиці SINR -> CQI -> MCS (core/link_adaptation.py)
+        self.antenna_patterns = {}   # діаграми спрямованості секторів (core/antenna.py)
+        self.default_antenna_pattern = '3gpp_65'
+        self.sectorize_sites = False  # розгортати сайти з azimuth_angles у окремі сектори-соти
+        self.area_bounds = None  # межі руху UE (lat_min, lat_max, lon_min, lon_max), None - Вінниця
+        self.last_measurements = {}
+        self.event_listeners = []  # підписники подій кроку/хендовера (напр. core/telemetry.py)
+        self.handover_matrix = HandoverMatrix()  # лічильники хендоверів сота -> сота
+        self.last_handover_info = {}  # ue_id -> (час симуляції, сота, з якої пішов UE)
+        self.step_profiler = StepProfiler()  # таймери фаз кроку (вимкнені за замовчуванням)
+        self.metrics_exporter = None  # HTTP-ендпоінт Prometheus (core/metrics_exporter.py)
+        self.memory_tracker = None  # знімки пам'яті кожні N кроків (core/memory_tracker.py)
+        self.handover_controllers = []  # зовнішні HandoverController (utils/handover.py), що працюють поруч
+        
+        # Параметри хендовера
+        self.handover_ttt = 280     # мс
+        self.handover_hyst = 4.0    # дБ
+        self.handover_offset = 0.0  # дБ
+        self.pingpong_window = 5.0  # с часу симуляції для повернення в попередню соту
+        self.handover_algorithm = HandoverAlgorithm()
         
     def initialize_network(self, base_stations_config: List[Dict]) -> bool:
         """Ініціалізація мережі з базовими станціями"""
+        from .interference import InterferenceCalculator
+        from .scheduler import ResourceScheduler
+        from .link_adaptation import LinkAdaptationTable
+        
         try:
+            if self.shadow_fading is None:
+                self.configure_fading(seed=self.seed)
+            if self.interference is None:
+                self.interference = InterferenceCalculator()
+            if self.scheduler is None:
+                self.scheduler = ResourceScheduler()
+            if self.link_adaptation is None:
+                self.link_adaptation = LinkAdaptationTable()
+            
             for bs_config in base_stations_config:
                 self.add_base_station(bs_config)
             
@@ -41,27 +86,94 @@ class LTENetworkEngine:
             return False
     
     def add_base_station(self, config: Dict) -> bool:
-        """Додавання базової станції"""
+        """Додавання базової станції (сайт з секторами розгортається в окремі соти)"""
         from .base_station import BaseStation
         
         try:
-            bs = BaseStation(
-                bs_id=config['id'],
-                name=config['name'],
-                latitude=config['lat'],
-                longitude=config['lon'],
-                power_dbm=config['power'],
-                frequency_mhz=config.get('frequency', 1800),
-                operator=config.get('operator', 'Unknown'),
-                max_users=config.get('max_users', 100)
-            )
+            sector_azimuths = config.get('azimuth_angles') \
+                if config.get('sectorized', self.sectorize_sites) else None
+            
+            if sector_azimuths:
+                cells = [(f"{config['id']}_S{k + 1}", f"{config['name']} S{k + 1}", float(azimuth))
+                         for k, azimuth in enumerate(sector_azimuths)]
+            else:
+                cells = [(config['id'], config['name'], config.get('sector_azimuth'))]
             
-            self.base_stations[config['id']] = bs
+            for cell_id, name, azimuth in cells:
+                bs = BaseStation(
+                    bs_id=cell_id,
+                    name=name,
+                    latitude=config['lat'],
+                    longitude=config['lon'],
+                    power_dbm=config['power'],
+                    frequency_mhz=config.get('frequency', 1800),
+                    operator=config.get('operator', 'Unknown'),
+                    max_users=config.get('max_users', 100),
+                    bandwidth_mhz=config.get('bandwidth_mhz', 20),
+                    site_id=config['id'],
+                    sector_azimuth=azimuth,
+                    antenna_pattern=config.get('antenna_pattern', self.default_antenna_pattern),
+                    antenna_gain_db=config.get('antenna_gain', 15)
+                )
+                
+                self.base_stations[cell_id] = bs
+                self.handover_matrix.register_cell(cell_id)
+                if self.shadow_fading is not None:
+                    self.shadow_fading.register_cell(bs.bs_id, bs.latitude, bs.longitude)
             return True
         except Exception as e:
             print(f"Помилка додавання BS {config.get('id', 'Unknown')}: {e}")
             return False
     
+    def register_antenna_pattern(self, name: str, pattern) -> None:
+        """Реєстрація діаграми спрямованості (AntennaPattern або шлях до файлу MSI/CSV)"""
+        from .antenna import AntennaPattern
+        
+        if not isinstance(pattern, AntennaPattern):
+            pattern = AntennaPattern.from_file(pattern, name=name)
+        self.antenna_patterns[name] = pattern
+    
+    def _get_antenna_pattern(self, name: Optional[str]):
+        from .antenna import AntennaPattern
+        
+        name = name or self.default_antenna_pattern
+        if name not in self.antenna_patterns:
+            if name != self.default_antenna_pattern:
+                raise KeyError(f"Невідома діаграма спрямованості: {name}")
+            self.antenna_patterns[name] = AntennaPattern.parabolic()
+        return self.antenna_patterns[name]
+    
+    def compute_antenna_gain_matrix(self, ue_lat: np.ndarray, ue_lon: np.ndarray,
+                                    bs_list: List) -> np.ndarray:
+        """Посилення антен (дБ) для всіх пар UE x сота
+        
+        Азимути UE рахуються один раз для кожного унікального сайту, далі
+        посилення сектора - вибірка з таблиці діаграми за кутом від його осі.
+        """
+        from .antenna import bearing_deg
+        
+        gain = np.empty((len(ue_lat), len(bs_list)))
+        gain[:] = np.array([bs.antenna_gain_db for bs in bs_list], dtype=np.float64)
+        
+        sectors = [j for j, bs in enumerate(bs_list) if bs.sector_azimuth is not None]
+        if not sectors or not len(ue_lat):
+            return gain
+        
+        site_coords = np.array([(bs_list[j].latitude, bs_list[j].longitude) for j in sectors])
+        sites, site_idx = np.unique(site_coords, axis=0, return_inverse=True)
+        bearings = bearing_deg(sites[None, :, 0], sites[None, :, 1], ue_lat[:, None], ue_lon[:, None])
+        
+        columns = np.array(sectors)
+        azimuths = np.array([bs_list[j].sector_azimuth for j in sectors], dtype=np.float64)
+        relative = bearings[:, site_idx.ravel()] - azimuths[None, :]
+        
+        pattern_names = np.array([bs_list[j].antenna_pattern or self.default_antenna_pattern for j in sectors])
+        for name in np.unique(pattern_names):
+            mask = pattern_names == name
+            gain[:, columns[mask]] += self._get_antenna_pattern(name).gain(relative[:, mask])
+        
+        return gain
+    
     def add_user(self, user_config: Dict) -> bool:
         """Додавання користувача"""
         from .user_equipment import UserEquipment
@@ -72,8 +184,10 @@ class LTENetworkEngine:
                 latitude=user_config['lat'],
                 longitude=user_config['lon'],
                 speed_kmh=user_config.get('speed', 20),
-                direction=user_config.get('direction', random.uniform(0, 360)),
-                device_type=user_config.get('device_type', 'smartphone')
+                direction=user_config.get('direction', self.rng.uniform(0, 360)),
+                device_type=user_config.get('device_type', 'smartphone'),
+                rng=self.rng,
+                bounds=user_config.get('bounds', self.area_bounds)
             )
             
             # Знаходження найкращої базової станції
@@ -89,6 +203,45 @@ class LTENetworkEngine:
             print(f"Помилка додавання UE {user_config.get('id', 'Unknown')}: {e}")
             return False
     
+    def add_users(self, user_configs: List[Dict], chunk_size: int = 1000) -> int:
+        """Пакетне додавання UE: найкраща доступна сота для всіх одним матричним розрахунком"""
+        from .user_equipment import UserEquipment
+        
+        bs_list = list(self.base_stations.values())
+        added = 0
+        for start in range(0, len(user_configs), chunk_size):
+            ues = [UserEquipment(
+                ue_id=config['id'],
+                latitude=config['lat'],
+                longitude=config['lon'],
+                speed_kmh=config.get('speed', 20),
+                direction=config.get('direction', self.rng.uniform(0, 360)),
+                device_type=config.get('device_type', 'smartphone'),
+                rng=self.rng,
+                bounds=config.get('bounds', self.area_bounds)
+            ) for config in user_configs[start:start + chunk_size]]
+            
+            if bs_list:
+                rsrp, _ = self.compute_rsrp_matrix(ues)
+                available = np.array([not bs.is_overloaded() for bs in bs_list])
+                for i, ue in enumerate(ues):
+                    j = int(np.argmax(rsrp[i]))
+                    if not available[j]:
+                        # Найкраща сота перевантажена - найкраща серед доступних
+                        if not available.any():
+                            self.users[ue.ue_id] = ue
+                            continue
+                        j = int(np.argmax(np.where(available, rsrp[i], -np.inf)))
+                    ue.serving_bs = bs_list[j].bs_id
+                    ue.rsrp = float(rsrp[i, j])
+                    bs_list[j].add_user(ue.ue_id)
+                    available[j] = not bs_list[j].is_overloaded()
+            
+            for ue in ues:
+                self.users[ue.ue_id] = ue
+            added += len(ues)
+        return added
+    
     def remove_user(self, ue_id: str) -> bool:
         """Видалення користувача"""
         try:
@@ -97,14 +250,106 @@ class LTENetworkEngine:
                 if ue.serving_bs and ue.serving_bs in self.base_stations:
                     self.base_stations[ue.serving_bs].remove_user(ue_id)
                 del self.users[ue_id]
+                self.last_handover_info.pop(ue_id, None)
                 return True
             return False
         except Exception as e:
             print(f"Помилка видалення UE {ue_id}: {e}")
             return False
     
+    def add_listener(self, listener):
+        """Підписка на події двигуна: listener(topic, payload), topic - 'step' або 'handover'"""
+        if listener not in self.event_listeners:
+            self.event_listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        if listener in self.event_listeners:
+            self.event_listeners.remove(listener)
+    
+    def _emit(self, topic: str, payload: Dict):
+        for listener in list(self.event_listeners):
+            try:
+                listener(topic, payload)
+            except Exception as e:
+                print(f"Помилка обробника події {topic}: {e}")
+    
+    def attach_mobility_source(self, source, auto_add_users: bool = True):
+        """Підключення зовнішнього джерела мобільності (напр. TraceMobilitySource)"""
+        self.mobility_source = source
+        self.auto_add_mobility_users = auto_add_users
+    
+    def detach_mobility_source(self):
+        """Повернення до вбудованої моделі руху UE"""
+        self.mobility_source = None
+    
+    def apply_mobility_source(self) -> set:
+        """Застосування позицій від джерела мобільності на поточний час симуляції"""
+        update = self.mobility_source.advance(self.simulation_time)
+        moved = set()
+        
+        for i, ue_id in enumerate(update.ue_ids):
+            lat = float(update.latitudes[i])
+            lon = float(update.longitudes[i])
+            ue = self.users.get(ue_id)
+            
+            if ue is None:
+                if not self.auto_add_mobility_users:
+                    continue
+                if not self.add_user({'id': ue_id, 'lat': lat, 'lon': lon,
+                                      'speed': float(update.speeds_kmh[i]),
+                                      'direction': float(update.directions[i])}):
+                    continue
+                ue = self.users[ue_id]
+            
+            ue.latitude = lat
+            ue.longitude = lon
+            ue.speed_kmh = float(update.speeds_kmh[i])
+            ue.direction = float(update.directions[i])
+            moved.add(ue_id)
+        
+        # UE, трек яких завершився, залишають мережу
+        for ue_id in update.finished_ue_ids:
+            self.remove_user(ue_id)
+        
+        return moved
+    
+    def configure_fading(self, seed: Optional[int] = None, shadow_sigma_db: float = 4.0,
+                         decorrelation_m: float = 50.0, resolution_m: float = 20.0,
+                         extent_m: float = 3000.0, fast_fading_sigma_db: float = 0.0,
+                         fast_fading_coherence_m: float = 5.0):
+        """Налаштування карт затінення та (опціонально) швидкого федингу"""
+        from .fading import ShadowFadingMap, FastFadingProcess
+        
+        self.shadow_fading = ShadowFadingMap(
+            sigma_db=shadow_sigma_db,
+            decorrelation_m=decorrelation_m,
+            resolution_m=resolution_m,
+            extent_m=extent_m,
+            seed=seed
+        )
+        for bs in self.base_stations.values():
+            self.shadow_fading.register_cell(bs.bs_id, bs.latitude, bs.longitude)
+        
+        self.fast_fading = None
+        if fast_fading_sigma_db > 0:
+            self.fast_fading = FastFadingProcess(
+                sigma_db=fast_fading_sigma_db,
+                coherence_m=fast_fading_coherence_m,
+                rng=self.rng
+            )
+    
+    def get_fading_db(self, base_station, ue_lat: float, ue_lon: float,
+                      ue_id: Optional[str] = None) -> float:
+        """Затінення за позицією UE плюс швидкий фединг пари UE-сота"""
+        fading = 0.0
+        if self.shadow_fading is not None:
+            fading += self.shadow_fading.lookup(base_station.bs_id, ue_lat, ue_lon)
+        if self.fast_fading is not None and ue_id is not None:
+            fading += self.fast_fading.value(ue_id, base_station.bs_id)
+        return fading
+    
     def calculate_rsrp(self, ue_lat: float, ue_lon: float, base_station, 
-                      metrology_error: float = 1.0) -> float:
+                      metrology_error: float = 1.0, ue_id: Optional[str] = None) -> float:
         """Розрахунок RSRP з урахуванням метрологічної похибки"""
         # Відстань між UE та BS
         distance_km = geodesic((ue_lat, ue_lon), 
@@ -122,18 +367,20 @@ class LTENetworkEngine:
                         13.82 * np.log10(30) + 
                         (44.9 - 6.55 * np.log10(30)) * np.log10(distance_km + 0.001) + 3)
         
-        # RSRP = Потужність - Втрати + Gain антени
-        rsrp = base_station.power_dbm - path_loss + 15  # 15 dB antenna gain
+        # RSRP = Потужність - Втрати + Gain антени (з діаграмою сектора)
+        antenna_gain = self.compute_antenna_gain_matrix(
+            np.array([ue_lat]), np.array([ue_lon]), [base_station])[0, 0]
+        rsrp = base_station.power_dbm - path_loss + antenna_gain
         
         # Додавання метрологічної похибки та федингу
-        rsrp += np.random.normal(0, metrology_error)
-        rsrp += np.random.normal(0, 4)  # Rayleigh fading
+        rsrp += self.rng.normal(0, metrology_error)
+        rsrp += self.get_fading_db(base_station, ue_lat, ue_lon, ue_id)
         
         return max(-120, min(-40, rsrp))
     
     def calculate_rsrq(self, rsrp: float, interference_level: float = 5.0) -> float:
         """Розрахунок RSRQ"""
-        rssi = rsrp + np.random.uniform(0, interference_level)
+        rssi = rsrp + self.rng.uniform(0, interference_level)
         rsrq = rsrp - rssi
         return max(-20, min(-3, rsrq))
     
@@ -151,52 +398,271 @@ class LTENetworkEngine:
         
         return best_bs
     
+    def compute_rsrp_matrix(self, ues: List, metrology_error: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """RSRP усіх UE від усіх сот однією матричною операцією (UE x сота)"""
+        from .propagation import haversine_km, cost_hata_path_loss
+        
+        bs_list = list(self.base_stations.values())
+        ue_lat = np.array([ue.latitude for ue in ues], dtype=np.float64)
+        ue_lon = np.array([ue.longitude for ue in ues], dtype=np.float64)
+        bs_lat = np.array([bs.latitude for bs in bs_list], dtype=np.float64)
+        bs_lon = np.array([bs.longitude for bs in bs_list], dtype=np.float64)
+        bs_freq = np.array([bs.frequency_mhz for bs in bs_list], dtype=np.float64)
+        bs_power = np.array([bs.power_dbm for bs in bs_list], dtype=np.float64)
+        
+        distance_km = haversine_km(ue_lat[:, None], ue_lon[:, None], bs_lat[None, :], bs_lon[None, :])
+        path_loss = cost_hata_path_loss(distance_km, bs_freq[None, :])
+        
+        # RSRP = Потужність - Втрати + Gain антени + похибка + фединг
+        rsrp = bs_power[None, :] - path_loss + self.compute_antenna_gain_matrix(ue_lat, ue_lon, bs_list)
+        rsrp += self.rng.normals(rsrp.shape, scale=metrology_error)
+        if self.step_profiler.enabled:
+            self.step_profiler.count('rsrp_evaluations', rsrp.size)
+        
+        if self.shadow_fading is not None:
+            for j, bs in enumerate(bs_list):
+                rsrp[:, j] += self.shadow_fading.lookup(bs.bs_id, ue_lat, ue_lon)
+        
+        if self.fast_fading is not None:
+            ue_ids = [ue.ue_id for ue in ues]
+            if self.fast_fading.ue_ids == ue_ids and self.fast_fading.state.shape == rsrp.shape:
+                rsrp += self.fast_fading.state
+            else:
+                for i, ue_id in enumerate(ue_ids):
+                    for j, bs in enumerate(bs_list):
+                        rsrp[i, j] += self.fast_fading.value(ue_id, bs.bs_id)
+        
+        return np.clip(rsrp, -120, -40), distance_km
+    
+    def measure_users(self, ues: List) -> Dict:
+        """Вимірювання RSRP/RSRQ/SINR для всіх UE однією матричною операцією"""
+        cell_ids = list(self.base_stations.keys())
+        if not ues or not cell_ids:
+            return {}
+        
+        rsrp, distance_km = self.compute_rsrp_matrix(ues)
+        measurements = {
+            'ue_ids': [ue.ue_id for ue in ues],
+            'cell_ids': cell_ids,
+            'rsrp_matrix': rsrp,
+            'distance_km': distance_km
+        }
+        self.evaluate_interference(ues, measurements)
+        return measurements
+    
+    def evaluate_interference(self, ues: List, measurements: Dict) -> Dict:
+        """RSRQ/SINR за поточними обслуговуючими сотами та навантаженням"""
+        cell_index = {bs_id: j for j, bs_id in enumerate(measurements['cell_ids'])}
+        serving_idx = np.array([cell_index.get(ue.serving_bs, -1) for ue in ues], dtype=np.int64)
+        cell_load = np.array([bs.load_percentage for bs in self.base_stations.values()]) / 100
+        
+        measurements.update(self.interference.compute(measurements['rsrp_matrix'], serving_idx, cell_load))
+        # Індекс соти для UE без обслуговуючої BS (-1) замінюється найкращою
+        measurements['has_serving'] = serving_idx >= 0
+        self.last_measurements = measurements
+        return measurements
+    
+    def set_scheduler_policy(self, policy: str):
+        """Вибір політики планувальника: round_robin, proportional_fair, max_ci"""
+        from .scheduler import ResourceScheduler
+        
+        self.scheduler = ResourceScheduler(policy)
+    
+    def schedule_resources(self, ues: List, measurements: Dict) -> Dict:
+        """Розподіл PRB сот між UE та запис RSRP/RSRQ/SINR/throughput в UE одним проходом"""
+        if not measurements:
+            return {}
+        
+        bs_list = list(self.base_stations.values())
+        connected = measurements['has_serving'] & (measurements['rsrp'] > -110)
+        serving_idx = np.where(connected, measurements['serving_idx'], -1)
+        
+        # SINR -> CQI -> MCS -> швидкість на PRB та обмеження категорії для всіх UE
+        link = self.link_adaptation.lookup(
+            measurements['sinr'], np.array([ue.device_category for ue in ues], dtype=np.int64)
+        )
+        
+        result = self.scheduler.schedule(
+            serving_idx=serving_idx,
+            cell_prbs=np.array([bs.total_prbs for bs in bs_list], dtype=np.float64),
+            prb_rate_mbps=link['prb_rate_mbps'],
+            ue_cap_mbps=link['cap_mbps'],
+            ue_ids=measurements['ue_ids']
+        )
+        result['cqi'] = link['cqi']
+        result['mcs'] = link['mcs']
+        
+        for ue, rsrp, rsrq, sinr, throughput, cqi, mcs in zip(ues, measurements['rsrp'].tolist(),
+                                                              measurements['rsrq'].tolist(),
+                                                              measurements['sinr'].tolist(),
+                                                              result['ue_throughput'].tolist(),
+                                                              link['cqi'].tolist(),
+                                                              link['mcs'].tolist()):
+            ue.update_signal_quality(rsrp, rsrq, sinr, throughput)
+            ue.cqi = cqi
+            ue.mcs = mcs
+        
+        for bs, throughput, used_prbs in zip(bs_list, result['cell_throughput'].tolist(),
+                                             result['cell_used_prbs'].tolist()):
+            bs.throughput_mbps = throughput
+            bs.used_prbs = used_prbs
+        
+        return result
+    
+    def check_handovers(self, ues: List, measurements: Dict) -> List[Dict]:
+        """Рішення про хендовер для всіх UE за матрицею вимірювань"""
+        if not measurements:
+            return []
+        
+        rsrp = measurements['rsrp_matrix']
+        serving_idx = measurements['serving_idx']
+        rows = np.arange(len(ues))
+        
+        # Найкращий сусід кожного UE; детальна перевірка лише для кандидатів
+        neighbours = rsrp + self.handover_offset
+        neighbours[rows, serving_idx] = -np.inf
+        best_neighbour = neighbours.max(axis=1) if neighbours.shape[1] > 1 else np.full(len(ues), -np.inf)
+        candidates = np.flatnonzero(measurements['has_serving'] &
+                                    (best_neighbour > measurements['rsrp'] + self.handover_hyst))
+        
+        profiler = self.step_profiler if self.step_profiler.enabled else None
+        if profiler:
+            profiler.count('handover_candidates', len(candidates))
+        
+        cell_ids = measurements['cell_ids']
+        events = []
+        for i in candidates:
+            ue = ues[i]
+            ue_measurements = {
+                bs_id: {
+                    'rsrp': float(rsrp[i, j]),
+                    'rsrq': float(measurements['rsrq_matrix'][i, j]),
+                    'distance': float(measurements['distance_km'][i, j])
+                }
+                for j, bs_id in enumerate(cell_ids)
+            }
+            
+            handover_decision = self.handover_algorithm.check_handover_condition(
+                current_bs_id=ue.serving_bs,
+                measurements=ue_measurements,
+                ttt=self.handover_ttt,
+                hyst=self.handover_hyst,
+                offset=self.handover_offset
+            )
+            
+            if handover_decision['execute_handover']:
+                target_bs = handover_decision['target_bs']
+                started = profiler.clock() if profiler else 0.0
+                handover_event = self.execute_handover(ue, target_bs, new_rsrp=ue_measurements[target_bs]['rsrp'])
+                events.append(handover_event)
+                if profiler:
+                    # Відхилені хендовери (перевантажена ціль) - частина рішення, а не виконання
+                    if handover_event.get('success'):
+                        profiler.lap('handover_execution', started)
+                        profiler.count('handovers_executed')
+                    else:
+                        profiler.count('handovers_rejected')
+        
+        return events
+    
     def step_simulation(self, delta_time: float = 1.0) -> Dict:
         """Один крок симуляції"""
         if not self.simulation_running:
             return {}
         
+        step_started = time.perf_counter()
         self.simulation_time += delta_time
         step_events = []
+        profiler = self.step_profiler if self.step_profiler.enabled else None
+        if profiler:
+            phase_started = profiler.begin_step()
+        
+        # Позиції від зовнішнього джерела мобільності
+        externally_moved = set()
+        if self.mobility_source is not None:
+            externally_moved = self.apply_mobility_source()
         
         # Оновлення позицій користувачів
         for ue in self.users.values():
             if ue.active:
-                ue.update_position(delta_time)
-                
-                # Перевірка хендовера
-                handover_event = self.check_handover_for_user(ue)
-                if handover_event:
-                    step_events.append(handover_event)
+                if ue.ue_id not in externally_moved:
+                    ue.update_position(delta_time)
+        
+        # Крок швидкого федингу одразу для всіх пар UE x сота
+        if self.fast_fading is not None:
+            active = [ue for ue in self.users.values() if ue.active]
+            self.fast_fading.advance(
+                delta_time,
+                [ue.ue_id for ue in active],
+                np.array([ue.speed_kmh for ue in active], dtype=np.float64),
+                list(self.base_stations.keys())
+            )
+        if profiler:
+            phase_started = profiler.lap('mobility', phase_started)
+        
+        # Вимірювання та інтерференція для всіх UE x сот, потім рішення про хендовер
+        active_users = [ue for ue in self.users.values() if ue.active]
+        measurements = self.measure_users(active_users)
+        if profiler:
+            phase_started = profiler.lap('measurement', phase_started)
+        step_events.extend(self.check_handovers(active_users, measurements))
+        if profiler:
+            phase_started = profiler.lap('handover_decision', phase_started)
         
         # Оновлення метрик базових станцій
         for bs in self.base_stations.values():
             bs.update_metrics()
+        if profiler:
+            phase_started = profiler.lap('bs_metrics', phase_started)
+        
+        # Після хендоверів SINR рахується вже відносно нових обслуговуючих сот
+        if step_events and measurements:
+            self.evaluate_interference(active_users, measurements)
+        
+        # Розподіл ресурсів сот між UE
+        self.schedule_resources(active_users, measurements)
+        if profiler:
+            phase_started = profiler.lap('scheduling', phase_started)
         
         # Оновлення загальних метрик мережі
         self.update_network_metrics()
         
-        return {
+        step_result = {
             'simulation_time': self.simulation_time,
             'events': step_events,
             'active_users': len([u for u in self.users.values() if u.active]),
             'total_handovers': self.network_metrics['total_handovers']
         }
+        
+        if self.event_listeners:
+            self._emit('step', {
+                'simulation_time': self.simulation_time,
+                'active_users': step_result['active_users'],
+                'handovers': len(step_events),
+                'total_handovers': self.network_metrics['total_handovers'],
+                'average_rsrp': self.network_metrics['average_rsrp'],
+                'network_throughput': self.network_metrics['network_throughput'],
+                'duration_s': time.perf_counter() - step_started
+            })
+        
+        if profiler:
+            profiler.lap('kpi_aggregation', phase_started)
+            profiler.end_step()
+        
+        return step_result
     
     def check_handover_for_user(self, ue) -> Optional[Dict]:
         """Перевірка необхідності хендовера для користувача"""
-        from .handover_algorithm import HandoverAlgorithm
-        
         if not ue.serving_bs or ue.serving_bs not in self.base_stations:
             return None
         
         current_bs = self.base_stations[ue.serving_bs]
-        current_rsrp = self.calculate_rsrp(ue.latitude, ue.longitude, current_bs)
+        current_rsrp = self.calculate_rsrp(ue.latitude, ue.longitude, current_bs, ue_id=ue.ue_id)
         
         # Вимірювання від усіх BS
         measurements = {}
         for bs_id, bs in self.base_stations.items():
-            rsrp = self.calculate_rsrp(ue.latitude, ue.longitude, bs)
+            rsrp = self.calculate_rsrp(ue.latitude, ue.longitude, bs, ue_id=ue.ue_id)
             rsrq = self.calculate_rsrq(rsrp)
             measurements[bs_id] = {
                 'rsrp': rsrp,
@@ -210,13 +676,12 @@ class LTENetworkEngine:
         ue.rsrq = measurements[ue.serving_bs]['rsrq']
         
         # Перевірка хендовера
-        ho_algorithm = HandoverAlgorithm()
-        handover_decision = ho_algorithm.check_handover_condition(
+        handover_decision = self.handover_algorithm.check_handover_condition(
             current_bs_id=ue.serving_bs,
             measurements=measurements,
-            ttt=280,  # мс
-            hyst=4,   # дБ
-            offset=0  # дБ
+            ttt=self.handover_ttt,
+            hyst=self.handover_hyst,
+            offset=self.handover_offset
         )
         
         if handover_decision['execute_handover']:
@@ -224,7 +689,7 @@ class LTENetworkEngine:
         
         return None
     
-    def execute_handover(self, ue, target_bs_id: str) -> Dict:
+    def execute_handover(self, ue, target_bs_id: str, new_rsrp: Optional[float] = None) -> Dict:
         """Виконання хендовера"""
         if target_bs_id not in self.base_stations:
             return {'success': False, 'reason': 'Target BS not found'}
@@ -236,17 +701,21 @@ class LTENetworkEngine:
         # Перевірка доступності цільової BS
         if target_bs.is_overloaded():
             self.network_metrics['failed_handovers'] += 1
-            return {
+            rejection = {
                 'success': False,
                 'reason': 'Target BS overloaded',
                 'ue_id': ue.ue_id,
                 'old_bs': old_bs_id,
                 'target_bs': target_bs_id
             }
+            if self.event_listeners:
+                self._emit('handover_rejected', rejection)
+            return rejection
         
         # Виконання хендовера
         old_rsrp = ue.rsrp
-        new_rsrp = self.calculate_rsrp(ue.latitude, ue.longitude, target_bs)
+        if new_rsrp is None:
+            new_rsrp = self.calculate_rsrp(ue.latitude, ue.longitude, target_bs, ue_id=ue.ue_id)
         
         # Оновлення користувача
         if old_bs:
@@ -267,12 +736,18 @@ class LTENetworkEngine:
             ho_type = 'failed'
             self.network_metrics['failed_handovers'] += 1
         
-        # Перевірка ping-pong
-        if ue.handover_count >= 2 and (datetime.now() - ue.last_handover).total_seconds() < 5:
+        # Перевірка ping-pong: повернення в соту, з якої UE пішов нещодавно
+        previous = self.last_handover_info.get(ue.ue_id)
+        pingpong = previous is not None and previous[1] == target_bs_id and \
+            self.simulation_time - previous[0] < self.pingpong_window
+        if pingpong:
             ho_type = 'pingpong'
             self.network_metrics['pingpong_handovers'] += 1
+        self.last_handover_info[ue.ue_id] = (self.simulation_time, old_bs_id)
         
         self.network_metrics['total_handovers'] += 1
+        if old_bs_id:
+            self.handover_matrix.record(old_bs_id, target_bs_id, improvement >= 3, pingpong, improvement)
         
         # Створення події хендовера
         handover_event = {
@@ -288,6 +763,8 @@ class LTENetworkEngine:
         }
         
         self.handover_events.append(handover_event)
+        if self.event_listeners:
+            self._emit('handover', handover_event)
         
         return handover_event
     
@@ -319,10 +796,54 @@ class LTENetworkEngine:
         self.stop_simulation()
         self.users.clear()
         self.handover_events.clear()
+        self.handover_matrix.clear()
+        self.last_handover_info.clear()
         for bs in self.base_stations.values():
             bs.reset()
+        if self.scheduler is not None:
+            self.scheduler.reset()
         self.simulation_time = 0.0
     
+    def enable_step_profiling(self, enabled: bool = True, reset: bool = False):
+        """Увімкнення/вимкнення таймерів фаз кроку (core/step_profiler.py)"""
+        self.step_profiler.enabled = enabled
+        if reset:
+            self.step_profiler.reset()
+    
+    def get_step_profile(self) -> Dict:
+        """p50/p95/p99 тривалості кроку та фаз, частка фаз і лічильники операцій"""
+        return self.step_profiler.get_stats()
+    
+    def serve_metrics(self, host: str = '127.0.0.1', port: int = 9108):
+        """Запуск локального ендпоінту /metrics у форматі Prometheus; повертає (host, port)"""
+        from .metrics_exporter import MetricsExporter
+        
+        if self.metrics_exporter is None:
+            self.metrics_exporter = MetricsExporter(self, host=host, port=port)
+        return self.metrics_exporter.start()
+    
+    def stop_metrics(self):
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.detach()
+            self.metrics_exporter = None
+    
+    def enable_memory_tracking(self, every_n_steps: int = 100, limits: Optional[Dict[str, float]] = None,
+                               **kwargs):
+        """Режим відстеження пам'яті: знімки структур і tracemalloc кожні every_n_steps кроків"""
+        from .memory_tracker import MemoryTracker
+        
+        self.disable_memory_tracking()
+        self.memory_tracker = MemoryTracker(self, every_n_steps=every_n_steps, limits=limits, **kwargs)
+        return self.memory_tracker
+    
+    def disable_memory_tracking(self):
+        if self.memory_tracker is not None:
+            self.memory_tracker.detach()
+            self.memory_tracker = None
+    
+    def get_memory_report(self) -> Optional[Dict]:
+        return self.memory_tracker.get_report() if self.memory_tracker is not None else None
+    
     def get_network_state(self) -> Dict:
         """Отримання поточного стану мережі"""
         return {
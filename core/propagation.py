@@ -0,0 +1,26 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Векторизована відстань між точками в кілометрах (підтримує broadcasting)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def cost_hata_path_loss(distance_km, frequency_mhz, bs_height_m: float = 30.0):
+    """Векторизовані втрати COST-Hata для міської місцевості (як у LTENetworkEngine.calculate_rsrp)"""
+    distance_km = np.asarray(distance_km, dtype=np.float64)
+    frequency_mhz = np.asarray(frequency_mhz, dtype=np.float64)
+
+    log_d = np.log10(distance_km + 0.001)
+    log_f = np.log10(frequency_mhz)
+    slope = 44.9 - 6.55 * np.log10(bs_height_m)
+
+    # 900 МГц - Okumura-Hata, 1800/2600 МГц - COST-231 з поправкою +3 дБ
+    low_band = 69.55 + 26.16 * log_f - 13.82 * np.log10(bs_height_m) + slope * log_d
+    high_band = 46.3 + 33.9 * log_f - 13.82 * np.log10(bs_height_m) + slope * log_d + 3
+    return np.where(frequency_mhz <= 1000, low_band, high_band)
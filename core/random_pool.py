@@ -0,0 +1,121 @@
+import numpy as np
+from typing import Optional, Tuple, Union
+
+Size = Union[int, Tuple[int, ...]]
+
+
+class RandomPool:
+    """Пул заздалегідь згенерованих випадкових чисел для гарячого циклу симуляції
+
+    Нормальні та рівномірні числа генеруються великими блоками з окремих
+    потоків одного seed і видаються по одному (скалярні виклики) або
+    зрізами (пакетні розрахунки). Однаковий seed та однакова послідовність
+    викликів дають однакові результати.
+    """
+
+    def __init__(self, seed: Optional[int] = None, block_size: int = 65536):
+        self.seed = seed
+        self.block_size = block_size
+
+        normal_seq, uniform_seq = np.random.SeedSequence(seed).spawn(2)
+        self._normal_gen = np.random.default_rng(normal_seq)
+        self._uniform_gen = np.random.default_rng(uniform_seq)
+
+        self._normals = self._normal_gen.standard_normal(block_size)
+        self._normal_list = self._normals.tolist()
+        self._normal_pos = 0
+
+        self._uniforms = self._uniform_gen.random(block_size)
+        self._uniform_list = self._uniforms.tolist()
+        self._uniform_pos = 0
+
+    def _refill_normals(self):
+        self._normals = self._normal_gen.standard_normal(self.block_size)
+        self._normal_list = self._normals.tolist()
+        self._normal_pos = 0
+
+    def _refill_uniforms(self):
+        self._uniforms = self._uniform_gen.random(self.block_size)
+        self._uniform_list = self._uniforms.tolist()
+        self._uniform_pos = 0
+
+    # Скалярні виклики - індексація Python-списку без накладних витрат numpy
+
+    def normal(self, loc: float = 0.0, scale: float = 1.0) -> float:
+        """Одне нормальне число N(loc, scale)"""
+        pos = self._normal_pos
+        if pos >= self.block_size:
+            self._refill_normals()
+            pos = 0
+        self._normal_pos = pos + 1
+        return loc + scale * self._normal_list[pos]
+
+    def random(self) -> float:
+        """Одне рівномірне число з [0, 1)"""
+        pos = self._uniform_pos
+        if pos >= self.block_size:
+            self._refill_uniforms()
+            pos = 0
+        self._uniform_pos = pos + 1
+        return self._uniform_list[pos]
+
+    def uniform(self, low: float = 0.0, high: float = 1.0) -> float:
+        """Одне рівномірне число з [low, high)"""
+        return low + (high - low) * self.random()
+
+    # Пакетні виклики - зрізи того ж блоку
+
+    def _take(self, kind: str, count: int) -> np.ndarray:
+        """Наступні count чисел потоку (зберігає порядок зі скалярними викликами)"""
+        block = self._normals if kind == 'normal' else self._uniforms
+        pos = self._normal_pos if kind == 'normal' else self._uniform_pos
+        refill = self._refill_normals if kind == 'normal' else self._refill_uniforms
+        generator = self._normal_gen if kind == 'normal' else self._uniform_gen
+
+        available = self.block_size - pos
+        if count <= available:
+            values = block[pos:pos + count].copy()
+            pos += count
+        else:
+            parts = [block[pos:]]
+            remaining = count - available
+            # Запити, більші за блок, беруться напряму з генератора
+            whole = (remaining // self.block_size) * self.block_size
+            if whole:
+                parts.append(generator.standard_normal(whole) if kind == 'normal'
+                             else generator.random(whole))
+            refill()
+            tail = remaining - whole
+            block = self._normals if kind == 'normal' else self._uniforms
+            parts.append(block[:tail])
+            values = np.concatenate(parts)
+            pos = tail
+
+        if kind == 'normal':
+            self._normal_pos = pos
+        else:
+            self._uniform_pos = pos
+        return values
+
+    def normals(self, size: Size, loc=0.0, scale=1.0) -> np.ndarray:
+        """Масив нормальних чисел заданої форми"""
+        shape = (size,) if np.isscalar(size) else tuple(size)
+        values = self._take('normal', int(np.prod(shape))).reshape(shape)
+        return loc + scale * values
+
+    def uniforms(self, size: Size, low=0.0, high=1.0) -> np.ndarray:
+        """Масив рівномірних чисел заданої форми"""
+        shape = (size,) if np.isscalar(size) else tuple(size)
+        values = self._take('uniform', int(np.prod(shape))).reshape(shape)
+        return low + (high - low) * values
+
+
+_default_pool: Optional[RandomPool] = None
+
+
+def get_default_pool() -> RandomPool:
+    """Спільний пул для об'єктів, створених без власного генератора"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = RandomPool()
+    return _default_pool
@@ -0,0 +1,406 @@
+import numpy as np
+import json
+import hashlib
+import os
+from typing import Dict, List, Optional, Tuple
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+from .mobility import MobilityUpdate
+from .propagation import haversine_km
+
+# Режими руху: які типи доріг (тег highway) дозволені для кожного режиму
+ROAD_MODES = ('drive', 'walk', 'bike')
+WALK_ONLY_HIGHWAYS = {'footway', 'path', 'pedestrian', 'steps', 'corridor'}
+DRIVE_ONLY_HIGHWAYS = {'motorway', 'motorway_link', 'trunk', 'trunk_link'}
+# Режим руху для профілів користувачів (єдине джерело для LTEDataGenerator.user_profiles)
+PROFILE_ROAD_MODES = {
+    'pedestrian': 'walk',
+    'cyclist': 'bike',
+    'car': 'drive',
+    'public_transport': 'drive',
+    'high_speed': 'drive'
+}
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Векторизована відстань між точками в метрах"""
+    return haversine_km(lat1, lon1, lat2, lon2) * 1000.0
+
+
+class RoadNetwork:
+    """Локальний дорожній граф, завантажений з офлайн-файлу"""
+
+    def __init__(self, node_lats: np.ndarray, node_lons: np.ndarray,
+                 edge_from: np.ndarray, edge_to: np.ndarray,
+                 edge_modes: np.ndarray, oneway: Optional[np.ndarray] = None,
+                 source_hash: str = ''):
+        self.node_lats = np.asarray(node_lats, dtype=np.float64)
+        self.node_lons = np.asarray(node_lons, dtype=np.float64)
+        self.edge_from = np.asarray(edge_from, dtype=np.int64)
+        self.edge_to = np.asarray(edge_to, dtype=np.int64)
+        # Бітова маска дозволених режимів для кожного ребра (біт i -> ROAD_MODES[i])
+        self.edge_modes = np.asarray(edge_modes, dtype=np.int8)
+        self.oneway = (np.zeros(len(self.edge_from), dtype=bool) if oneway is None
+                       else np.asarray(oneway, dtype=bool))
+        self.edge_length_m = haversine_m(self.node_lats[self.edge_from], self.node_lons[self.edge_from],
+                                         self.node_lats[self.edge_to], self.node_lons[self.edge_to])
+        self.source_hash = source_hash
+        self._graphs: Dict[str, csr_matrix] = {}
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_lats)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RoadNetwork':
+        """Завантаження графа з GeoJSON (LineString) або JSON {nodes, edges}"""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        source_hash = hashlib.sha1(raw).hexdigest()
+
+        if data.get('type') == 'FeatureCollection':
+            return cls._from_geojson(data, source_hash)
+        return cls._from_node_edge_json(data, source_hash)
+
+    @staticmethod
+    def _modes_mask(modes: Optional[List[str]] = None, highway: Optional[str] = None) -> int:
+        """Бітова маска режимів руху для ребра"""
+        if modes is None:
+            if highway in WALK_ONLY_HIGHWAYS:
+                modes = ['walk', 'bike']
+            elif highway in DRIVE_ONLY_HIGHWAYS:
+                modes = ['drive']
+            else:
+                modes = ROAD_MODES
+        return sum(1 << ROAD_MODES.index(m) for m in modes if m in ROAD_MODES)
+
+    @classmethod
+    def _from_node_edge_json(cls, data: Dict, source_hash: str) -> 'RoadNetwork':
+        node_index = {node['id']: i for i, node in enumerate(data['nodes'])}
+        lats = [node['lat'] for node in data['nodes']]
+        lons = [node['lon'] for node in data['nodes']]
+
+        edge_from, edge_to, edge_modes, oneway = [], [], [], []
+        for edge in data['edges']:
+            edge_from.append(node_index[edge['from']])
+            edge_to.append(node_index[edge['to']])
+            edge_modes.append(cls._modes_mask(edge.get('modes'), edge.get('highway')))
+            oneway.append(bool(edge.get('oneway', False)))
+
+        return cls(np.array(lats), np.array(lons), np.array(edge_from), np.array(edge_to),
+                   np.array(edge_modes), np.array(oneway), source_hash)
+
+    @classmethod
+    def _from_geojson(cls, data: Dict, source_hash: str) -> 'RoadNetwork':
+        node_index: Dict[Tuple[float, float], int] = {}
+        lats, lons = [], []
+        edge_from, edge_to, edge_modes, oneway = [], [], [], []
+
+        def node_for(coord):
+            # Вузли об'єднуються за координатами, округленими до ~0.1 м
+            key = (round(coord[1], 6), round(coord[0], 6))
+            if key not in node_index:
+                node_index[key] = len(lats)
+                lats.append(key[0])
+                lons.append(key[1])
+            return node_index[key]
+
+        for feature in data.get('features', []):
+            geometry = feature.get('geometry') or {}
+            props = feature.get('properties') or {}
+            if geometry.get('type') == 'LineString':
+                lines = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiLineString':
+                lines = geometry['coordinates']
+            else:
+                continue
+
+            mask = cls._modes_mask(props.get('modes'), props.get('highway'))
+            is_oneway = str(props.get('oneway', 'no')).lower() in ('yes', 'true', '1')
+
+            for line in lines:
+                nodes = [node_for(c) for c in line]
+                for a, b in zip(nodes[:-1], nodes[1:]):
+                    if a != b:
+                        edge_from.append(a)
+                        edge_to.append(b)
+                        edge_modes.append(mask)
+                        oneway.append(is_oneway)
+
+        return cls(np.array(lats), np.array(lons), np.array(edge_from), np.array(edge_to),
+                   np.array(edge_modes), np.array(oneway), source_hash)
+
+    def graph_for_mode(self, mode: str) -> csr_matrix:
+        """Розріджена матриця суміжності для режиму руху"""
+        if mode not in self._graphs:
+            bit = 1 << ROAD_MODES.index(mode)
+            allowed = (self.edge_modes & bit) != 0
+            # Односторонній рух обмежує лише автомобілі
+            reverse = allowed & ~(self.oneway & (mode == 'drive'))
+
+            rows = np.concatenate([self.edge_from[allowed], self.edge_to[reverse]])
+            cols = np.concatenate([self.edge_to[allowed], self.edge_from[reverse]])
+            weights = np.concatenate([self.edge_length_m[allowed], self.edge_length_m[reverse]])
+            # Нульова вага в csr означає відсутність ребра
+            weights = np.maximum(weights, 0.01)
+
+            # З паралельних ребер залишається найкоротше
+            order = np.lexsort((weights, cols, rows))
+            rows, cols, weights = rows[order], cols[order], weights[order]
+            first = np.ones(len(rows), dtype=bool)
+            first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+
+            self._graphs[mode] = csr_matrix((weights[first], (rows[first], cols[first])),
+                                            shape=(self.node_count, self.node_count))
+        return self._graphs[mode]
+
+    def main_component_nodes(self, mode: str) -> np.ndarray:
+        """Вузли найбільшої сильно зв'язної компоненти (між ними існують маршрути)"""
+        _, labels = connected_components(self.graph_for_mode(mode), directed=True, connection='strong')
+        largest = np.bincount(labels).argmax()
+        return np.flatnonzero(labels == largest)
+
+
+class RouteTable:
+    """Кеш найкоротших маршрутів між опорними вузлами у вигляді плоских полілиній
+
+    Усі маршрути склеєні в один масив вершин із монотонною кумулятивною
+    відстанню, тому положення будь-якої кількості UE знаходиться одним
+    викликом np.searchsorted.
+    """
+
+    def __init__(self, anchors: Dict[str, np.ndarray], route_mode: np.ndarray,
+                 route_origin: np.ndarray, route_dest: np.ndarray,
+                 route_start: np.ndarray, route_end: np.ndarray,
+                 vertex_lat: np.ndarray, vertex_lon: np.ndarray, vertex_cum: np.ndarray):
+        self.anchors = anchors
+        self.route_mode = route_mode      # індекс режиму в ROAD_MODES
+        self.route_origin = route_origin  # індекс опорного вузла в anchors[mode]
+        self.route_dest = route_dest
+        self.route_start = route_start    # перша вершина маршруту в плоских масивах
+        self.route_end = route_end        # остання вершина (включно)
+        self.vertex_lat = vertex_lat
+        self.vertex_lon = vertex_lon
+        self.vertex_cum = vertex_cum
+        self.route_base = vertex_cum[route_start]
+        self.route_length = vertex_cum[route_end] - self.route_base
+
+        # Маршрути, що починаються в кожному опорному вузлі: (режим, вузол) -> route_ids
+        self.routes_from: Dict[Tuple[int, int], np.ndarray] = {}
+        order = np.lexsort((route_origin, route_mode))
+        keys = np.stack([route_mode[order], route_origin[order]], axis=1)
+        if len(order):
+            boundaries = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, boundaries):
+                self.routes_from[(int(route_mode[group[0]]), int(route_origin[group[0]]))] = group
+
+    def __len__(self):
+        return len(self.route_start)
+
+    @classmethod
+    def build(cls, road_network: RoadNetwork, modes: List[str], anchors_per_mode: int = 32,
+              seed: Optional[int] = None) -> 'RouteTable':
+        """Передобчислення маршрутів між усіма парами опорних вузлів"""
+        rng = np.random.default_rng(seed)
+        anchors: Dict[str, np.ndarray] = {}
+        route_mode, route_origin, route_dest = [], [], []
+        vertices: List[np.ndarray] = []
+
+        for mode in modes:
+            candidates = road_network.main_component_nodes(mode)
+            if len(candidates) < 2:
+                continue
+            mode_anchors = rng.choice(candidates, size=min(anchors_per_mode, len(candidates)),
+                                      replace=False)
+            anchors[mode] = mode_anchors
+
+            # Один виклик Дейкстри для всіх опорних вузлів режиму
+            _, predecessors = dijkstra(road_network.graph_for_mode(mode), directed=True,
+                                       indices=mode_anchors, return_predecessors=True)
+
+            for i in range(len(mode_anchors)):
+                pred = predecessors[i]
+                for j, dest in enumerate(mode_anchors):
+                    if i == j or pred[dest] < 0:
+                        continue
+                    path = [dest]
+                    node = dest
+                    while node != mode_anchors[i]:
+                        node = pred[node]
+                        path.append(node)
+                    vertices.append(np.array(path[::-1], dtype=np.int64))
+                    route_mode.append(ROAD_MODES.index(mode))
+                    route_origin.append(i)
+                    route_dest.append(j)
+
+        if not vertices:
+            raise ValueError("Дорожній граф не містить жодного маршруту між опорними вузлами")
+
+        lengths = np.array([len(v) for v in vertices])
+        route_start = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        route_end = route_start + lengths - 1
+        flat = np.concatenate(vertices)
+        vertex_lat = road_network.node_lats[flat]
+        vertex_lon = road_network.node_lons[flat]
+
+        # Кумулятивна відстань; між маршрутами - розрив 1 м для строгої монотонності
+        step = np.zeros(len(flat))
+        step[1:] = haversine_m(vertex_lat[:-1], vertex_lon[:-1], vertex_lat[1:], vertex_lon[1:])
+        step[route_start[1:]] = 1.0
+        vertex_cum = np.cumsum(step)
+
+        return cls(anchors, np.array(route_mode), np.array(route_origin), np.array(route_dest),
+                   route_start, route_end, vertex_lat, vertex_lon, vertex_cum)
+
+    @classmethod
+    def load_or_build(cls, road_network: RoadNetwork, modes: List[str], anchors_per_mode: int = 32,
+                      seed: Optional[int] = None, cache_dir: Optional[str] = None) -> 'RouteTable':
+        """Завантаження таблиці маршрутів з дискового кешу або її побудова"""
+        if cache_dir is None:
+            return cls.build(road_network, modes, anchors_per_mode, seed)
+
+        key = hashlib.sha1(
+            f"{road_network.source_hash}|{sorted(modes)}|{anchors_per_mode}|{seed}".encode()
+        ).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"routes_{key}.npz")
+
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as data:
+                anchors = {mode: data[f'anchors_{mode}'] for mode in ROAD_MODES
+                           if f'anchors_{mode}' in data}
+                return cls(anchors, data['route_mode'], data['route_origin'], data['route_dest'],
+                           data['route_start'], data['route_end'],
+                           data['vertex_lat'], data['vertex_lon'], data['vertex_cum'])
+
+        table = cls.build(road_network, modes, anchors_per_mode, seed)
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez_compressed(
+            cache_path,
+            route_mode=table.route_mode, route_origin=table.route_origin, route_dest=table.route_dest,
+            route_start=table.route_start, route_end=table.route_end,
+            vertex_lat=table.vertex_lat, vertex_lon=table.vertex_lon, vertex_cum=table.vertex_cum,
+            **{f'anchors_{mode}': nodes for mode, nodes in table.anchors.items()}
+        )
+        return table
+
+
+class RoadMobilityModel:
+    """Рух UE вздовж дорожнього графа з кешованими маршрутами
+
+    Кожен UE їде маршрутом між двома опорними вузлами, а після прибуття
+    обирає наступний маршрут з кешу, що починається в точці прибуття.
+    Пошук шляху під час симуляції не виконується.
+    """
+
+    def __init__(self, road_network: RoadNetwork, anchors_per_mode: int = 32,
+                 seed: Optional[int] = None, cache_dir: Optional[str] = None,
+                 modes: Optional[List[str]] = None):
+        self.road_network = road_network
+        self.rng = np.random.default_rng(seed)
+        self.routes = RouteTable.load_or_build(road_network, modes or list(ROAD_MODES),
+                                               anchors_per_mode, seed, cache_dir)
+
+        self.ue_ids: List[str] = []
+        self._ue_index: Dict[str, int] = {}
+        self.route_id = np.empty(0, dtype=np.int64)
+        self.offset_m = np.empty(0)   # пройдена відстань уздовж поточного маршруту
+        self.speed_ms = np.empty(0)
+        self._last_time: Optional[float] = None
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'RoadMobilityModel':
+        return cls(RoadNetwork.from_file(path), **kwargs)
+
+    def add_users(self, user_configs: List[Dict]) -> int:
+        """Розміщення UE на маршрутах, що стартують з найближчого опорного вузла"""
+        users = [u for u in user_configs if u['id'] not in self._ue_index]
+        modes = np.array([u.get('road_mode') or PROFILE_ROAD_MODES.get(u.get('profile'), 'drive')
+                          for u in users])
+        lats = np.array([u['lat'] for u in users], dtype=np.float64)
+        lons = np.array([u['lon'] for u in users], dtype=np.float64)
+        speeds = np.array([u.get('speed', 20) for u in users], dtype=np.float64) / 3.6
+
+        route = np.full(len(users), -1, dtype=np.int64)
+        for mode, anchors in self.routes.anchors.items():
+            members = np.flatnonzero(modes == mode)
+            if not len(members):
+                continue
+
+            # Найближчий опорний вузол для всіх UE режиму однією матричною операцією
+            dist = haversine_m(lats[members, None], lons[members, None],
+                               self.road_network.node_lats[anchors][None, :],
+                               self.road_network.node_lons[anchors][None, :])
+            nearest = dist.argmin(axis=1)
+
+            for anchor in np.unique(nearest):
+                candidates = self.routes.routes_from.get((ROAD_MODES.index(mode), int(anchor)))
+                if candidates is None:
+                    continue
+                group = members[nearest == anchor]
+                route[group] = candidates[self.rng.integers(0, len(candidates), size=len(group))]
+
+        placed = np.flatnonzero(route >= 0)
+        if not len(placed):
+            return 0
+
+        for i in placed:
+            self._ue_index[users[i]['id']] = len(self.ue_ids)
+            self.ue_ids.append(users[i]['id'])
+
+        # Випадкова початкова точка вздовж маршруту, щоб UE не скупчувались у вузлах
+        offsets = self.rng.uniform(0, 1, size=len(placed)) * self.routes.route_length[route[placed]]
+        self.route_id = np.concatenate([self.route_id, route[placed]])
+        self.offset_m = np.concatenate([self.offset_m, offsets])
+        self.speed_ms = np.concatenate([self.speed_ms, speeds[placed]])
+        return len(placed)
+
+    def _switch_finished_routes(self):
+        """Перехід UE, що доїхали до кінця маршруту, на наступний кешований маршрут"""
+        routes = self.routes
+        finished = np.flatnonzero(self.offset_m >= routes.route_length[self.route_id])
+
+        while len(finished):
+            for i in finished:
+                old_route = self.route_id[i]
+                # Опорні вузли належать одній сильно зв'язній компоненті, тому з кінця
+                # будь-якого маршруту є маршрути до решти вузлів (зокрема назад)
+                candidates = routes.routes_from[(int(routes.route_mode[old_route]), int(routes.route_dest[old_route]))]
+                self.offset_m[i] -= routes.route_length[old_route]
+                self.route_id[i] = self.rng.choice(candidates)
+
+            finished = finished[self.offset_m[finished] >= routes.route_length[self.route_id[finished]]]
+
+    def advance(self, simulation_time: float) -> MobilityUpdate:
+        """Просування всіх UE вздовж маршрутів до моменту simulation_time"""
+        delta_time = 0.0 if self._last_time is None else simulation_time - self._last_time
+        self._last_time = simulation_time
+
+        if not self.ue_ids:
+            return MobilityUpdate([], np.empty(0), np.empty(0), np.empty(0), np.empty(0))
+
+        self.offset_m += self.speed_ms * delta_time
+        self._switch_finished_routes()
+
+        routes = self.routes
+        position = routes.route_base[self.route_id] + self.offset_m
+        segment = np.searchsorted(routes.vertex_cum, position, side='right') - 1
+        segment = np.clip(segment, routes.route_start[self.route_id],
+                          routes.route_end[self.route_id] - 1)
+
+        seg_len = routes.vertex_cum[segment + 1] - routes.vertex_cum[segment]
+        frac = np.clip((position - routes.vertex_cum[segment]) / np.maximum(seg_len, 1e-9), 0.0, 1.0)
+
+        lat0, lon0 = routes.vertex_lat[segment], routes.vertex_lon[segment]
+        dlat = routes.vertex_lat[segment + 1] - lat0
+        dlon = routes.vertex_lon[segment + 1] - lon0
+        direction = np.degrees(np.arctan2(dlon * np.cos(np.radians(lat0)), dlat)) % 360
+
+        return MobilityUpdate(
+            ue_ids=list(self.ue_ids),
+            latitudes=lat0 + frac * dlat,
+            longitudes=lon0 + frac * dlon,
+            speeds_kmh=self.speed_ms * 3.6,
+            directions=direction
+        )
@@ -0,0 +1,141 @@
+import html
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+Stack = Tuple[str, ...]
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Статистичний профілювальник одного потоку на стандартній бібліотеці
+
+    profile(fn) виконує fn в окремому потоці, а потік-семплер кожні
+    interval_s знімає стек лише цього потоку через sys._current_frames().
+    Рендеринг сторінок та інші потоки у вибірку не потрапляють. Результат -
+    згорнуті стеки (формат flamegraph.pl/speedscope), SVG flame graph та
+    таблиця функцій за власним і сукупним часом.
+    """
+
+    def __init__(self, interval_s: float = 0.005, max_depth: int = 128):
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.duration_s = 0.0
+
+    def profile(self, fn: Callable, *args, **kwargs):
+        """Виконання fn(*args, **kwargs) під семплером; повертає результат fn"""
+        outcome = {}
+        done = threading.Event()
+
+        def target():
+            try:
+                outcome['result'] = fn(*args, **kwargs)
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                done.set()
+
+        worker = threading.Thread(target=target, name="engine-profile", daemon=True)
+        started = time.perf_counter()
+        worker.start()
+        while not done.wait(self.interval_s):
+            self._sample(worker.ident, target.__code__)
+        worker.join()
+        self.duration_s += time.perf_counter() - started
+
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('result')
+
+    def _sample(self, thread_id: int, root_code):
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None and frame.f_code is not root_code and len(stack) < self.max_depth:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            stack.reverse()
+            self.samples[tuple(stack)] += 1
+            self.sample_count += 1
+
+    def folded(self) -> str:
+        """Згорнуті стеки: 'корінь;...;лист кількість' по рядку на стек"""
+        return '\n'.join(f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()) + '\n'
+
+    def top_functions(self, limit: Optional[int] = 30) -> List[Dict]:
+        """Функції за власними (лист стеку) та сукупними (будь-де в стеку) вибірками"""
+        own, total = Counter(), Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+
+        rows = []
+        for label, count in total.most_common():
+            rows.append({
+                'function': label,
+                'self_samples': own[label],
+                'total_samples': count,
+                'self_pct': own[label] / self.sample_count * 100,
+                'total_pct': count / self.sample_count * 100
+            })
+        rows.sort(key=lambda row: (row['self_samples'], row['total_samples']), reverse=True)
+        return rows[:limit] if limit else rows
+
+    def flamegraph_svg(self, title: str = "Flame graph", width: int = 1200, frame_height: int = 16) -> str:
+        """Самодостатній SVG flame graph (корінь знизу, ширина - частка вибірок)"""
+        tree = {'value': 0, 'children': {}}
+        depth = 0
+        for stack, count in self.samples.items():
+            node = tree
+            node['value'] += count
+            for label in stack:
+                node = node['children'].setdefault(label, {'value': 0, 'children': {}})
+                node['value'] += count
+            depth = max(depth, len(stack))
+
+        header = 24
+        height = header + (depth + 1) * frame_height
+        scale = width / max(tree['value'], 1)
+        rects = []
+
+        def layout(name: str, node: Dict, x: float, level: int):
+            box_width = node['value'] * scale
+            if box_width < 0.3:
+                return
+            y = height - (level + 1) * frame_height
+            hue = zlib.crc32(name.encode()) % 55
+            share = node['value'] / max(tree['value'], 1) * 100
+            label = html.escape(name)
+            text = ''
+            if box_width > 30:
+                chars = int(box_width / 7)
+                shown = name if len(name) <= chars else name[:max(chars - 2, 1)] + '..'
+                text = f'<text x="{x + 3:.1f}" y="{y + frame_height - 4}">{html.escape(shown)}</text>'
+            rects.append(
+                f'<g><title>{label} ({node["value"]} вибірок, {share:.1f}%)</title>'
+                f'<rect x="{x:.1f}" y="{y}" width="{box_width:.1f}" height="{frame_height - 1}" '
+                f'fill="hsl({hue}, 85%, 60%)" rx="2"/>{text}</g>'
+            )
+            child_x = x
+            for child_name, child in sorted(node['children'].items()):
+                layout(child_name, child, child_x, level + 1)
+                child_x += child['value'] * scale
+
+        layout('all', tree, 0.0, 0)
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'font-family="monospace" font-size="11">'
+            f'<rect width="100%" height="100%" fill="#fdfdf6"/>'
+            f'<text x="{width / 2}" y="16" text-anchor="middle" font-size="14">{html.escape(title)}</text>'
+            + ''.join(rects) + '</svg>'
+        )
@@ -0,0 +1,94 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+# Кількість фізичних ресурсних блоків (PRB) для смуг LTE
+BANDWIDTH_TO_PRBS = {1.4: 6, 3: 15, 5: 25, 10: 50, 15: 75, 20: 100}
+PRB_BANDWIDTH_MHZ = 0.18
+
+
+def prbs_for_bandwidth(bandwidth_mhz: float) -> int:
+    """Кількість PRB для смуги (нестандартні смуги - пропорційно)"""
+    if bandwidth_mhz in BANDWIDTH_TO_PRBS:
+        return BANDWIDTH_TO_PRBS[bandwidth_mhz]
+    return max(1, int(bandwidth_mhz * 5))
+
+
+class ResourceScheduler:
+    """Розподіл PRB соти між підключеними UE для всіх сот одночасно
+
+    Політики: round_robin (рівні частки), proportional_fair (частки
+    пропорційні миттєвій швидкості, поділеній на середню) та max_ci (усі
+    PRB отримує UE з найкращим каналом). Усі агрегації по сотах - сегментні
+    редукції np.bincount за масивом індексів обслуговуючих сот.
+    """
+
+    POLICIES = ('round_robin', 'proportional_fair', 'max_ci')
+
+    def __init__(self, policy: str = 'proportional_fair', pf_time_constant: float = 20.0):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Невідома політика планувальника: {policy}")
+        self.policy = policy
+        self.pf_time_constant = pf_time_constant  # вікно усереднення PF (кроки)
+        self.average_rate: Dict[str, float] = {}
+
+    def schedule(self, serving_idx: np.ndarray, cell_prbs: np.ndarray,
+                 prb_rate_mbps: np.ndarray, ue_cap_mbps: np.ndarray,
+                 ue_ids: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Розподіл ресурсів
+
+        serving_idx   - індекс соти кожного UE (-1: UE не обслуговується)
+        cell_prbs     - кількість PRB кожної соти
+        prb_rate_mbps - швидкість UE на одному PRB (з його SINR)
+        ue_cap_mbps   - обмеження категорії пристрою
+        """
+        n_ue = len(serving_idx)
+        n_cells = len(cell_prbs)
+
+        scheduled = (serving_idx >= 0) & (prb_rate_mbps > 0)
+        cells = np.where(scheduled, serving_idx, 0)
+
+        if self.policy == 'round_robin':
+            weight = scheduled.astype(np.float64)
+        elif self.policy == 'proportional_fair':
+            avg = np.array([self.average_rate.get(ue_id, 0.0) for ue_id in ue_ids]) \
+                if ue_ids is not None else np.zeros(n_ue)
+            # Миттєва швидкість на всій смузі соти; новий UE стартує з рівної частки
+            instant = prb_rate_mbps * cell_prbs[cells]
+            cell_users = np.bincount(cells, weights=scheduled.astype(np.float64), minlength=n_cells)
+            avg = np.where(avg > 0, avg, instant / np.maximum(cell_users[cells], 1))
+            weight = np.where(scheduled, instant / np.maximum(avg, 1e-9), 0.0)
+        else:
+            weight = np.zeros(n_ue)
+            candidates = np.flatnonzero(scheduled)
+            if len(candidates):
+                # Сегментний argmax: сортування за сотою, далі за спаданням швидкості
+                order = candidates[np.lexsort((-prb_rate_mbps[candidates], cells[candidates]))]
+                first = np.ones(len(order), dtype=bool)
+                first[1:] = cells[order][1:] != cells[order][:-1]
+                weight[order[first]] = 1.0
+
+        weight_sum = np.bincount(cells, weights=weight, minlength=n_cells)
+        share = np.where(scheduled, weight / np.maximum(weight_sum[cells], 1e-12), 0.0)
+        prbs = share * cell_prbs[cells]
+
+        throughput = np.minimum(prbs * prb_rate_mbps, ue_cap_mbps)
+        throughput = np.where(scheduled, throughput, 0.0)
+        # PRB, фактично використані UE з обмеженням категорії
+        prbs = np.where(scheduled, throughput / np.maximum(prb_rate_mbps, 1e-12), 0.0)
+
+        if self.policy == 'proportional_fair' and ue_ids is not None:
+            alpha = 1.0 / self.pf_time_constant
+            new_avg = (1 - alpha) * np.array([self.average_rate.get(ue_id, 0.0) for ue_id in ue_ids]) \
+                + alpha * throughput
+            self.average_rate = dict(zip(ue_ids, new_avg.tolist()))
+
+        return {
+            'ue_prbs': prbs,
+            'ue_throughput': throughput,
+            'cell_throughput': np.bincount(cells, weights=throughput, minlength=n_cells),
+            'cell_used_prbs': np.bincount(cells, weights=prbs, minlength=n_cells),
+            'cell_users': np.bincount(cells, weights=scheduled.astype(np.float64), minlength=n_cells)
+        }
+
+    def reset(self):
+        self.average_rate.clear()
@@ -0,0 +1,138 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class SimulationRunner:
+    """Виконання кроків симуляції у фоновому потоці, незалежно від рендерингу сторінок
+
+    Крок і зняття знімка стану виконуються під self.lock; після кожного
+    кроку знімок атомарно замінюється, тому читачі (сторінки) отримують
+    узгоджений стан без блокування. Керуючі зміни (додавання UE, скидання)
+    виконуються через execute() під тим самим lock між кроками.
+    """
+
+    def __init__(self, step_fn: Callable[[], Any], snapshot_fn: Optional[Callable[[], Dict]] = None,
+                 interval_s: float = 1.0, name: str = "simulation-runner"):
+        self.step_fn = step_fn
+        self.snapshot_fn = snapshot_fn
+        self.interval_s = interval_s  # реальний час між кроками симуляції
+        self.name = name
+
+        self.lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot: Dict = {}
+
+        self.step_count = 0
+        self.last_step_duration = 0.0
+        self.last_error: Optional[str] = None
+
+        self.refresh_snapshot()
+
+    @classmethod
+    def for_engine(cls, engine, interval_s: float = 1.0) -> 'SimulationRunner':
+        """Раннер для LTENetworkEngine: крок step_simulation, знімок get_network_state"""
+        return cls(lambda: engine.step_simulation(engine.time_step), engine.get_network_state,
+                   interval_s=interval_s, name="lte-engine")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Запуск фонового потоку (повторний виклик нічого не робить)"""
+        if self.running:
+            if self._stop_event.is_set():
+                # Попередня зупинка не дочекалась потоку: він продовжує роботу замість другого
+                self._thread.join(self.interval_s + 5)
+                if self._thread.is_alive():
+                    self._stop_event.clear()
+                    return
+            else:
+                return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Зупинка потоку після завершення поточного кроку; True, якщо потік завершився
+
+        Не можна викликати під self.lock (напр. через execute()): потік кроків
+        чекає на цей lock і не встигне завершитись до кінця очікування.
+        """
+        self._stop_event.set()
+        thread = self._thread
+        if thread is None:
+            return True
+        if thread is not threading.current_thread():
+            thread.join(timeout if timeout is not None else self.interval_s + 5)
+            if thread.is_alive():
+                return False
+        self._thread = None
+        return True
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            self.step()
+            # Фіксований темп кроків; після затримки графік не "доганяє" пропущене
+            next_tick = max(next_tick + self.interval_s, time.monotonic())
+            self._stop_event.wait(max(0.0, next_tick - time.monotonic()))
+
+    def step(self):
+        """Один крок симуляції (також доступний для ручного покрокового режиму)"""
+        started = time.perf_counter()
+        with self.lock:
+            try:
+                self.step_fn()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Помилка кроку симуляції: {self.last_error}")
+            self.step_count += 1
+            self._refresh_snapshot_locked()
+        self.last_step_duration = time.perf_counter() - started
+
+    def execute(self, fn: Callable, *args, **kwargs):
+        """Виконання керуючої дії над станом симуляції між кроками"""
+        with self.lock:
+            result = fn(*args, **kwargs)
+            self._refresh_snapshot_locked()
+        return result
+
+    def profile_steps(self, n_steps: int, interval_s: float = 0.005):
+        """n_steps кроків поспіль під семплюючим профілювальником (лише потік кроків)"""
+        from .sampling_profiler import SamplingProfiler
+
+        profiler = SamplingProfiler(interval_s=interval_s)
+
+        def run():
+            # Фоновий потік чекає на lock, тож усі n_steps виконуються в профільованому потоці
+            with self.lock:
+                for _ in range(n_steps):
+                    self.step()
+
+        profiler.profile(run)
+        return profiler
+
+    def refresh_snapshot(self):
+        with self.lock:
+            self._refresh_snapshot_locked()
+
+    def _refresh_snapshot_locked(self):
+        if self.snapshot_fn is not None:
+            self._snapshot = self.snapshot_fn()
+
+    def snapshot(self) -> Dict:
+        """Останній узгоджений знімок стану (не змінюється після публікації)"""
+        return self._snapshot
+
+    def get_status(self) -> Dict:
+        return {
+            'running': self.running,
+            'interval_s': self.interval_s,
+            'step_count': self.step_count,
+            'last_step_duration': self.last_step_duration,
+            'last_error': self.last_error
+        }
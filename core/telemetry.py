@@ -0,0 +1,327 @@
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Кадр потоку: 4 байти довжини (big-endian) + закодоване повідомлення
+FRAME_HEADER = struct.Struct('>I')
+CODECS = ('msgpack', 'json')
+
+Address = Union[Tuple[str, int], str]
+
+
+def _to_builtin(obj):
+    """Перетворення типів numpy/datetime для серіалізації"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (set, tuple)):
+        return list(obj)
+    raise TypeError(f"Тип не підтримується телеметрією: {type(obj).__name__}")
+
+
+def resolve_codec(codec: str = 'auto') -> str:
+    """msgpack, якщо пакет встановлено, інакше JSON"""
+    if codec == 'auto':
+        try:
+            import msgpack  # noqa: F401
+            return 'msgpack'
+        except ImportError:
+            return 'json'
+    if codec not in CODECS:
+        raise ValueError(f"Невідомий кодек телеметрії: {codec}")
+    if codec == 'msgpack':
+        try:
+            import msgpack  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Для кодека msgpack потрібен пакет msgpack") from e
+    return codec
+
+
+def encode_message(message: Dict, codec: str) -> bytes:
+    if codec == 'msgpack':
+        import msgpack
+        return msgpack.packb(message, default=_to_builtin, use_bin_type=True)
+    return json.dumps(message, default=_to_builtin, separators=(',', ':')).encode()
+
+
+def decode_message(payload: bytes, codec: str) -> Dict:
+    if codec == 'msgpack':
+        import msgpack
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+def _frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class _Subscriber:
+    """Черга кадрів одного підписника з відкиданням найстаріших при переповненні"""
+
+    def __init__(self, connection: socket.socket, queue_size: int):
+        self.connection = connection
+        self.queue = deque(maxlen=queue_size)
+        self.ready = threading.Condition()
+        self.dropped = 0
+        self.sent = 0
+        self.closed = False
+
+    def push(self, frame: bytes):
+        with self.ready:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(frame)
+            self.ready.notify()
+
+    def run(self):
+        """Потік відправлення: повільний споживач блокує лише власний потік"""
+        try:
+            while True:
+                with self.ready:
+                    while not self.queue and not self.closed:
+                        self.ready.wait()
+                    if self.closed and not self.queue:
+                        return
+                    frames = list(self.queue)
+                    self.queue.clear()
+                self.connection.sendall(b''.join(frames))
+                self.sent += len(frames)
+        except OSError:
+            pass
+        finally:
+            self.closed = True
+            try:
+                self.connection.close()
+            except OSError:
+                pass
+
+    def close(self):
+        with self.ready:
+            self.closed = True
+            self.ready.notify()
+
+
+class TelemetryPublisher:
+    """Публікація телеметрії симуляції через локальний TCP або Unix-сокет
+
+    Кожне повідомлення кодується один раз і додається в обмежену чергу
+    кожного підписника; при переповненні відкидаються найстаріші кадри,
+    тому повільні споживачі не гальмують симуляцію. Перший кадр для
+    нового підписника - 'hello' у JSON з назвою кодека потоку.
+    """
+
+    def __init__(self, address: Address = ('127.0.0.1', 0), codec: str = 'auto',
+                 queue_size: int = 1000):
+        self.requested_address = address
+        self.codec = resolve_codec(codec)
+        self.queue_size = queue_size
+
+        self._server: Optional[socket.socket] = None
+        self._accept_thread: Optional[threading.Thread] = None
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self.sequence = 0
+
+    @property
+    def address(self) -> Optional[Address]:
+        """Фактична адреса (для TCP з портом 0 - призначений системою порт)"""
+        if self._server is None:
+            return None
+        return self._server.getsockname()
+
+    def start(self) -> Address:
+        if self._running:
+            return self.address
+
+        if isinstance(self.requested_address, str):
+            if os.path.exists(self.requested_address):
+                os.remove(self.requested_address)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(self.requested_address)
+        server.listen()
+        server.settimeout(0.5)
+
+        self._server = server
+        self._running = True
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="telemetry-accept", daemon=True)
+        self._accept_thread.start()
+        return self.address
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                connection, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            connection.settimeout(None)
+            subscriber = _Subscriber(connection, self.queue_size)
+            subscriber.push(_frame(json.dumps({'topic': 'hello', 'codec': self.codec}).encode()))
+            with self._lock:
+                self._subscribers.append(subscriber)
+            threading.Thread(target=subscriber.run, name="telemetry-subscriber", daemon=True).start()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if not s.closed]
+            return len(self._subscribers)
+
+    def publish(self, topic: str, payload: Dict):
+        """Публікація повідомлення всім підписникам (без очікування мережі)"""
+        if not self._running or not self.subscriber_count:
+            return
+
+        self.sequence += 1
+        message = {'topic': topic, 'seq': self.sequence, 'ts': time.time(), 'data': payload}
+        frame = _frame(encode_message(message, self.codec))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(frame)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            'codec': self.codec,
+            'subscribers': sum(1 for s in subscribers if not s.closed),
+            'published': self.sequence,
+            'sent': sum(s.sent for s in subscribers),
+            'dropped': sum(s.dropped for s in subscribers)
+        }
+
+    def stop(self):
+        self._running = False
+        if self._server is not None:
+            self._server.close()
+        if self._accept_thread is not None:
+            self._accept_thread.join(timeout=2)
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber.close()
+            self._subscribers.clear()
+        if isinstance(self.requested_address, str) and os.path.exists(self.requested_address):
+            os.remove(self.requested_address)
+        self._server = None
+
+
+class TelemetrySubscriber:
+    """Клієнт потоку телеметрії (для зовнішніх скриптів аналізу)"""
+
+    def __init__(self, address: Address, timeout: Optional[float] = None):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.connection = socket.socket(family, socket.SOCK_STREAM)
+        self.connection.settimeout(timeout)
+        self.connection.connect(address)
+        self.codec: Optional[str] = None  # з першого кадру 'hello'
+        self._reader = self.connection.makefile('rb')
+
+    def _read_frame(self) -> Optional[bytes]:
+        header = self._reader.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            return None
+        (length,) = FRAME_HEADER.unpack(header)
+        payload = self._reader.read(length)
+        return payload if len(payload) == length else None
+
+    def __iter__(self) -> Iterator[Dict]:
+        while True:
+            payload = self._read_frame()
+            if payload is None:
+                return
+            if self.codec is None:
+                self.codec = json.loads(payload)['codec']
+                continue
+            yield decode_message(payload, self.codec)
+
+    def close(self):
+        self._reader.close()
+        self.connection.close()
+
+
+class EngineTelemetry:
+    """Публікація подій LTENetworkEngine: підсумки кроків, хендовери та дельти стану
+
+    Дельти містять лише UE та соти, стан яких змінився з попереднього
+    кроку, у стовпцевому вигляді. Якщо підписників немає, дельти не
+    обчислюються взагалі.
+    """
+
+    def __init__(self, engine, publisher: TelemetryPublisher, position_epsilon_deg: float = 1e-5):
+        self.engine = engine
+        self.publisher = publisher
+        self.position_epsilon_deg = position_epsilon_deg  # ~1 м
+        self._last_ues: Dict[str, Tuple] = {}
+        self._last_cells: Dict[str, Tuple] = {}
+        engine.add_listener(self.on_event)
+
+    def detach(self):
+        self.engine.remove_listener(self.on_event)
+
+    def on_event(self, topic: str, payload: Dict):
+        if not self.publisher.subscriber_count:
+            # Без підписників наступна дельта буде повним станом
+            self._last_ues.clear()
+            self._last_cells.clear()
+            return
+
+        self.publisher.publish(topic, payload)
+        if topic == 'step':
+            self.publish_deltas()
+
+    def publish_deltas(self):
+        ues = list(self.engine.users.values())
+        eps = self.position_epsilon_deg
+        current = {
+            ue.ue_id: (round(ue.latitude / eps), round(ue.longitude / eps), ue.serving_bs,
+                       round(ue.rsrp, 1), round(ue.throughput, 2))
+            for ue in ues
+        }
+        changed = [ue for ue in ues if self._last_ues.get(ue.ue_id) != current[ue.ue_id]]
+        removed = [ue_id for ue_id in self._last_ues if ue_id not in current]
+        self._last_ues = current
+
+        if changed or removed:
+            self.publisher.publish('ue_delta', {
+                'ue_id': [ue.ue_id for ue in changed],
+                'lat': [ue.latitude for ue in changed],
+                'lon': [ue.longitude for ue in changed],
+                'serving_bs': [ue.serving_bs for ue in changed],
+                'rsrp': [ue.rsrp for ue in changed],
+                'throughput': [ue.throughput for ue in changed],
+                'removed': removed
+            })
+
+        cells = list(self.engine.base_stations.values())
+        current_cells = {
+            bs.bs_id: (len(bs.connected_users), round(bs.load_percentage, 1), round(bs.throughput_mbps, 2))
+            for bs in cells
+        }
+        changed_cells = [bs for bs in cells if self._last_cells.get(bs.bs_id) != current_cells[bs.bs_id]]
+        self._last_cells = current_cells
+
+        if changed_cells:
+            self.publisher.publish('cell_delta', {
+                'bs_id': [bs.bs_id for bs in changed_cells],
+                'users': [len(bs.connected_users) for bs in changed_cells],
+                'load': [bs.load_percentage for bs in changed_cells],
+                'throughput': [bs.throughput_mbps for bs in changed_cells]
+            })
@@ -0,0 +1,85 @@
+import threading
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+class UEAttributeTable:
+    """Таблиця атрибутів UE з ключем ue_id для з'єднання з журналом подій
+
+    Кожен UE отримує сталий цілий номер рядка (dict-індекс), атрибути
+    зберігаються стовпцями. Останні відомі атрибути залишаються і після
+    виходу UE з мережі, тому старі події теж з'єднуються. join() шукає
+    рядки для всіх подій одним векторним get_indexer, тобто кореляція та
+    розбивки за класами працюють за лінійний час від кількості подій.
+    """
+
+    COLUMNS = ('speed', 'device_type', 'mobility_class')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.index: Dict[str, int] = {}
+        self.ue_ids: List[str] = []
+        self.columns: Dict[str, List] = {name: [] for name in self.COLUMNS}
+        self._key_index = None  # pd.Index по ue_ids, перебудовується при появі нових UE
+
+    def __len__(self) -> int:
+        return len(self.ue_ids)
+
+    def upsert(self, ue_id: str, **attributes):
+        with self._lock:
+            self._upsert_locked(ue_id, attributes)
+
+    def _upsert_locked(self, ue_id: str, attributes: Dict):
+        row = self.index.get(ue_id)
+        if row is None:
+            row = len(self.ue_ids)
+            self.index[ue_id] = row
+            self.ue_ids.append(ue_id)
+            for name in self.COLUMNS:
+                self.columns[name].append(attributes.get(name))
+            self._key_index = None
+            return
+        for name, value in attributes.items():
+            self.columns[name][row] = value
+
+    def update_from_engine(self, ues: Iterable):
+        """Оновлення атрибутів з об'єктів UserEquipment"""
+        with self._lock:
+            for ue in ues:
+                self._upsert_locked(ue.ue_id, {
+                    'speed': ue.speed_kmh,
+                    'device_type': ue.device_type,
+                    'mobility_class': ue.get_mobility_state()
+                })
+
+    def clear(self):
+        with self._lock:
+            self.index.clear()
+            self.ue_ids.clear()
+            for values in self.columns.values():
+                values.clear()
+            self._key_index = None
+
+    def to_frame(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.DataFrame({name: list(values) for name, values in self.columns.items()},
+                                index=pd.Index(list(self.ue_ids), name='ue_id'))
+
+    def join(self, events: pd.DataFrame, on: str = 'user_id') -> pd.DataFrame:
+        """Додавання атрибутів UE до подій; для невідомих UE атрибути порожні"""
+        with self._lock:
+            if self._key_index is None:
+                self._key_index = pd.Index(self.ue_ids)
+            rows = self._key_index.get_indexer(events[on])
+            columns = {name: np.asarray(values, dtype=object) for name, values in self.columns.items()}
+
+        known = rows >= 0
+        joined = events.copy()
+        for name, values in columns.items():
+            column = np.full(len(rows), None, dtype=object)
+            column[known] = values[rows[known]]
+            joined[name] = column
+        joined['speed'] = pd.to_numeric(joined['speed'])
+        return joined
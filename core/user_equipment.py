@@ -1,5 +1,4 @@
 import numpy as np
-import random
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 import uuid
@@ -7,15 +6,32 @@ import uuid
 class UserEquipment:
     """Клас для представлення користувацького обладнання (UE)"""
     
+    # Максимальна пропускна здатність за категорією LTE, Мбіт/с
+    CATEGORY_THROUGHPUT = {
+        1: 10,
+        4: 150,
+        6: 300,
+        9: 450,
+        12: 600,
+        16: 979
+    }
+    
+    # Межі руху за замовчуванням (м. Вінниця): lat_min, lat_max, lon_min, lon_max
+    DEFAULT_BOUNDS = (49.20, 49.27, 28.42, 28.55)
+    
     def __init__(self, ue_id: str, latitude: float, longitude: float,
                  speed_kmh: float = 20, direction: float = 0,
-                 device_type: str = "smartphone"):
+                 device_type: str = "smartphone", rng=None, bounds=None):
+        from .random_pool import get_default_pool
+        
         self.ue_id = ue_id
         self.latitude = latitude
         self.longitude = longitude
         self.speed_kmh = speed_kmh
         self.direction = direction  # градуси (0-360)
         self.device_type = device_type
+        self.rng = rng if rng is not None else get_default_pool()
+        self.bounds = bounds if bounds is not None else self.DEFAULT_BOUNDS
         
         # Поточний стан з'єднання
         self.serving_bs: Optional[str] = None
@@ -23,6 +39,8 @@ class UserEquipment:
         self.rsrq = -12.0  # дБ
         self.sinr = 10.0   # дБ
         self.throughput = 0.0  # Мбіт/с
+        self.cqi = 0
+        self.mcs = -1
         
         # Стан активності
         self.active = True
@@ -58,25 +76,20 @@ class UserEquipment:
     def _determine_device_category(self) -> int:
         """Визначення категорії пристрою LTE"""
         device_categories = {
-            "smartphone": random.choice([4, 6, 9, 12]),
-            "tablet": random.choice([6, 9, 12]),
-            "laptop": random.choice([9, 12, 16]),
-            "iot_device": random.choice([1, 4]),
-            "car": random.choice([12, 16])
+            "smartphone": [4, 6, 9, 12],
+            "tablet": [6, 9, 12],
+            "laptop": [9, 12, 16],
+            "iot_device": [1, 4],
+            "car": [12, 16]
         }
-        return device_categories.get(self.device_type, 4)
+        choices = device_categories.get(self.device_type)
+        if choices is None:
+            return 4
+        return choices[int(self.rng.random() * len(choices))]
     
     def _get_max_throughput(self) -> float:
         """Максимальна пропускна здатність на основі категорії"""
-        category_throughput = {
-            1: 10,    # Мбіт/с
-            4: 150,
-            6: 300,
-            9: 450,
-            12: 600,
-            16: 979
-        }
-        return category_throughput.get(self.device_category, 150)
+        return self.CATEGORY_THROUGHPUT.get(self.device_category, 150)
     
     def _get_power_class(self) -> int:
         """Клас потужності пристрою"""
@@ -104,13 +117,14 @@ class UserEquipment:
         self.latitude += lat_change
         self.longitude += lon_change
         
-        # Обмеження координат (для Вінниці)
-        self.latitude = np.clip(self.latitude, 49.20, 49.27)
-        self.longitude = np.clip(self.longitude, 28.42, 28.55)
+        # Обмеження координат межами області руху (за замовчуванням - Вінниця)
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        self.latitude = np.clip(self.latitude, lat_min, lat_max)
+        self.longitude = np.clip(self.longitude, lon_min, lon_max)
         
         # Випадкова зміна напряму (5% ймовірність)
-        if random.random() < 0.05:
-            self.direction = random.uniform(0, 360)
+        if self.rng.random() < 0.05:
+            self.direction = self.rng.uniform(0, 360)
         
         self.last_update = datetime.now()
     
@@ -136,41 +150,36 @@ class UserEquipment:
             points.append((lat, lon))
         self.path_points = points
     
-    def update_signal_quality(self, rsrp: float, rsrq: float, sinr: float = None):
+    def update_signal_quality(self, rsrp: float, rsrq: float, sinr: float = None,
+                              throughput: float = None):
         """Оновлення параметрів якості сигналу"""
         self.rsrp = rsrp
         self.rsrq = rsrq
         if sinr is not None:
             self.sinr = sinr
         
-        # Розрахунок пропускної здатності на основі SINR
-        self.throughput = self._calculate_throughput()
+        # Розрахунок пропускної здатності на основі SINR (або частка від планувальника)
+        if throughput is not None:
+            self.throughput = throughput
+        else:
+            self.throughput = self._calculate_throughput()
         
         # Оновлення статусу з'єднання
         self.connected = self.rsrp > -110  # мінімальний поріг
     
     def _calculate_throughput(self) -> float:
-        """Розрахунок поточної пропускної здатності"""
+        """Розрахунок пропускної здатності за таблицями CQI/MCS (уся смуга 20 МГц)"""
+        from .link_adaptation import get_default_table
+        from .scheduler import prbs_for_bandwidth
+        
         if not self.connected or self.rsrp < -110:
             return 0.0
         
-        # Спрощена модель на основі SINR
-        if self.sinr >= 20:
-            efficiency = 0.9
-        elif self.sinr >= 10:
-            efficiency = 0.7
-        elif self.sinr >= 0:
-            efficiency = 0.4
-        else:
-            efficiency = 0.1
-        
-        # Урахування навантаження та інтерференції
-        base_throughput = self.max_throughput * efficiency
-        
-        # Випадкові флуктуації
-        variation = random.uniform(0.8, 1.2)
+        link = get_default_table().lookup(np.array([self.sinr]), np.array([self.device_category]))
+        self.cqi = int(link['cqi'][0])
+        self.mcs = int(link['mcs'][0])
         
-        return min(self.max_throughput, base_throughput * variation)
+        return min(self.max_throughput, float(link['prb_rate_mbps'][0]) * prbs_for_bandwidth(20))
     
     def execute_handover(self, old_bs: str, new_bs: str, old_rsrp: float, new_rsrp: float):
         """Виконання хендовера"""
@@ -278,6 +287,8 @@ class UserEquipment:
             'rsrp': self.rsrp,
             'rsrq': self.rsrq,
             'sinr': self.sinr,
+            'cqi': self.cqi,
+            'mcs': self.mcs,
             'throughput': self.throughput,
             'active': self.active,
             'connected': self.connected,
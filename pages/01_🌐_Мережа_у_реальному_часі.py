@@ -4,121 +4,210 @@ import plotly.express as px
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from utils.dashboard_state import get_render_cache, get_session_id, get_shared_dashboard
 
 st.title("🌐 Живий моніторинг мережі")
 
-# Перевірка ініціалізації
-if 'handover_events' not in st.session_state:
-    st.warning("Спочатку запустіть головну сторінку симулятора!")
-    st.stop()
+# Спільна для всіх сесій симуляція (сторінка лише читає знімки)
+dashboard = get_shared_dashboard()
+session_id = get_session_id()
+runner = dashboard.runner
+render_cache = get_render_cache()
+refresh_interval = st.sidebar.slider("Оновлення графіків (с)", 1, 10, 2)
 
-# Графіки в реальному часі
-col1, col2 = st.columns(2)
+# Історія KPI: період та відстежувані UE
+KPI_PERIODS = {"15 хвилин": 900, "1 година": 3600, "1 доба": 86400, "Весь час": None}
+NETWORK_KPIS = {
+    'network.active_users': "Активні користувачі",
+    'network.average_rsrp': "Середня RSRP (дБм)",
+    'network.throughput': "Пропускна здатність мережі (Мбіт/с)",
+    'network.handovers': "Хендовери за крок"
+}
+CELL_KPIS = {'load': "навантаження (%)", 'users': "користувачі", 'throughput': "throughput (Мбіт/с)"}
+UE_KPIS = {'rsrp': "RSRP (дБм)", 'throughput': "throughput (Мбіт/с)"}
+STEP_PHASES = {
+    'mobility': "Мобільність",
+    'measurement': "Вимірювання RSRP/SINR",
+    'handover_decision': "Рішення про хендовер",
+    'handover_execution': "Виконання хендоверів",
+    'bs_metrics': "Метрики BS",
+    'scheduling': "Розподіл ресурсів",
+    'kpi_aggregation': "Агрегація KPI"
+}
+STEP_COUNTERS = {
+    'steps': "Кроки",
+    'rsrp_evaluations': "Обчислення RSRP",
+    'handover_candidates': "Кандидати на хендовер",
+    'handovers_executed': "Виконані хендовери",
+    'handovers_rejected': "Відхилені хендовери"
+}
 
-with col1:
-    st.subheader("📈 RSRP користувачів")
-    
-    if st.session_state.users:
-        # Підготовка даних для графіка
-        user_data = []
-        for user in st.session_state.users:
-            if user['active']:
-                user_data.append({
-                    'Користувач': user['id'],
-                    'RSRP': user['rsrp'],
-                    'BS': user['serving_bs'],
-                    'Швидкість': user['speed']
-                })
-        
-        if user_data:
-            df = pd.DataFrame(user_data)
-            
-            fig = px.bar(df, x='Користувач', y='RSRP', 
-                        color='BS', 
-                        title="Поточна RSRP користувачів",
-                        labels={'RSRP': 'RSRP (дБм)'})
-            
-            # Додавання порогових ліній
-            fig.add_hline(y=-70, line_dash="dash", line_color="green", 
-                         annotation_text="Відмінно (-70 дБм)")
-            fig.add_hline(y=-85, line_dash="dash", line_color="orange", 
-                         annotation_text="Добре (-85 дБм)")
-            fig.add_hline(y=-100, line_dash="dash", line_color="red", 
-                         annotation_text="Критично (-100 дБм)")
-            
-            st.plotly_chart(fig, use_container_width=True)
-
-with col2:
-    st.subheader("📊 Розподіл навантаження")
-    
+kpi_period = st.sidebar.selectbox("Період історії KPI", list(KPI_PERIODS), index=1)
+recorder = dashboard.simulation.kpi_recorder
+if dashboard.is_owner(session_id):
+    active_ids = [u['id'] for u in runner.snapshot()['users'] if u['active']]
+    tracked = st.sidebar.multiselect("Відстежувані UE", active_ids,
+                                     default=[ue_id for ue_id in recorder.ue_ids if ue_id in active_ids])
+    if set(tracked) != recorder.ue_ids:
+        dashboard.control(session_id, recorder.set_tracked_ues, tracked)
+
+    engine = dashboard.simulation.engine
+    profiling = st.sidebar.checkbox("⏱️ Таймери фаз кроку", value=engine.step_profiler.enabled)
+    if profiling != engine.step_profiler.enabled:
+        dashboard.control(session_id, engine.enable_step_profiling, profiling)
+
+    # Знімок профілю: N кроків поспіль у окремому потоці під семплером (рендеринг не потрапляє у вибірку)
+    st.sidebar.subheader("🔬 Профілювання кроків")
+    capture_steps = st.sidebar.number_input("Кроків під профілювальником", 5, 1000, 50, step=5)
+    if st.sidebar.button("Зняти профіль"):
+        dashboard.touch(session_id)
+        with st.spinner(f"Профілювання {capture_steps} кроків..."):
+            # Не через control(): runner.execute тримав би lock у потоці сторінки
+            profiler = runner.profile_steps(int(capture_steps))
+        st.session_state['profile_capture'] = {
+            'steps': int(capture_steps),
+            'samples': profiler.sample_count,
+            'duration_s': profiler.duration_s,
+            'captured_at': datetime.now(),
+            'top': pd.DataFrame(profiler.top_functions()),
+            'svg': profiler.flamegraph_svg(f"LTE engine: {capture_steps} кроків, {profiler.sample_count} вибірок"),
+            'folded': profiler.folded()
+        }
+
+capture = st.session_state.get('profile_capture')
+if capture:
+    stamp = capture['captured_at'].strftime('%Y%m%d-%H%M%S')
+    st.sidebar.download_button("⬇️ Flame graph (SVG)", capture['svg'], file_name=f"engine-flamegraph-{stamp}.svg",
+                               mime='image/svg+xml')
+    st.sidebar.download_button("⬇️ Згорнуті стеки", capture['folded'], file_name=f"engine-stacks-{stamp}.folded",
+                               mime='text/plain')
+
+
+def kpi_label(key: str, bs_names: dict) -> str:
+    kind, _, rest = key.partition('.')
+    if kind == 'network':
+        return NETWORK_KPIS.get(key, key)
+    entity, _, metric = rest.rpartition('.')
+    if kind == 'cell':
+        return f"{bs_names.get(entity, entity)}: {CELL_KPIS.get(metric, metric)}"
+    return f"{entity}: {UE_KPIS.get(metric, metric)}"
+
+
+def build_rsrp_figure(users):
+    user_data = []
+    for user in users:
+        if user['active']:
+            user_data.append({
+                'Користувач': user['id'],
+                'RSRP': user['rsrp'],
+                'BS': user['serving_bs'],
+                'Швидкість': user['speed']
+            })
+
+    if not user_data:
+        return None
+
+    df = pd.DataFrame(user_data)
+
+    fig = px.bar(df, x='Користувач', y='RSRP', 
+                color='BS', 
+                title="Поточна RSRP користувачів",
+                labels={'RSRP': 'RSRP (дБм)'})
+
+    # Додавання порогових ліній
+    fig.add_hline(y=-70, line_dash="dash", line_color="green", 
+                 annotation_text="Відмінно (-70 дБм)")
+    fig.add_hline(y=-85, line_dash="dash", line_color="orange", 
+                 annotation_text="Добре (-85 дБм)")
+    fig.add_hline(y=-100, line_dash="dash", line_color="red", 
+                 annotation_text="Критично (-100 дБм)")
+    return fig
+
+
+def build_load_figure(base_stations):
     # Підготовка даних про BS
     bs_data = []
-    for bs in st.session_state.base_stations:
+    for bs in base_stations:
         bs_data.append({
             'BS': bs['name'],
             'Користувачі': bs['users'],
             'Навантаження (%)': bs['load']
         })
-    
-    if bs_data:
-        df_bs = pd.DataFrame(bs_data)
-        
-        fig_load = px.pie(df_bs, values='Користувачі', names='BS',
-                         title="Розподіл користувачів по BS")
-        st.plotly_chart(fig_load, use_container_width=True)
 
-# Часовий графік хендоверів
-st.subheader("🔄 Часовий графік хендоверів")
+    if not bs_data:
+        return None
+
+    df_bs = pd.DataFrame(bs_data)
+    return px.pie(df_bs, values='Користувачі', names='BS',
+                  title="Розподіл користувачів по BS")
 
-if st.session_state.handover_events:
+
+def build_handover_view(handover_events):
     # Підготовка даних
     ho_data = []
-    for ho in st.session_state.handover_events[-50:]:  # Останні 50
+    for ho in handover_events:  # Останні події зі знімка
         ho_data.append({
             'Час': ho['timestamp'],
             'Покращення': ho['improvement'],
             'Успішність': 'Успішно' if ho['success'] else 'Невдало',
             'Користувач': ho['user_id']
         })
-    
+
     df_ho = pd.DataFrame(ho_data)
-    
+
     fig_time = px.scatter(df_ho, x='Час', y='Покращення', 
                          color='Успішність',
                          hover_data=['Користувач'],
                          title="Покращення RSRP при хендоверах у часі")
-    
+
     fig_time.add_hline(y=0, line_dash="solid", line_color="gray")
-    
-    st.plotly_chart(fig_time, use_container_width=True)
-    
+
     # Статистика хендоверів
     success_count = df_ho['Успішність'].value_counts()
-    
-    col3, col4, col5 = st.columns(3)
-    
-    with col3:
-        total_ho = len(df_ho)
-        st.metric("Всього хендоверів", total_ho)
-    
-    with col4:
-        if 'Успішно' in success_count:
-            success_rate = (success_count['Успішно'] / total_ho) * 100
-            st.metric("Успішність", f"{success_rate:.1f}%")
-    
-    with col5:
-        avg_improvement = df_ho['Покращення'].mean()
-        st.metric("Середнє покращення", f"{avg_improvement:.1f} дБ")
+    stats = {
+        'total': len(df_ho),
+        'success_rate': (success_count['Успішно'] / len(df_ho)) * 100 if 'Успішно' in success_count else None,
+        'avg_improvement': df_ho['Покращення'].mean()
+    }
+    return fig_time, stats
 
-else:
-    st.info("Хендовери ще не відбулися. Зачекайте або додайте більше користувачів.")
 
-# Деталі користувачів
-st.subheader("👥 Детальна інформація про користувачів")
+def build_kpi_figure(kpi_key, period_s, bs_names):
+    series = dashboard.simulation.kpi_store.query(
+        kpi_key, start=datetime.now().timestamp() - period_s if period_s else None)
+
+    times = [datetime.fromtimestamp(t) for t in series['t']]
+    fig_kpi = go.Figure()
+    if series['resolution']:
+        fig_kpi.add_trace(go.Scatter(x=times, y=series['max'], mode='lines', line=dict(width=0),
+                                     showlegend=False, hoverinfo='skip'))
+        fig_kpi.add_trace(go.Scatter(x=times, y=series['min'], mode='lines', line=dict(width=0),
+                                     fill='tonexty', fillcolor='rgba(31, 119, 180, 0.2)',
+                                     name='Мін/макс'))
+    fig_kpi.add_trace(go.Scatter(x=times, y=series['mean'], mode='lines', line=dict(color='#1f77b4'),
+                                 name='Середнє' if series['resolution'] else 'Значення'))
+    resolution = f"крок {series['resolution']:.0f} с" if series['resolution'] else "сирі дані"
+    fig_kpi.update_layout(title=f"{kpi_label(kpi_key, bs_names)} ({resolution}, {len(times)} точок)",
+                          xaxis_title="Час", height=350)
+    return fig_kpi
+
+
+def build_step_profile_table(profile):
+    rows = []
+    for phase, stats in profile['phases'].items():
+        rows.append({
+            'Фаза': STEP_PHASES.get(phase, phase),
+            'p50 (мс)': stats['p50_s'] * 1e3,
+            'p95 (мс)': stats['p95_s'] * 1e3,
+            'p99 (мс)': stats['p99_s'] * 1e3,
+            'Частка кроку (%)': stats['share']
+        })
+    return pd.DataFrame(rows).round(3) if rows else None
 
-if st.session_state.users:
+
+def build_user_details(users):
     user_details = []
-    for user in st.session_state.users:
+    for user in users:
         if user['active']:
             user_details.append({
                 'ID': user['id'],
@@ -129,10 +218,113 @@ if st.session_state.users:
                 'Кількість хендоверів': user['handover_count'],
                 'Останній хендовер': user['last_handover'].strftime('%H:%M:%S') if user['last_handover'] else 'Немає'
             })
+    return pd.DataFrame(user_details) if user_details else None
+
+
+# Графіки оновлюються фрагментом, симуляція продовжується у фоновому потоці.
+# Фрагмент перезапускається завжди (симуляцію можуть запустити з іншої сесії); таблиці
+# та фігури беруться з кешу, доки не зміниться версія стану, від якої вони залежать.
+@st.fragment(run_every=refresh_interval)
+def render_live_monitoring():
+    dashboard.touch(session_id)
+    state = runner.snapshot()
+    version = state['version']
+    
+    # Графіки в реальному часі
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("📈 RSRP користувачів")
+    
+        if state['users']:
+            fig = render_cache.get_or_build('monitoring.rsrp', version['state'],
+                                            lambda: build_rsrp_figure(state['users']))
+            if fig is not None:
+                st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.subheader("📊 Розподіл навантаження")
     
-    if user_details:
-        st.dataframe(pd.DataFrame(user_details), use_container_width=True)
+        fig_load = render_cache.get_or_build('monitoring.load', version['state'],
+                                             lambda: build_load_figure(state['base_stations']))
+        if fig_load is not None:
+            st.plotly_chart(fig_load, use_container_width=True)
+
+    # Часовий графік хендоверів
+    st.subheader("🔄 Часовий графік хендоверів")
+
+    if state['recent_handover_events']:
+        fig_time, ho_stats = render_cache.get_or_build('monitoring.handovers', version['events'],
+                                                       lambda: build_handover_view(state['recent_handover_events']))
+        st.plotly_chart(fig_time, use_container_width=True)
+    
+        col3, col4, col5 = st.columns(3)
+    
+        with col3:
+            st.metric("Всього хендоверів", ho_stats['total'])
+    
+        with col4:
+            if ho_stats['success_rate'] is not None:
+                st.metric("Успішність", f"{ho_stats['success_rate']:.1f}%")
+    
+        with col5:
+            st.metric("Середнє покращення", f"{ho_stats['avg_improvement']:.1f} дБ")
+
+    else:
+        st.info("Хендовери ще не відбулися. Зачекайте або додайте більше користувачів.")
+
+    # Історія KPI з багаторівневого сховища (проріджена до кількох сотень точок)
+    st.subheader("📉 Історія KPI")
+
+    kpi_keys = dashboard.simulation.kpi_store.keys()
+    if kpi_keys:
+        bs_names = {bs['id']: bs['name'] for bs in state['base_stations']}
+        kpi_key = st.selectbox("Показник", kpi_keys, format_func=lambda key: kpi_label(key, bs_names),
+                               index=kpi_keys.index('network.average_rsrp') if 'network.average_rsrp' in kpi_keys else 0)
+        period_s = KPI_PERIODS[kpi_period]
+        fig_kpi = render_cache.get_or_build(f'monitoring.kpi.{kpi_key}.{kpi_period}', version['state'],
+                                            lambda: build_kpi_figure(kpi_key, period_s, bs_names))
+        st.plotly_chart(fig_kpi, use_container_width=True)
+    else:
+        st.info("Історія KPI з'явиться після перших кроків симуляції.")
+
+    # Профіль кроку: гістограми тривалості фаз і лічильники операцій двигуна
+    with runner.lock:
+        profile = dashboard.simulation.engine.get_step_profile()
+    if profile['enabled'] or profile['step']['count']:
+        with st.expander("⏱️ Профіль кроку симуляції", expanded=profile['enabled']):
+            step = profile['step']
+            col6, col7, col8 = st.columns(3)
+            col6.metric("Крок p50", f"{step['p50_s'] * 1e3:.2f} мс")
+            col7.metric("Крок p95", f"{step['p95_s'] * 1e3:.2f} мс")
+            col8.metric("Крок p99", f"{step['p99_s'] * 1e3:.2f} мс")
+
+            df_profile = build_step_profile_table(profile)
+            if df_profile is not None:
+                st.dataframe(df_profile, use_container_width=True, hide_index=True)
+            st.caption(" · ".join(f"{label}: {profile['counters'].get(key, 0):,}"
+                                  for key, label in STEP_COUNTERS.items()))
+
+    # Деталі користувачів
+    st.subheader("👥 Детальна інформація про користувачів")
+
+    if state['users']:
+        df_users = render_cache.get_or_build('monitoring.users', version['state'],
+                                             lambda: build_user_details(state['users']))
+        if df_users is not None:
+            st.dataframe(df_users, use_container_width=True)
+
+render_live_monitoring()
 
-# Автоматичне оновлення
-if st.session_state.network_active:
-    st.rerun()
+# Результат останнього знімка профілю цієї сесії
+if capture:
+    st.subheader("🔬 Профіль кроків симуляції")
+    st.caption(f"{capture['steps']} кроків за {capture['duration_s']:.2f} с, {capture['samples']} вибірок, "
+               f"знято о {capture['captured_at'].strftime('%H:%M:%S')}")
+    if capture['top'].empty:
+        st.info("Жодної вибірки: збільште кількість кроків.")
+    else:
+        st.dataframe(capture['top'].rename(columns={
+            'function': 'Функція', 'self_samples': 'Власні вибірки', 'total_samples': 'Сукупні вибірки',
+            'self_pct': 'Власний час (%)', 'total_pct': 'Сукупний час (%)'
+        }).round(1), use_container_width=True, hide_index=True)
@@ -3,14 +3,17 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+from datetime import datetime, timedelta
+from utils.dashboard_state import get_render_cache, get_session_id, get_shared_dashboard
 
 st.title("📊 Аналітика мережі")
 
-# Перевірка даних
-if 'handover_events' not in st.session_state:
-    st.warning("Спочатку запустіть симулятор!")
-    st.stop()
+# Аналіз виконується над знімком стану спільної фонової симуляції
+dashboard = get_shared_dashboard()
+dashboard.touch(get_session_id())
+state = dashboard.snapshot()
+event_store = dashboard.simulation.event_store
+render_cache = get_render_cache()
 
 # Фільтри
 st.sidebar.header("🔍 Фільтри аналізу")
@@ -22,22 +25,24 @@ time_filter = st.sidebar.selectbox(
 )
 
 # Конвертація періоду
-now = pd.Timestamp.now()
-if time_filter == "Останні 5 хвилин":
-    start_time = now - pd.Timedelta(minutes=5)
-elif time_filter == "Останні 15 хвилин":
-    start_time = now - pd.Timedelta(minutes=15)
-elif time_filter == "Остання година":
-    start_time = now - pd.Timedelta(hours=1)
-else:
-    start_time = None
+PERIODS = {
+    "Останні 5 хвилин": timedelta(minutes=5),
+    "Останні 15 хвилин": timedelta(minutes=15),
+    "Остання година": timedelta(hours=1),
+    "Весь час": None
+}
+period = PERIODS[time_filter]
+start_time = datetime.now() - period if period else None
+
+# Вікно подій однозначно визначається версією журналу та індексом першої події,
+# тому підготовлені таблиці й графіки перебудовуються лише при зміні вікна
+events_version = state['version']['events']
+window_key = (events_version, event_store.index_since(start_time))
 
-# Фільтрація подій
-filtered_events = st.session_state.handover_events
-if start_time:
-    filtered_events = [e for e in filtered_events if pd.Timestamp(e['timestamp']) >= start_time]
+# Підсумки вікна зі сховища агрегатів (без перебору всієї історії)
+summary = render_cache.get_or_build('analytics.summary', window_key, lambda: event_store.summary(start_time))
 
-if not filtered_events:
+if not summary['total']:
     st.warning("Немає даних для аналізу в обраному періоді")
     st.stop()
 
@@ -46,16 +51,16 @@ st.subheader("📈 Загальна статистика")
 
 col1, col2, col3, col4 = st.columns(4)
 
-total_handovers = len(filtered_events)
-successful_handovers = len([e for e in filtered_events if e['success']])
-failed_handovers = total_handovers - successful_handovers
-avg_improvement = np.mean([e['improvement'] for e in filtered_events])
+total_handovers = summary['total']
+successful_handovers = summary['successful']
+failed_handovers = summary['failed']
+avg_improvement = summary['avg_improvement']
 
 with col1:
     st.metric("Всього хендоверів", total_handovers)
 
 with col2:
-    success_rate = (successful_handovers / total_handovers * 100) if total_handovers > 0 else 0
+    success_rate = summary['success_rate']
     st.metric("Успішність", f"{success_rate:.1f}%")
 
 with col3:
@@ -70,124 +75,151 @@ tab1, tab2, tab3, tab4 = st.tabs(["📊 Тренди", "🔄 Хендовери
 with tab1:
     st.subheader("Тренди хендоверів у часі")
     
-    # Групування по часу
-    df_events = pd.DataFrame(filtered_events)
-    df_events['timestamp'] = pd.to_datetime(df_events['timestamp'])
-    df_events['hour'] = df_events['timestamp'].dt.floor('H')
-    
-    # Аналіз по годинах
-    hourly_stats = df_events.groupby('hour').agg({
-        'success': ['count', 'sum'],
-        'improvement': 'mean'
-    }).round(2)
-    
-    hourly_stats.columns = ['Всього', 'Успішних', 'Середнє покращення']
-    hourly_stats['Успішність (%)'] = (hourly_stats['Успішних'] / hourly_stats['Всього'] * 100).round(1)
-    
-    # Графік трендів
-    fig_trend = go.Figure()
-    
-    fig_trend.add_trace(go.Scatter(
-        x=hourly_stats.index,
-        y=hourly_stats['Всього'],
-        mode='lines+markers',
-        name='Всього хендоверів',
-        line=dict(color='blue')
-    ))
-    
-    fig_trend.add_trace(go.Scatter(
-        x=hourly_stats.index,
-        y=hourly_stats['Успішних'],
-        mode='lines+markers',
-        name='Успішні хендовери',
-        line=dict(color='green')
-    ))
-    
-    fig_trend.update_layout(
-        title="Динаміка хендоверів по годинах",
-        xaxis_title="Час",
-        yaxis_title="Кількість хендоверів"
-    )
+    def build_trend_figure():
+        # Аналіз по годинах з хвилинних агрегатів
+        hourly_stats = pd.DataFrame(event_store.series(start_time, resolution_s=3600)).set_index('time').round(2)
+        hourly_stats.columns = ['Всього', 'Успішних', 'Середнє покращення']
+        hourly_stats['Успішність (%)'] = (hourly_stats['Успішних'] / hourly_stats['Всього'] * 100).round(1)
+        
+        # Графік трендів
+        fig_trend = go.Figure()
+        
+        fig_trend.add_trace(go.Scatter(
+            x=hourly_stats.index,
+            y=hourly_stats['Всього'],
+            mode='lines+markers',
+            name='Всього хендоверів',
+            line=dict(color='blue')
+        ))
+        
+        fig_trend.add_trace(go.Scatter(
+            x=hourly_stats.index,
+            y=hourly_stats['Успішних'],
+            mode='lines+markers',
+            name='Успішні хендовери',
+            line=dict(color='green')
+        ))
+        
+        fig_trend.update_layout(
+            title="Динаміка хендоверів по годинах",
+            xaxis_title="Час",
+            yaxis_title="Кількість хендоверів"
+        )
+        return fig_trend
     
+    fig_trend = render_cache.get_or_build('analytics.trend', window_key, build_trend_figure)
     st.plotly_chart(fig_trend, use_container_width=True)
 
 with tab2:
     st.subheader("Аналіз хендоверів по базових станціях")
     
-    # Статистика по BS
-    bs_stats = defaultdict(lambda: {'from': 0, 'to': 0, 'total': 0})
-    
-    for event in filtered_events:
-        bs_stats[event['old_bs']]['from'] += 1
-        bs_stats[event['new_bs']]['to'] += 1
-        bs_stats[event['old_bs']]['total'] += 1
-        bs_stats[event['new_bs']]['total'] += 1
-    
-    # Створення DataFrame
-    bs_data = []
-    for bs_id, stats in bs_stats.items():
-        bs_name = next((bs['name'] for bs in st.session_state.base_stations if bs['id'] == bs_id), bs_id)
-        bs_data.append({
-            'BS': bs_name,
-            'ID': bs_id,
-            'Вихідні хендовери': stats['from'],
-            'Вхідні хендовери': stats['to'],
-            'Баланс': stats['to'] - stats['from']
-        })
-    
-    df_bs = pd.DataFrame(bs_data)
-    
-    # Графік балансу хендоверів
-    fig_balance = px.bar(
-        df_bs, 
-        x='BS', 
-        y='Баланс',
-        color='Баланс',
-        color_continuous_scale='RdYlGn',
-        title="Баланс хендоверів (вхідні - вихідні)"
-    )
+    bs_names = {bs['id']: bs['name'] for bs in state['base_stations']}
+    
+    def build_balance_view():
+        # Статистика по BS з агрегатів пар сот
+        bs_data = []
+        for bs_id in sorted(set(summary['bs_out']) | set(summary['bs_in'])):
+            outgoing = summary['bs_out'].get(bs_id, 0)
+            incoming = summary['bs_in'].get(bs_id, 0)
+            bs_data.append({
+                'BS': bs_names.get(bs_id, bs_id),
+                'ID': bs_id,
+                'Вихідні хендовери': outgoing,
+                'Вхідні хендовери': incoming,
+                'Баланс': incoming - outgoing
+            })
+        
+        df_bs = pd.DataFrame(bs_data)
+        
+        # Графік балансу хендоверів
+        fig_balance = px.bar(
+            df_bs, 
+            x='BS', 
+            y='Баланс',
+            color='Баланс',
+            color_continuous_scale='RdYlGn',
+            title="Баланс хендоверів (вхідні - вихідні)"
+        )
+        
+        fig_balance.add_hline(y=0, line_dash="solid", line_color="black")
+        return df_bs, fig_balance
     
-    fig_balance.add_hline(y=0, line_dash="solid", line_color="black")
+    df_bs, fig_balance = render_cache.get_or_build('analytics.balance', window_key, build_balance_view)
     st.plotly_chart(fig_balance, use_container_width=True)
     
     # Таблиця статистики
     st.dataframe(df_bs, use_container_width=True)
 
+    # Матриця джерело -> ціль, яку двигун веде онлайн (за весь час)
+    st.subheader("Матриця хендоверів між сотами (весь час)")
+    
+    def build_matrix_view():
+        with dashboard.runner.lock:
+            df_pairs = dashboard.simulation.engine.handover_matrix.to_frame()
+        if df_pairs.empty:
+            return None, None
+
+        df_pairs['source'] = df_pairs['source'].map(lambda bs_id: bs_names.get(bs_id, bs_id))
+        df_pairs['target'] = df_pairs['target'].map(lambda bs_id: bs_names.get(bs_id, bs_id))
+        fig_matrix = px.density_heatmap(
+            df_pairs,
+            x='target',
+            y='source',
+            z='count',
+            histfunc='sum',
+            color_continuous_scale='Blues',
+            labels={'source': 'Звідки', 'target': 'Куди', 'count': 'Хендовери'},
+            title="Кількість хендоверів: джерело → ціль"
+        )
+        df_pairs = df_pairs.sort_values('count', ascending=False).rename(columns={
+            'source': 'Звідки', 'target': 'Куди', 'count': 'Хендовери', 'successful': 'Успішні',
+            'pingpong': 'Ping-pong', 'mean_improvement': 'Середнє покращення'
+        }).round(2)
+        return fig_matrix, df_pairs
+
+    fig_matrix, df_pairs = render_cache.get_or_build('analytics.matrix', events_version, build_matrix_view)
+    if fig_matrix is not None:
+        st.plotly_chart(fig_matrix, use_container_width=True)
+        st.dataframe(df_pairs, use_container_width=True, hide_index=True)
+
 with tab3:
     st.subheader("Ефективність хендоверів")
     
-    # Розподіл покращень RSRP
-    improvements = [e['improvement'] for e in filtered_events]
+    # Події вікна зі стовпцевого журналу
+    df_window = render_cache.get_or_build('analytics.events', window_key, lambda: event_store.to_frame(start_time))
     
-    fig_hist = px.histogram(
-        x=improvements,
-        nbins=20,
-        title="Розподіл покращень RSRP при хендоверах",
-        labels={'x': 'Покращення RSRP (дБ)', 'y': 'Кількість'}
-    )
-    
-    fig_hist.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="Без покращення")
-    fig_hist.add_vline(x=np.mean(improvements), line_dash="dash", line_color="green", annotation_text="Середнє")
+    def build_histogram():
+        # Розподіл покращень RSRP
+        fig_hist = px.histogram(
+            x=df_window['improvement'],
+            nbins=20,
+            title="Розподіл покращень RSRP при хендоверах",
+            labels={'x': 'Покращення RSRP (дБ)', 'y': 'Кількість'}
+        )
+        
+        fig_hist.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="Без покращення")
+        fig_hist.add_vline(x=avg_improvement, line_dash="dash", line_color="green", annotation_text="Середнє")
+        return fig_hist
     
+    fig_hist = render_cache.get_or_build('analytics.histogram', window_key, build_histogram)
     st.plotly_chart(fig_hist, use_container_width=True)
     
     # Кореляційний аналіз
     st.subheader("📊 Кореляційний аналіз")
     
-    # Створення DataFrame для кореляції
-    corr_data = []
-    for event in filtered_events:
-        user = next((u for u in st.session_state.users if u['id'] == event['user_id']), None)
-        if user:
-            corr_data.append({
-                'Покращення RSRP': event['improvement'],
-                'Початкова RSRP': event['old_rsrp'],
-                'Швидкість користувача': user['speed'],
-                'Успішність': 1 if event['success'] else 0
-            })
-    
-    if corr_data:
-        df_corr = pd.DataFrame(corr_data)
+    def build_correlation_view():
+        # Події вікна з'єднуються з таблицею атрибутів UE одним векторним пошуком
+        df_joined = dashboard.simulation.ue_attributes.join(df_window)
+        df_joined = df_joined[df_joined['speed'].notna()]
+        if df_joined.empty:
+            return None, []
+        
+        df_corr = pd.DataFrame({
+            'Покращення RSRP': df_joined['improvement'],
+            'Початкова RSRP': df_joined['old_rsrp'],
+            'Швидкість користувача': df_joined['speed'],
+            'Успішність': df_joined['success'].astype(int)
+        })
         correlation_matrix = df_corr.corr()
         
         fig_corr = px.imshow(
@@ -197,13 +229,34 @@ with tab3:
             title="Кореляційна матриця параметрів хендовера"
         )
         
+        # Розбивка за типом пристрою та класом мобільності
+        breakdowns = []
+        for group_by, title in (('device_type', "Тип пристрою"), ('mobility_class', "Клас мобільності")):
+            breakdown = df_joined.groupby(group_by).agg(
+                total=('success', 'size'),
+                successful=('success', 'sum'),
+                improvement=('improvement', 'mean')
+            )
+            breakdown['success_rate'] = (breakdown['successful'] / breakdown['total'] * 100).round(1)
+            breakdowns.append(breakdown.rename(columns={
+                'total': 'Хендовери', 'successful': 'Успішні',
+                'improvement': 'Середнє покращення', 'success_rate': 'Успішність (%)'
+            }).rename_axis(title).round(2))
+        return fig_corr, breakdowns
+    
+    fig_corr, breakdowns = render_cache.get_or_build('analytics.correlation', window_key, build_correlation_view)
+    if fig_corr is not None:
         st.plotly_chart(fig_corr, use_container_width=True)
+        
+        for column, breakdown in zip(st.columns(2), breakdowns):
+            with column:
+                st.dataframe(breakdown, use_container_width=True)
 
 with tab4:
     st.subheader("🎯 Прогнози та рекомендації")
     
     # Прогноз навантаження
-    current_users = len([u for u in st.session_state.users if u['active']])
+    current_users = len([u for u in state['users'] if u['active']])
     avg_handovers_per_user = total_handovers / max(current_users, 1)
     
     st.write("**📈 Прогноз навантаження:**")
@@ -233,13 +286,13 @@ with tab4:
         recommendations.append("⚡ Мале середнє покращення - оптимізуйте розташування базових станцій")
     
     # Аналіз балансу навантаження
-    bs_loads = [bs['load'] for bs in st.session_state.base_stations]
+    bs_loads = [bs['load'] for bs in state['base_stations']]
     load_std = np.std(bs_loads)
     
     if load_std > 20:
         recommendations.append("⚖️ Велика різниця в навантаженні BS - впровадіть балансування навантаження")
     
-    if len([bs for bs in st.session_state.base_stations if bs['load'] > 80]) > 0:
+    if len([bs for bs in state['base_stations'] if bs['load'] > 80]) > 0:
         recommendations.append("🚨 Деякі BS перевантажені - додайте нові базові станції")
     
     if not recommendations:
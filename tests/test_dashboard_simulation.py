@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from utils.dashboard_simulation import RECENT_EVENTS, DashboardSimulation
+
+
+def test_state_version_changes_only_with_state():
+    sim = DashboardSimulation()
+    version = sim.snapshot()['version']['state']
+    assert sim.snapshot()['version']['state'] == version
+
+    assert sim.add_user()
+    changed = sim.snapshot()['version']['state']
+    assert changed > version
+    assert sim.snapshot()['version']['state'] == changed
+
+
+def test_snapshot_keeps_only_recent_events():
+    sim = DashboardSimulation()
+    start = datetime(2024, 1, 1)
+    for i in range(RECENT_EVENTS + 10):
+        sim.event_store.append({
+            'timestamp': start + timedelta(seconds=i), 'user_id': f"UE{i:03d}",
+            'old_bs': 'A', 'new_bs': 'B', 'old_rsrp': -100.0, 'new_rsrp': -95.0,
+            'improvement': 5.0, 'type': 'successful', 'success': True
+        })
+    recent = sim.snapshot()['recent_handover_events']
+    assert len(recent) == RECENT_EVENTS
+    assert recent[-1]['user_id'] == f"UE{RECENT_EVENTS + 9:03d}"
+    assert sim.snapshot()['version']['events'][1] == RECENT_EVENTS + 10
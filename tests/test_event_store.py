@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.event_store import HandoverEventStore
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def event(seconds, success=True, old_bs='A', new_bs='B', improvement=4.0):
+    return {'timestamp': START + timedelta(seconds=seconds), 'user_id': 'UE001',
+            'old_bs': old_bs, 'new_bs': new_bs, 'old_rsrp': -100.0, 'new_rsrp': -100.0 + improvement,
+            'improvement': improvement, 'success': success,
+            'type': 'successful' if success else 'failed'}
+
+
+def brute_summary(events, since):
+    window = [e for e in events if e['timestamp'] >= since]
+    successful = sum(e['success'] for e in window)
+    return len(window), successful, sum(e['improvement'] for e in window)
+
+
+@pytest.fixture
+def store():
+    store = HandoverEventStore(bucket_s=60)
+    for i in range(300):
+        store.append(event(i * 7, success=i % 3 != 0, new_bs='BC'[i % 2], improvement=float(i % 5)))
+    return store
+
+
+def test_rejects_non_positive_bucket():
+    with pytest.raises(ValueError):
+        HandoverEventStore(bucket_s=0)
+
+
+@pytest.mark.parametrize('offset_s', [0, 59, 60, 61, 1000, 2099, 5000])
+def test_window_summary_matches_raw_events(store, offset_s):
+    since = START + timedelta(seconds=offset_s)
+    summary = store.summary(since)
+    total, successful, improvement = brute_summary(store.events, since)
+    assert summary['total'] == total
+    assert summary['successful'] == successful
+    assert summary['failed'] == total - successful
+    if total:
+        assert summary['avg_improvement'] == pytest.approx(improvement / total)
+        assert sum(pair['count'] for pair in summary['by_pair'].values()) == total
+    assert len(store.events_since(since)) == total
+    assert len(store.to_frame(since)) == total
+    assert store.index_since(since) == len(store) - total
+
+
+def test_totals_and_pairs(store):
+    summary = store.summary()
+    assert summary['total'] == 300
+    assert summary['by_outcome'] == {'successful': 200, 'failed': 100}
+    assert summary['bs_out'] == {'A': 300}
+    assert summary['bs_in'] == {'B': 150, 'C': 150}
+
+
+def test_series_rolls_up_minutes(store):
+    rows = store.series(resolution_s=600)
+    assert sum(row['total'] for row in rows) == 300
+    assert all(row['time'].minute % 10 == 0 and row['time'].second == 0 for row in rows)
+    # 10 хвилин = 600 с, події кожні 7 с -> 85-86 подій в інтервалі
+    assert all(row['total'] in (85, 86) for row in rows[:-1])
+
+
+def test_out_of_order_event_keeps_order_and_clear_resets(store):
+    store.append(event(0))
+    assert store.times == sorted(store.times)
+    assert store.recent(1)[0]['timestamp'] == START
+    store.clear()
+    assert len(store) == 0
+    assert store.summary()['total'] == 0
+    assert store.recent(5) == []
@@ -0,0 +1,35 @@
+import numpy as np
+
+from core.fading import METERS_PER_DEG_LAT, ShadowFadingMap
+
+
+def make_map(cells=4, **kwargs):
+    shadow = ShadowFadingMap(seed=7, **kwargs)
+    for i in range(cells):
+        shadow.register_cell(f"BS{i}", 49.2 + i * 0.01, 28.4)
+    return shadow
+
+
+def test_memory_does_not_grow_with_cells():
+    few, many = make_map(cells=2), make_map(cells=200)
+    few.lookup('BS0', 49.2, 28.4)
+    many.lookup('BS0', 49.2, 28.4)
+    assert few.memory_bytes() == many.memory_bytes() > 0
+
+
+def test_deterministic_and_co_sited_cells_share_shadowing():
+    a, b = make_map(), make_map()
+    a.register_cell('BS0-2', 49.2, 28.4)
+    assert a.lookup('BS1', 49.215, 28.41) == b.lookup('BS1', 49.215, 28.41)
+    assert a.lookup('BS0', 49.203, 28.4) == a.lookup('BS0-2', 49.203, 28.4)
+
+
+def test_positions_beyond_extent_wrap_instead_of_clamping():
+    shadow = make_map(extent_m=1000.0)
+    # Точки далеко за межами періоду мають різне затінення (немає прив'язки до краю)
+    latitudes = 49.2 + np.arange(50, 100) * 100.0 / METERS_PER_DEG_LAT
+    values = shadow.lookup('BS0', latitudes, np.full(latitudes.shape, 28.4))
+    assert np.ptp(values) > 1.0
+    # Рівно через період поле повторюється без розриву
+    period_deg = 2000.0 / METERS_PER_DEG_LAT
+    assert np.isclose(shadow.lookup('BS0', 49.2033, 28.4), shadow.lookup('BS0', 49.2033 + period_deg, 28.4), atol=1e-3)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from core.kpi_store import KPITimeSeriesStore, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    y[812] = -30.0
+    selected = lttb_indices(x, y, 50)
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+    assert 437 in selected and 812 in selected
+
+
+def test_lttb_returns_all_points_when_small():
+    assert np.array_equal(lttb_indices(np.arange(10.0), np.arange(10.0), 20), np.arange(10))
+
+
+def test_recent_period_uses_raw_values():
+    store = KPITimeSeriesStore(raw_capacity=100)
+    for t in range(50):
+        store.record(float(t), {'rsrp': -100.0 + t, 'skip': None})
+    assert store.keys() == ['rsrp']
+    result = store.query('rsrp', start=10.0)
+    assert result['resolution'] == 0
+    assert np.array_equal(result['t'], np.arange(10.0, 50.0))
+    assert np.array_equal(result['mean'], result['min'])
+
+
+def test_long_period_uses_aggregated_levels():
+    store = KPITimeSeriesStore(raw_capacity=60)
+    for t in range(600):
+        store.record(float(t), {'load': float(t % 20)})
+    result = store.query('load')
+    assert result['resolution'] == 10
+    assert len(result['t']) == 60
+    # Інтервали 10 с: t%20 дає 0..9 або 10..19
+    assert set(result['min']) == {0.0, 10.0}
+    assert set(result['max']) == {9.0, 19.0}
+    assert result['mean'][:2] == pytest.approx([4.5, 14.5])
+
+
+def test_query_downsamples_and_unknown_key_is_empty():
+    store = KPITimeSeriesStore(raw_capacity=5000)
+    for t in range(2000):
+        store.record(float(t), {'throughput': np.sin(t / 50.0)})
+    assert len(store.query('throughput', max_points=100)['t']) == 100
+    assert len(store.query('missing')['t']) == 0
+    store.clear()
+    assert store.keys() == []
@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+
+from utils.live_map import LiveMapLayer
+
+
+def make_layer(tmp_path, max_points=5000):
+    return LiveMapLayer(center=(49.23, 28.48), max_points=max_points,
+                        static_dir=str(tmp_path / "coverage"), static_url="app/static/coverage")
+
+
+def test_overlay_is_referenced_by_url_and_written_once(tmp_path):
+    layer = make_layer(tmp_path)
+    image = np.zeros((512, 512, 4), dtype=np.uint8)
+    bounds = [[49.2, 28.4], [49.3, 28.5]]
+    layer.set_overlay(image, bounds, key=('rsrp', 13, 'abc'))
+    source = layer.figure().layout.map.layers[0].source
+    assert source.startswith("app/static/coverage/") and source.endswith(".png")
+
+    path = tmp_path / "coverage" / os.path.basename(source)
+    mtime = path.stat().st_mtime_ns
+    layer.set_overlay(image, bounds, key=('rsrp', 14, 'abc'))
+    layer.set_overlay(image, bounds, key=('rsrp', 13, 'abc'))
+    assert path.stat().st_mtime_ns == mtime
+    assert len(layer.figure().to_json()) < 20_000
+
+
+def test_users_are_clustered_in_browser_and_capped_on_server(tmp_path):
+    rng = np.random.default_rng(0)
+    layer = make_layer(tmp_path, max_points=500)
+    n = 20_000
+    layer.update_users([f"UE{i}" for i in range(n)], 49.23 + rng.uniform(-0.05, 0.05, n),
+                       28.48 + rng.uniform(-0.05, 0.05, n), rng.uniform(-110, -70, n))
+    trace = layer.figure().data[0]
+    assert trace.cluster.enabled
+    assert len(trace.lat) <= 500
+    assert trace.customdata[:, 0].sum() == n
+
+    layer.update_users(['a', 'b'], [49.23, 49.24], [28.48, 28.49], [-80, -90])
+    assert list(layer.figure().data[0].customdata[:, 0]) == ['a', 'b']
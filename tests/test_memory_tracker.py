@@ -0,0 +1,61 @@
+from benchmarks.networks import build_engine, grid_cells
+from core.memory_tracker import estimate_container
+
+
+class _Controller:
+    def __init__(self):
+        self.measurements_history = []
+
+
+def test_estimate_container_scales_with_items():
+    small = estimate_container([{'a': 1.0, 'b': 'x'}] * 10)
+    large = estimate_container([{'a': 1.0, 'b': 'x'}] * 1000)
+    assert small['items'] == 10 and large['items'] == 1000
+    assert large['bytes'] > 50 * small['bytes']
+
+
+def test_growth_alert_and_controller_probe():
+    engine = build_engine(grid_cells(4))
+    controller = _Controller()
+    engine.handover_controllers.append(controller)
+    tracker = engine.enable_memory_tracking(every_n_steps=5, start_tracemalloc=False, sustained_steps=5,
+                                            limits={'handover_controller.measurements_history': 1000})
+    alerts = []
+    engine.add_listener(lambda topic, payload: alerts.append(payload) if topic == 'memory_alert' else None)
+    try:
+        for _ in range(10):
+            controller.measurements_history.append({'position': (49.2, 28.4), 'measurements': {}})
+            engine.step_simulation(1.0)
+        report = engine.get_memory_report()
+        structure = report['structures']['handover_controller.measurements_history']
+        assert structure['items'] == 10
+        assert structure['growth_items_per_1k'] == 1000
+        assert [a['structure'] for a in report['alerts']] == ['handover_controller.measurements_history']
+        assert alerts and alerts[0]['structure'] == 'handover_controller.measurements_history'
+    finally:
+        engine.disable_memory_tracking()
+    assert tracker.engine is engine and engine.memory_tracker is None
+
+
+def test_capped_structure_does_not_alert_after_filling():
+    engine = build_engine(grid_cells(4))
+    capped, leaking = _Controller(), _Controller()
+    engine.handover_controllers.append(capped)
+    tracker = engine.enable_memory_tracking(every_n_steps=5, start_tracemalloc=False, sustained_steps=50,
+                                            limits={'handover_controller.measurements_history': 1000})
+    tracker.add_probe('leak', lambda: leaking.measurements_history)
+    tracker.limits['leak'] = 1000
+    try:
+        for _ in range(200):
+            # Історія обмежена 20 елементами, як у HandoverController
+            capped.measurements_history.append({'position': (49.2, 28.4), 'measurements': {}})
+            capped.measurements_history = capped.measurements_history[-20:]
+            leaking.measurements_history.append({'position': (49.2, 28.4), 'measurements': {}})
+            engine.step_simulation(1.0)
+        structures = engine.get_memory_report()['structures']
+        assert structures['handover_controller.measurements_history']['items'] == 20
+        alerted = {alert['structure'] for alert in tracker.alerts}
+        assert 'handover_controller.measurements_history' not in alerted
+        assert 'leak' in alerted
+    finally:
+        engine.disable_memory_tracking()
@@ -0,0 +1,65 @@
+import re
+import urllib.request
+
+from benchmarks.networks import build_engine, grid_cells
+from core.metrics_exporter import STEP_DURATION_BUCKETS, EngineMetrics
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? -?[0-9.e+-]+$')
+
+
+def parse(text):
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE'):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            assert SAMPLE.match(line), line
+            key, value = line.rsplit(' ', 1)
+            samples[key] = float(value)
+    return samples, types
+
+
+def test_exposition_format_and_values():
+    engine = build_engine(grid_cells(4))
+    metrics = EngineMetrics(engine)
+    for duration in (0.0005, 0.003, 20.0):
+        metrics.on_event('step', {'duration_s': duration, 'active_users': 10, 'simulation_time': 1.0})
+    metrics.on_event('handover', {'type': 'successful'})
+    metrics.on_event('handover', {'type': 'pingpong'})
+    metrics.on_event('handover_rejected', {})
+
+    samples, types = parse(metrics.render())
+    assert types['lte_steps_total'] == 'counter'
+    assert types['lte_step_duration_seconds'] == 'histogram'
+    assert types['lte_handover_events_total'] == 'counter'
+    assert samples['lte_steps_total'] == 3
+    assert samples['lte_rsrp_evaluations_total'] == 3 * 10 * 4
+
+    buckets = [samples[f'lte_step_duration_seconds{{le="{bound}"}}'] for bound in STEP_DURATION_BUCKETS]
+    assert buckets == sorted(buckets)
+    assert samples['lte_step_duration_seconds{le="0.001"}'] == 1
+    assert samples['lte_step_duration_seconds{le="0.005"}'] == 2
+    assert samples['lte_step_duration_seconds{le="+Inf"}'] == samples['lte_step_duration_seconds_count'] == 3
+
+    assert samples['lte_handover_attempts_total{outcome="successful"}'] == 1
+    assert samples['lte_handover_attempts_total{outcome="pingpong"}'] == 1
+    assert samples['lte_handover_attempts_total{outcome="rejected"}'] == 1
+    assert samples['lte_handover_events_total'] == 2
+
+    # Повторний запит не змінює значень
+    assert parse(metrics.render())[0]['lte_rsrp_evaluations_total'] == samples['lte_rsrp_evaluations_total']
+
+
+def test_http_endpoint_serves_engine_steps():
+    engine = build_engine(grid_cells(4))
+    host, port = engine.serve_metrics(port=0)
+    try:
+        engine.step_simulation(1.0)
+        with urllib.request.urlopen(f'http://{host}:{port}/metrics') as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            samples, _ = parse(response.read().decode())
+        assert samples['lte_steps_total'] == 1
+    finally:
+        engine.stop_metrics()
+    assert not engine.event_listeners
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from core.mobility import TraceMobilitySource
+
+
+def write_trace(tmp_path, rows):
+    path = tmp_path / "trace.csv"
+    pd.DataFrame(rows, columns=['ue_id', 't', 'lat', 'lon']).to_csv(path, index=False)
+    return str(path)
+
+
+def test_interpolates_between_points(tmp_path):
+    path = write_trace(tmp_path, [('A', 0, 49.0, 28.0), ('A', 10, 49.01, 28.02)])
+    source = TraceMobilitySource(path, chunk_size=1)
+    update = source.advance(5.0)
+    assert update.ue_ids == ['A']
+    assert np.isclose(update.latitudes[0], 49.005)
+    assert np.isclose(update.longitudes[0], 28.01)
+    assert update.speeds_kmh[0] > 0
+
+
+def test_next_point_beyond_lookahead_does_not_freeze(tmp_path):
+    rows = [('A', 0, 49.0, 28.0), ('A', 200, 49.02, 28.0)]
+    rows += [('B', t, 49.1, 28.1) for t in range(0, 200, 5)]
+    path = write_trace(tmp_path, sorted(rows, key=lambda row: row[1]))
+    source = TraceMobilitySource(path, chunk_size=2, lookahead_s=10.0)
+    update = source.advance(100.0)
+    index = update.ue_ids.index('A')
+    assert np.isclose(update.latitudes[index], 49.01)
+    assert update.speeds_kmh[index] > 0
+
+
+def test_finished_as_soon_as_last_point_passed(tmp_path):
+    rows = [('A', 0, 49.0, 28.0), ('A', 10, 49.01, 28.0)]
+    rows += [('B', t, 49.1, 28.1) for t in range(0, 2000, 10)]
+    path = write_trace(tmp_path, sorted(rows, key=lambda row: row[1]))
+    source = TraceMobilitySource(path, chunk_size=10, lookahead_s=10.0, max_gap_s=60.0)
+    assert 'A' in source.advance(5.0).ue_ids
+    update = source.advance(11.0)
+    assert update.finished_ue_ids == ['A']
+    assert 'A' not in update.ue_ids
+    assert not source._exhausted
+    assert source.advance(12.0).finished_ue_ids == []
+
+
+def test_ue_reappearing_after_gap_starts_new_track(tmp_path):
+    rows = [('A', 0, 49.0, 28.0), ('A', 10, 49.01, 28.0), ('A', 500, 49.02, 28.0), ('A', 510, 49.03, 28.0)]
+    path = write_trace(tmp_path, rows)
+    source = TraceMobilitySource(path, chunk_size=1, max_gap_s=100.0)
+    assert source.advance(20.0).finished_ue_ids == ['A']
+    assert source.advance(505.0).ue_ids == ['A']
@@ -0,0 +1,21 @@
+import plotly.graph_objects as go
+
+from utils.render_cache import FIGURE_BYTES_PER_VALUE, RenderCache, estimate_figure_size
+
+
+def test_figure_size_grows_with_points():
+    small = go.Figure(go.Scatter(x=[1, 2], y=[3, 4]))
+    large = go.Figure(go.Scatter(x=list(range(1000)), y=list(range(1000))))
+    assert estimate_figure_size(large) - estimate_figure_size(small) == 998 * 2 * FIGURE_BYTES_PER_VALUE
+
+
+def test_cache_hits_by_version_and_evicts_lru():
+    cache = RenderCache(max_entries=2)
+    builds = []
+    build = lambda: builds.append(1) or len(builds)
+    assert cache.get_or_build('a', 1, build) == 1
+    assert cache.get_or_build('a', 1, build) == 1
+    assert cache.get_or_build('a', 2, build) == 2
+    cache.get_or_build('b', 1, build)
+    assert cache.get_or_build('a', 1, build) == 4
+    assert cache.hits == 1
@@ -0,0 +1,53 @@
+import json
+import os
+
+import numpy as np
+
+from core.road_network import ROAD_MODES, RoadMobilityModel, RoadNetwork, RouteTable
+
+
+def grid_network(tmp_path, size=4):
+    nodes = [{'id': r * size + c, 'lat': 49.23 + r * 0.002, 'lon': 28.47 + c * 0.003}
+             for r in range(size) for c in range(size)]
+    edges = []
+    for r in range(size):
+        for c in range(size):
+            node = r * size + c
+            if c + 1 < size:
+                edges.append({'from': node, 'to': node + 1, 'highway': 'residential', 'oneway': r % 2 == 0})
+            if r + 1 < size:
+                edges.append({'from': node, 'to': node + size, 'highway': 'residential'})
+    path = tmp_path / "roads.json"
+    path.write_text(json.dumps({'nodes': nodes, 'edges': edges}))
+    return RoadNetwork.from_file(str(path))
+
+
+def test_route_table_is_cached_on_disk(tmp_path):
+    network = grid_network(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    built = RouteTable.load_or_build(network, ['drive'], anchors_per_mode=6, seed=3, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    loaded = RouteTable.load_or_build(network, ['drive'], anchors_per_mode=6, seed=3, cache_dir=cache_dir)
+    assert np.array_equal(built.vertex_cum, loaded.vertex_cum)
+    assert np.array_equal(built.route_dest, loaded.route_dest)
+
+
+def test_next_route_starts_where_previous_ended(tmp_path):
+    model = RoadMobilityModel(grid_network(tmp_path), anchors_per_mode=6, seed=3, modes=['drive'])
+    routes = model.routes
+    assert model.add_users([{'id': f"UE{i}", 'lat': 49.233, 'lon': 28.475, 'speed': 50} for i in range(20)]) == 20
+
+    for step in range(1, 60):
+        previous = model.route_id.copy()
+        model.advance(step * 10.0)
+        changed = model.route_id != previous
+        assert np.all(routes.route_origin[model.route_id[changed]] == routes.route_dest[previous[changed]])
+        assert np.all(routes.route_mode[model.route_id] == ROAD_MODES.index('drive'))
+
+
+def test_data_generator_profiles_use_shared_road_modes():
+    from core.road_network import PROFILE_ROAD_MODES
+    from utils.data_generator import LTEDataGenerator
+
+    profiles = LTEDataGenerator().user_profiles
+    assert {name: profile['road_mode'] for name, profile in profiles.items()} == PROFILE_ROAD_MODES
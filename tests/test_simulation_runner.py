@@ -0,0 +1,85 @@
+import threading
+import time
+
+from core.simulation_runner import SimulationRunner
+
+
+def make_runner(interval_s=0.01, step_s=0.0):
+    state = {'steps': 0}
+
+    def step():
+        if step_s:
+            time.sleep(step_s)
+        state['steps'] += 1
+
+    runner = SimulationRunner(step, lambda: {'steps': state['steps']}, interval_s=interval_s, name="test-runner")
+    return runner, state
+
+
+def runner_threads():
+    return [t for t in threading.enumerate() if t.name == "test-runner" and t.is_alive()]
+
+
+def test_start_stop_cycle():
+    runner, state = make_runner()
+    runner.start()
+    time.sleep(0.1)
+    assert runner.running
+    assert runner.stop(timeout=2)
+    assert not runner.running
+    assert not runner_threads()
+
+    steps = state['steps']
+    assert steps > 0
+    assert runner.snapshot() == {'steps': steps}
+    time.sleep(0.05)
+    assert state['steps'] == steps
+
+
+def test_repeated_start_keeps_single_thread():
+    runner, _ = make_runner()
+    runner.start()
+    runner.start()
+    assert len(runner_threads()) == 1
+    assert runner.stop(timeout=2)
+
+
+def test_stop_does_not_wait_on_lock_holder():
+    runner, _ = make_runner(interval_s=0.0, step_s=0.01)
+    runner.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    assert runner.stop(timeout=2)
+    assert time.perf_counter() - started < 1.0
+    assert not runner_threads()
+
+
+def test_failed_join_keeps_thread_and_restart_reuses_it():
+    runner, _ = make_runner(interval_s=0.0, step_s=0.01)
+    runner.start()
+    time.sleep(0.02)
+    # Під lock потік кроків не може завершитись: stop повідомляє про невдачу й не губить потік
+    with runner.lock:
+        assert not runner.stop(timeout=0.05)
+        assert runner.running
+    runner.start()
+    assert len(runner_threads()) == 1
+    assert runner.stop(timeout=2)
+    assert not runner_threads()
+
+
+def test_execute_runs_between_steps_and_refreshes_snapshot():
+    runner, state = make_runner()
+    result = runner.execute(lambda: state.update(steps=100) or 'ok')
+    assert result == 'ok'
+    assert runner.snapshot() == {'steps': 100}
+
+
+def test_step_error_is_recorded():
+    def failing():
+        raise RuntimeError("boom")
+
+    runner = SimulationRunner(failing, interval_s=0.01)
+    runner.step()
+    assert runner.last_error == "RuntimeError: boom"
+    assert runner.step_count == 1
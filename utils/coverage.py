@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.antenna import AntennaPattern, bearing_deg
+from core.interference import InterferenceCalculator
+from core.propagation import haversine_km, cost_hata_path_loss
+
+COVERAGE_LAYERS = ('best_server', 'rsrp', 'sinr')
+
+# Кольорові шкали: (значення, RGB)
+RSRP_COLOR_STOPS = [(-120, (215, 48, 39)), (-105, (252, 141, 89)), (-95, (254, 224, 139)),
+                    (-85, (217, 239, 139)), (-75, (145, 207, 96)), (-65, (26, 152, 80))]
+SINR_COLOR_STOPS = [(-5, (215, 48, 39)), (0, (252, 141, 89)), (5, (254, 224, 139)),
+                    (10, (217, 239, 139)), (15, (145, 207, 96)), (20, (26, 152, 80))]
+SERVER_PALETTE = np.array([
+    (31, 119, 180), (255, 127, 14), (44, 160, 44), (214, 39, 40), (148, 103, 189),
+    (140, 86, 75), (227, 119, 194), (127, 127, 127), (188, 189, 34), (23, 190, 207)
+], dtype=np.uint8)
+
+
+def lonlat_to_tile(lon, lat, zoom: int) -> Tuple[float, float]:
+    """Координати тайла Web Mercator (дробові) для точки"""
+    n = 2 ** zoom
+    lat_rad = np.radians(lat)
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0 * n
+    return x, y
+
+
+def tile_to_lat(y, zoom: int):
+    """Широта для (дробової) Y-координати тайла"""
+    return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y) / 2 ** zoom))))
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """Межі тайла: (south, west, north, east)"""
+    n = 2 ** zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    return float(tile_to_lat(y + 1, zoom)), west, float(tile_to_lat(y, zoom)), east
+
+
+def _interpolate_colors(values: np.ndarray, stops) -> np.ndarray:
+    points = [value for value, _ in stops]
+    rgb = np.empty(values.shape + (3,), dtype=np.uint8)
+    for channel in range(3):
+        rgb[..., channel] = np.interp(values, points, [color[channel] for _, color in stops])
+    return rgb
+
+
+class CoverageService:
+    """Растри покриття (найкращий сервер, RSRP, SINR) у вигляді піраміди тайлів Web Mercator
+
+    Кожен тайл рахується лише за сотами, що можуть на нього впливати, і
+    кешується на диску за хешем їх конфігурації. Зміна параметрів однієї
+    соти змінює хеш лише тайлів у її радіусі дії - решта читається з кешу.
+    """
+
+    def __init__(self, cells: Iterable, cache_dir: str = ".coverage_cache",
+                 tile_size: int = 256, max_range_km: float = 15.0,
+                 cell_load: float = 1.0, min_rsrp_dbm: float = -120.0,
+                 antenna_patterns: Optional[Dict[str, AntennaPattern]] = None,
+                 default_antenna_pattern: str = '3gpp_65', memory_tiles: int = 256):
+        self.cache_dir = cache_dir
+        self.tile_size = tile_size
+        self.max_range_km = max_range_km  # далі за цю відстань сота не впливає на тайл
+        self.cell_load = cell_load  # активність сусідніх сот для розрахунку SINR
+        self.min_rsrp_dbm = min_rsrp_dbm  # поріг покриття, нижче - прозорі пікселі
+        self.antenna_patterns = dict(antenna_patterns or {})
+        self.default_antenna_pattern = default_antenna_pattern
+        self.memory_tiles = memory_tiles
+
+        self.interference = InterferenceCalculator()
+        self._memory: OrderedDict = OrderedDict()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'computed': 0}
+
+        self.cells: List[Dict] = []
+        self.update_cells(cells)
+
+    @classmethod
+    def from_engine(cls, engine, **kwargs) -> 'CoverageService':
+        """Сервіс для сот LTENetworkEngine (з урахуванням секторів та діаграм)"""
+        kwargs.setdefault('antenna_patterns', engine.antenna_patterns)
+        kwargs.setdefault('default_antenna_pattern', engine.default_antenna_pattern)
+        return cls(engine.base_stations.values(), **kwargs)
+
+    @staticmethod
+    def _cell_record(cell) -> Dict:
+        """Параметри соти, що впливають на покриття (BaseStation або словник конфігурації)"""
+        if hasattr(cell, 'bs_id'):
+            return {
+                'id': cell.bs_id,
+                'lat': float(cell.latitude),
+                'lon': float(cell.longitude),
+                'power': float(cell.power_dbm),
+                'frequency': float(cell.frequency_mhz),
+                'antenna_gain': float(cell.antenna_gain_db),
+                'sector_azimuth': cell.sector_azimuth,
+                'antenna_pattern': cell.antenna_pattern
+            }
+        return {
+            'id': str(cell['id']),
+            'lat': float(cell['lat']),
+            'lon': float(cell['lon']),
+            'power': float(cell['power']),
+            'frequency': float(cell.get('frequency', 1800)),
+            'antenna_gain': float(cell.get('antenna_gain', 15)),
+            'sector_azimuth': cell.get('sector_azimuth'),
+            'antenna_pattern': cell.get('antenna_pattern')
+        }
+
+    def update_cells(self, cells: Iterable):
+        """Нова конфігурація сот (тайли перераховуються ліниво за зміною хешу)"""
+        self.cells = [self._cell_record(cell) for cell in cells]
+        self._cell_lat = np.array([c['lat'] for c in self.cells], dtype=np.float64)
+        self._cell_lon = np.array([c['lon'] for c in self.cells], dtype=np.float64)
+        self._cell_hashes = [
+            hashlib.sha1(json.dumps(c, sort_keys=True).encode()).hexdigest() for c in self.cells
+        ]
+
+    def configuration_key(self) -> str:
+        """Хеш поточної конфігурації всіх сот (для кешування похідних зображень)"""
+        return hashlib.sha1(''.join(self._cell_hashes).encode()).hexdigest()[:20]
+
+    def _pattern(self, name: Optional[str]) -> AntennaPattern:
+        name = name or self.default_antenna_pattern
+        if name not in self.antenna_patterns:
+            self.antenna_patterns[name] = AntennaPattern.parabolic()
+        return self.antenna_patterns[name]
+
+    def _cells_for_tile(self, x: int, y: int, zoom: int) -> np.ndarray:
+        """Індекси сот, радіус дії яких перетинає тайл"""
+        if not self.cells:
+            return np.zeros(0, dtype=np.int64)
+        south, west, north, east = tile_bounds(x, y, zoom)
+        center_lat, center_lon = (south + north) / 2, (west + east) / 2
+        half_diagonal = haversine_km(south, west, north, east) / 2
+        distance = haversine_km(center_lat, center_lon, self._cell_lat, self._cell_lon)
+        return np.flatnonzero(distance <= self.max_range_km + half_diagonal)
+
+    def tile_key(self, x: int, y: int, zoom: int, cell_indices: Optional[np.ndarray] = None) -> str:
+        """Хеш тайла: координати, параметри моделі та конфігурація впливових сот"""
+        if cell_indices is None:
+            cell_indices = self._cells_for_tile(x, y, zoom)
+        digest = hashlib.sha1(
+            f"{zoom}/{x}/{y}|{self.tile_size}|{self.cell_load}|{self.max_range_km}".encode()
+        )
+        for i in sorted(cell_indices, key=lambda i: self.cells[i]['id']):
+            digest.update(self._cell_hashes[i].encode())
+        for name in sorted({self.cells[i]['antenna_pattern'] or self.default_antenna_pattern
+                            for i in cell_indices if self.cells[i]['sector_azimuth'] is not None}):
+            digest.update(self._pattern(name).gains_db.tobytes())
+        return digest.hexdigest()[:20]
+
+    def _tile_path(self, x: int, y: int, zoom: int, key: str) -> str:
+        return os.path.join(self.cache_dir, str(zoom), str(x), f"{y}_{key}.npz")
+
+    def _compute_tile(self, x: int, y: int, zoom: int, cell_indices: np.ndarray) -> Dict[str, np.ndarray]:
+        size = self.tile_size
+        offsets = (np.arange(size) + 0.5) / size
+        lats = tile_to_lat(y + offsets, zoom)
+        lons = (x + offsets) / 2 ** zoom * 360.0 - 180.0
+        pixel_lat = np.repeat(lats, size)
+        pixel_lon = np.tile(lons, size)
+
+        cells = [self.cells[i] for i in cell_indices]
+        cell_ids = np.array([c['id'] for c in cells], dtype=str)
+        if not cells:
+            empty = np.full((size, size), np.nan, dtype=np.float32)
+            return {'cell_ids': cell_ids, 'best_server': np.full((size, size), -1, dtype=np.int16),
+                    'rsrp': empty, 'sinr': empty.copy()}
+
+        cell_lat = self._cell_lat[cell_indices]
+        cell_lon = self._cell_lon[cell_indices]
+        power = np.array([c['power'] for c in cells])
+        frequency = np.array([c['frequency'] for c in cells])
+        gain = np.array([c['antenna_gain'] for c in cells])
+
+        distance_km = haversine_km(pixel_lat[:, None], pixel_lon[:, None], cell_lat[None, :], cell_lon[None, :])
+        rsrp = power[None, :] - cost_hata_path_loss(distance_km, frequency[None, :]) + gain[None, :]
+
+        sectors = [j for j, c in enumerate(cells) if c['sector_azimuth'] is not None]
+        if sectors:
+            bearings = bearing_deg(cell_lat[None, sectors], cell_lon[None, sectors],
+                                   pixel_lat[:, None], pixel_lon[:, None])
+            for k, j in enumerate(sectors):
+                relative = bearings[:, k] - float(cells[j]['sector_azimuth'])
+                rsrp[:, j] += self._pattern(cells[j]['antenna_pattern']).gain(relative)
+
+        # Соти за межами радіусу дії не враховуються
+        rsrp = np.where(distance_km <= self.max_range_km, rsrp, -200.0)
+
+        result = self.interference.compute(rsrp, np.full(len(rsrp), -1),
+                                           np.full(len(cells), self.cell_load))
+        covered = result['rsrp'] >= self.min_rsrp_dbm
+
+        return {
+            'cell_ids': cell_ids,
+            'best_server': np.where(covered, result['serving_idx'], -1).astype(np.int16).reshape(size, size),
+            'rsrp': np.where(covered, result['rsrp'], np.nan).astype(np.float32).reshape(size, size),
+            'sinr': np.where(covered, result['sinr'], np.nan).astype(np.float32).reshape(size, size)
+        }
+
+    def get_tile(self, x: int, y: int, zoom: int) -> Dict[str, np.ndarray]:
+        """Растри тайла: з пам'яті, з диска або щойно розраховані"""
+        cell_indices = self._cells_for_tile(x, y, zoom)
+        key = self.tile_key(x, y, zoom, cell_indices)
+
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return self._memory[key]
+
+        path = self._tile_path(x, y, zoom, key)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                tile = {name: data[name] for name in data.files}
+            self.stats['disk_hits'] += 1
+        else:
+            tile = self._compute_tile(x, y, zoom, cell_indices)
+            self._write_tile(path, tile)
+            self.stats['computed'] += 1
+
+        self._memory[key] = tile
+        while len(self._memory) > self.memory_tiles:
+            self._memory.popitem(last=False)
+        return tile
+
+    def _write_tile(self, path: str, tile: Dict[str, np.ndarray]):
+        """Запис тайла та видалення застарілих версій тих самих координат"""
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            prefix = os.path.basename(path).split('_')[0] + '_'
+            for name in os.listdir(directory):
+                if name.startswith(prefix) and name != os.path.basename(path):
+                    os.remove(os.path.join(directory, name))
+            np.savez_compressed(path, **tile)
+        except OSError as e:
+            print(f"Помилка запису тайла покриття {path}: {e}")
+
+    def tiles_for_bounds(self, south: float, west: float, north: float,
+                         east: float, zoom: int) -> Tuple[range, range]:
+        x0, y0 = lonlat_to_tile(west, north, zoom)
+        x1, y1 = lonlat_to_tile(east, south, zoom)
+        return range(int(x0), int(x1) + 1), range(int(y0), int(y1) + 1)
+
+    def build_pyramid(self, bounds: Tuple[float, float, float, float],
+                      zooms: Iterable[int] = (11, 12, 13, 14)) -> int:
+        """Попередній розрахунок тайлів для області на кількох рівнях масштабу"""
+        count = 0
+        for zoom in zooms:
+            xs, ys = self.tiles_for_bounds(*bounds, zoom)
+            for x in xs:
+                for y in ys:
+                    self.get_tile(x, y, zoom)
+                    count += 1
+        return count
+
+    def render_tile(self, tile: Dict[str, np.ndarray], layer: str = 'rsrp',
+                    alpha: int = 160) -> np.ndarray:
+        """RGBA-зображення тайла для шару best_server, rsrp або sinr"""
+        if layer not in COVERAGE_LAYERS:
+            raise ValueError(f"Невідомий шар покриття: {layer}")
+
+        best = tile['best_server'].astype(np.int64)
+        covered = best >= 0
+        image = np.zeros(best.shape + (4,), dtype=np.uint8)
+
+        if layer == 'best_server':
+            # Колір соти стабільний між тайлами: залежить від її ID, а не від індексу
+            cell_colors = np.array([zlib.crc32(str(cell_id).encode()) % len(SERVER_PALETTE)
+                                    for cell_id in tile['cell_ids']], dtype=np.int64)
+            if len(cell_colors):
+                image[..., :3] = SERVER_PALETTE[cell_colors.take(np.maximum(best, 0))]
+        else:
+            stops = RSRP_COLOR_STOPS if layer == 'rsrp' else SINR_COLOR_STOPS
+            image[..., :3] = _interpolate_colors(np.nan_to_num(tile[layer], nan=stops[0][0]), stops)
+
+        image[..., 3] = np.where(covered, alpha, 0)
+        return image
+
+    def render_overlay(self, bounds: Tuple[float, float, float, float], zoom: int,
+                       layer: str = 'rsrp', alpha: int = 160) -> Tuple[np.ndarray, List[List[float]]]:
+        """Мозаїка тайлів, що покривають область, та її межі [[south, west], [north, east]]"""
+        xs, ys = self.tiles_for_bounds(*bounds, zoom)
+        rows = [np.concatenate([self.render_tile(self.get_tile(x, y, zoom), layer, alpha) for x in xs], axis=1)
+                for y in ys]
+        image = np.concatenate(rows, axis=0)
+
+        south, west, _, _ = tile_bounds(xs[0], ys[-1], zoom)
+        _, _, north, east = tile_bounds(xs[-1], ys[0], zoom)
+        return image, [[south, west], [north, east]]
+
+    def add_to_map(self, folium_map, bounds: Tuple[float, float, float, float], zoom: int,
+                   layer: str = 'rsrp', opacity: float = 0.7, name: Optional[str] = None):
+        """Додавання шару покриття на карту folium як ImageOverlay"""
+        import folium
+
+        image, image_bounds = self.render_overlay(bounds, zoom, layer)
+        folium.raster_layers.ImageOverlay(
+            image=image,
+            bounds=image_bounds,
+            opacity=opacity,
+            name=name or layer,
+            interactive=False,
+            zindex=1
+        ).add_to(folium_map)
+        return folium_map
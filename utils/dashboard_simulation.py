@@ -0,0 +1,269 @@
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+from core.event_store import HandoverEventStore
+from core.kpi_store import EngineKPIRecorder, KPITimeSeriesStore
+from core.network_engine import LTENetworkEngine
+from core.simulation_runner import SimulationRunner
+from core.ue_attributes import UEAttributeTable
+
+# Базові станції головної сторінки (м. Вінниця)
+DEFAULT_BASE_STATIONS = [
+    {'id': 'BS001', 'name': 'Центральна', 'lat': 49.2328, 'lon': 28.4810, 'power': 45, 'max_users': 20},
+    {'id': 'BS002', 'name': 'Північна', 'lat': 49.2520, 'lon': 28.4590, 'power': 42, 'max_users': 20},
+    {'id': 'BS003', 'name': 'Східна', 'lat': 49.2180, 'lon': 28.5120, 'power': 40, 'max_users': 20},
+    {'id': 'BS004', 'name': 'Західна', 'lat': 49.2290, 'lon': 28.4650, 'power': 43, 'max_users': 20},
+    {'id': 'BS005', 'name': 'Південна', 'lat': 49.2150, 'lon': 28.4420, 'power': 41, 'max_users': 20},
+]
+
+# Мінімальне покращення RSRP для успішного хендовера (як у LTENetworkEngine)
+SUCCESS_IMPROVEMENT_DB = 3.0
+SPAWN_SPEEDS_KMH = (5, 20, 60, 90)
+# Скільки останніх подій хендовера потрапляє в знімок (повний журнал - через event_store)
+RECENT_EVENTS = 50
+
+
+class DashboardSimulation:
+    """Тонкий адаптер дашборду над LTENetworkEngine
+
+    Рух, вимірювання, хендовери та планування виконує двигун; адаптер
+    лише додає нових UE та перетворює стан двигуна у словники, які
+    читають сторінки. Навантаження BS береться з лічильників соти
+    (connected_users, load_percentage), а не перераховується по UE.
+    Виконується у фоновому SimulationRunner; сторінки читають лише
+    знімки snapshot().
+    """
+
+    def __init__(self, max_users: int = 20, user_spawn_rate: float = 0.5,
+                 base_stations: Optional[List[Dict]] = None, seed: Optional[int] = None):
+        self.engine = LTENetworkEngine(seed=seed)
+        self.engine.initialize_network(base_stations or DEFAULT_BASE_STATIONS)
+        self.engine.start_simulation()
+
+        self.event_store = HandoverEventStore()  # події з хвилинними агрегатами для аналітики
+        self._converted_events = 0  # скільки подій двигуна вже перетворено
+        self.ue_attributes = UEAttributeTable()  # атрибути UE для з'єднання з подіями
+        # Історія KPI мережі, сот та відстежуваних UE (час - реальний, як у подій)
+        self.kpi_store = KPITimeSeriesStore()
+        self.kpi_recorder = EngineKPIRecorder(self.engine, self.kpi_store, clock=time.time)
+        # Версії стану для кешування підготовлених таблиць і графіків сторінок:
+        # state_version зростає лише при зміні записів BS/UE знімка
+        self.state_version = 0
+        self.event_generation = 0
+        self._last_records = None
+        self.max_users = max_users
+        self.user_spawn_rate = user_spawn_rate
+        self.user_counter = 0
+
+    def generate_user_config(self) -> Dict:
+        """Конфігурація нового користувача для LTENetworkEngine.add_user"""
+        self.user_counter += 1
+        rng = self.engine.rng
+        return {
+            'id': f"UE{self.user_counter:03d}",
+            # Випадкова позиція в межах Вінниці
+            'lat': 49.2328 + rng.uniform(-0.03, 0.03),
+            'lon': 28.4810 + rng.uniform(-0.05, 0.05),
+            'speed': SPAWN_SPEEDS_KMH[int(rng.random() * len(SPAWN_SPEEDS_KMH)) % len(SPAWN_SPEEDS_KMH)],
+            'direction': rng.uniform(0, 360)
+        }
+
+    def add_user(self) -> bool:
+        """Додавання користувача (в межах max_users)"""
+        if len(self.engine.users) >= self.max_users:
+            return False
+        config = self.generate_user_config()
+        added = self.engine.add_user(config)
+        if added:
+            self.ue_attributes.update_from_engine([self.engine.users[config['id']]])
+            self.engine.update_network_metrics()
+        return added
+
+    def clear_users(self):
+        """Видалення всіх користувачів та подій"""
+        self.engine.reset_simulation()
+        self.engine.start_simulation()
+        self.event_store.clear()
+        self.ue_attributes.clear()
+        self._converted_events = 0
+        self.event_generation += 1
+
+    def _convert_handover_events(self):
+        """Нові події двигуна у форматі дашборду (події лише додаються)"""
+        events = self.engine.handover_events
+        for event in events[self._converted_events:]:
+            self.event_store.append({
+                'timestamp': event['timestamp'],
+                'user_id': event['ue_id'],
+                'old_bs': event['old_bs'],
+                'new_bs': event['new_bs'],
+                'old_rsrp': event['old_rsrp'],
+                'new_rsrp': event['new_rsrp'],
+                'improvement': event['improvement'],
+                'type': event['type'],
+                'success': event['improvement'] >= SUCCESS_IMPROVEMENT_DB
+            })
+        self._converted_events = len(events)
+
+    def step(self):
+        """Один крок: поява нових користувачів, потім крок двигуна"""
+        if len(self.engine.users) < self.max_users and self.engine.rng.random() < self.user_spawn_rate * 0.1:
+            self.engine.add_user(self.generate_user_config())
+
+        self.engine.step_simulation(self.engine.time_step)
+        self.ue_attributes.update_from_engine(self.engine.users.values())
+        self._convert_handover_events()
+
+    @staticmethod
+    def _bs_record(bs) -> Mapping:
+        return MappingProxyType({
+            'id': bs.bs_id,
+            'name': bs.name,
+            'lat': bs.latitude,
+            'lon': bs.longitude,
+            'power': bs.power_dbm,
+            'frequency': bs.frequency_mhz,
+            'users': len(bs.connected_users),
+            'load': bs.load_percentage
+        })
+
+    @staticmethod
+    def _user_record(ue) -> Mapping:
+        return MappingProxyType({
+            'id': ue.ue_id,
+            'lat': ue.latitude,
+            'lon': ue.longitude,
+            'serving_bs': ue.serving_bs,
+            'rsrp': ue.rsrp,
+            'speed': ue.speed_kmh,
+            'direction': ue.direction,
+            'throughput': ue.throughput,
+            'cqi': ue.cqi,
+            'active': ue.active,
+            'handover_count': ue.handover_count,
+            'last_handover': ue.last_handover
+        })
+
+    def snapshot(self) -> Mapping:
+        """Незмінний знімок стану, спільний для всіх переглядачів
+
+        Записи BS та UE копіюються зі стану двигуна; з подій копіюються лише
+        останні RECENT_EVENTS, повний журнал сторінки читають вікнами через
+        event_store за версією 'events'.
+        """
+        metrics = self.engine.network_metrics
+        bs_records = tuple(self._bs_record(bs) for bs in self.engine.base_stations.values())
+        user_records = tuple(self._user_record(ue) for ue in self.engine.users.values())
+        if (bs_records, user_records) != self._last_records:
+            self._last_records = (bs_records, user_records)
+            self.state_version += 1
+        return MappingProxyType({
+            'base_stations': bs_records,
+            'users': user_records,
+            'recent_handover_events': tuple(self.event_store.recent(RECENT_EVENTS)),
+            'network_metrics': MappingProxyType({
+                'total_handovers': metrics['total_handovers'],
+                'successful_handovers': metrics['successful_handovers'],
+                'failed_handovers': metrics['failed_handovers'],
+                'average_rsrp': metrics['average_rsrp'],
+                'network_throughput': metrics['network_throughput'],
+                'active_users': metrics['active_users']
+            }),
+            'version': MappingProxyType({
+                'state': self.state_version,
+                'events': (self.event_generation, len(self.event_store))
+            }),
+            'timestamp': datetime.now()
+        })
+
+
+class SharedDashboard:
+    """Одна симуляція на процес для всіх сесій дашборду
+
+    Усі переглядачі читають той самий знімок SimulationRunner, тому
+    пам'ять і CPU не залежать від кількості відкритих вкладок. Змінювати
+    симуляцію може лише одна сесія-власник керування; якщо власник не
+    з'являвся довше owner_timeout_s, керування можна перехопити.
+    """
+
+    def __init__(self, simulation: Optional[DashboardSimulation] = None,
+                 interval_s: float = 1.0, owner_timeout_s: float = 60.0):
+        self.simulation = simulation or DashboardSimulation()
+        self.runner = SimulationRunner(self.simulation.step, self.simulation.snapshot,
+                                       interval_s=interval_s, name="dashboard-simulation")
+        self.owner_timeout_s = owner_timeout_s
+
+        self._lock = threading.Lock()
+        self._owner: Optional[str] = None
+        self._owner_seen = 0.0
+        self._viewers: Dict[str, float] = {}
+
+    def touch(self, session_id: str):
+        """Відмітка активності сесії (переглядача або власника)"""
+        now = time.monotonic()
+        with self._lock:
+            self._viewers[session_id] = now
+            if session_id == self._owner:
+                self._owner_seen = now
+
+    def _owner_expired(self, now: float) -> bool:
+        return self._owner is None or now - self._owner_seen > self.owner_timeout_s
+
+    def acquire_control(self, session_id: str) -> bool:
+        """Отримання керування: якщо власника немає або він неактивний"""
+        now = time.monotonic()
+        with self._lock:
+            if self._owner == session_id or self._owner_expired(now):
+                self._owner = session_id
+                self._owner_seen = now
+                return True
+            return False
+
+    def release_control(self, session_id: str):
+        with self._lock:
+            if self._owner == session_id:
+                self._owner = None
+
+    def is_owner(self, session_id: str) -> bool:
+        with self._lock:
+            return self._owner == session_id and not self._owner_expired(time.monotonic())
+
+    @property
+    def has_active_owner(self) -> bool:
+        with self._lock:
+            return not self._owner_expired(time.monotonic())
+
+    def _check_owner(self, session_id: str):
+        if not self.is_owner(session_id):
+            raise PermissionError("Керування симуляцією належить іншій сесії")
+        self.touch(session_id)
+
+    def control(self, session_id: str, fn: Callable, *args, **kwargs):
+        """Керуюча дія над симуляцією від імені сесії (лише для власника)"""
+        self._check_owner(session_id)
+        return self.runner.execute(fn, *args, **kwargs)
+
+    def set_running(self, session_id: str, running: bool) -> bool:
+        """Запуск/зупинка фонового потоку від імені власника; True, якщо стан змінено
+
+        Не через control(): stop() чекає на потік кроків, який сам бере runner.lock.
+        """
+        self._check_owner(session_id)
+        if running:
+            self.runner.start()
+            return True
+        return self.runner.stop()
+
+    def viewer_count(self, active_within_s: float = 30.0) -> int:
+        """Кількість сесій, активних за останні active_within_s секунд"""
+        now = time.monotonic()
+        with self._lock:
+            self._viewers = {sid: seen for sid, seen in self._viewers.items()
+                             if now - seen <= max(active_within_s, self.owner_timeout_s)}
+            return sum(1 for seen in self._viewers.values() if now - seen <= active_within_s)
+
+    def snapshot(self) -> Mapping:
+        return self.runner.snapshot()
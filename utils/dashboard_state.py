@@ -0,0 +1,25 @@
+import uuid
+
+import streamlit as st
+
+from utils.dashboard_simulation import SharedDashboard
+from utils.render_cache import RenderCache
+
+
+@st.cache_resource
+def get_shared_dashboard() -> SharedDashboard:
+    """Спільна для всіх сесій симуляція дашборду (одна на процес)"""
+    return SharedDashboard()
+
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    """Спільний кеш підготовлених таблиць і графіків сторінок"""
+    return RenderCache()
+
+
+def get_session_id() -> str:
+    """Стабільний ідентифікатор поточної сесії браузера"""
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
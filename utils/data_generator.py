@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from geopy.distance import geodesic
 import uuid
+from core.road_network import PROFILE_ROAD_MODES
 
 class LTEDataGenerator:
     """Генератор даних для симуляції LTE мережі"""
@@ -21,12 +22,13 @@ class LTEDataGenerator:
             self.city_bounds = city_bounds
         
         # Профілі користувачів
+        # road_mode - режим руху по дорожньому графу (PROFILE_ROAD_MODES з core/road_network.py)
         self.user_profiles = {
-            'pedestrian': {'speed_range': (3, 8), 'device_types': ['smartphone', 'tablet']},
-            'cyclist': {'speed_range': (10, 25), 'device_types': ['smartphone']},
-            'car': {'speed_range': (30, 80), 'device_types': ['smartphone', 'car']},
-            'public_transport': {'speed_range': (20, 60), 'device_types': ['smartphone', 'tablet']},
-            'high_speed': {'speed_range': (80, 150), 'device_types': ['smartphone', 'laptop']}
+            'pedestrian': {'speed_range': (3, 8), 'device_types': ['smartphone', 'tablet'], 'road_mode': PROFILE_ROAD_MODES['pedestrian']},
+            'cyclist': {'speed_range': (10, 25), 'device_types': ['smartphone'], 'road_mode': PROFILE_ROAD_MODES['cyclist']},
+            'car': {'speed_range': (30, 80), 'device_types': ['smartphone', 'car'], 'road_mode': PROFILE_ROAD_MODES['car']},
+            'public_transport': {'speed_range': (20, 60), 'device_types': ['smartphone', 'tablet'], 'road_mode': PROFILE_ROAD_MODES['public_transport']},
+            'high_speed': {'speed_range': (80, 150), 'device_types': ['smartphone', 'laptop'], 'road_mode': PROFILE_ROAD_MODES['high_speed']}
         }
         
         # Оператори та їх характеристики
@@ -128,6 +130,7 @@ class LTEDataGenerator:
                 'direction': random.uniform(0, 360),
                 'device_type': random.choice(profile['device_types']),
                 'profile': profile_name,
+                'road_mode': profile['road_mode'],
                 'active': True,
                 'connected': False,
                 'serving_bs': None,
@@ -0,0 +1,217 @@
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.coverage import lonlat_to_tile
+
+# Шкала RSRP для UE: червоний (< -90), помаранчевий, зелений (> -70)
+RSRP_COLORSCALE = [[0.0, '#d73027'], [0.5, '#fc8d59'], [0.75, '#fee08b'], [1.0, '#1a9850']]
+RSRP_RANGE = (-110.0, -70.0)
+LOAD_COLORS = {'low': 'green', 'medium': 'orange', 'high': 'red'}
+
+
+def _load_level(load: float) -> str:
+    if load < 30:
+        return 'low'
+    if load < 70:
+        return 'medium'
+    return 'high'
+
+
+class LiveMapLayer:
+    """Жива карта мережі на WebGL (plotly Scattermap) для тисяч UE
+
+    Шар сот будується лише при зміні їх конфігурації або рівня
+    навантаження, а всі UE - один трейс з масивами координат і кольорів.
+    Кластеризацію за фактичним масштабом карти виконує браузер (cluster
+    трейсу Scattermap): Streamlit не повертає на сервер масштаб карти.
+    Коли UE більше за max_points, сервер попередньо агрегує їх за сіткою
+    пікселів найдетальнішого масштабу, що вкладається в max_points, тому
+    браузер отримує обмежену кількість точок незалежно від розміру популяції.
+    Растр покриття записується в static_dir і передається лише посиланням.
+    """
+
+    def __init__(self, center: Tuple[float, float], zoom: int = 12, max_points: int = 5000,
+                 cluster_px: int = 12, map_style: str = 'open-street-map', height: int = 500,
+                 cluster_maxzoom: int = 15, static_dir: str = "static/coverage",
+                 static_url: str = "app/static/coverage"):
+        self.center = center
+        self.zoom = zoom  # початковий масштаб карти
+        self.max_points = max_points
+        self.cluster_px = cluster_px  # розмір комірки кластеризації в пікселях екрана
+        self.cluster_maxzoom = cluster_maxzoom  # масштаб, з якого браузер показує окремі UE
+        self.map_style = map_style
+        self.height = height
+        # Каталог статичних файлів Streamlit (server.enableStaticServing) та його URL
+        self.static_dir = static_dir
+        self.static_url = static_url
+
+        self._cell_key: Optional[str] = None
+        self._cell_trace: Optional[go.Scattermap] = None
+        self.overlay_key = None
+        self._overlay_layer: Optional[Dict] = None
+
+        self.user_ids = np.array([], dtype=object)
+        self.latitudes = np.zeros(0)
+        self.longitudes = np.zeros(0)
+        self.rsrp = np.zeros(0)
+
+    def set_cells(self, cells: Iterable[Dict]) -> bool:
+        """Оновлення шару сот; повертає True, якщо шар перебудовано"""
+        cells = list(cells)
+        key = hashlib.sha1(repr([
+            (c['id'], c['lat'], c['lon'], _load_level(c.get('load', 0))) for c in cells
+        ]).encode()).hexdigest()
+        if key == self._cell_key:
+            return False
+
+        self._cell_key = key
+        self._cell_trace = go.Scattermap(
+            lat=[c['lat'] for c in cells],
+            lon=[c['lon'] for c in cells],
+            mode='markers+text',
+            marker=dict(size=16, color=[LOAD_COLORS[_load_level(c.get('load', 0))] for c in cells]),
+            text=[c.get('name', c['id']) for c in cells],
+            textposition='top right',
+            customdata=[[c['id'], c.get('power', 0), c.get('users', 0), c.get('load', 0)] for c in cells],
+            hovertemplate=("<b>%{text}</b><br>ID: %{customdata[0]}<br>Потужність: %{customdata[1]} дБм"
+                           "<br>Користувачі: %{customdata[2]}<br>Навантаження: %{customdata[3]:.1f}%"
+                           "<extra></extra>"),
+            name='Базові станції'
+        )
+        return True
+
+    def _write_overlay(self, image: np.ndarray, key) -> str:
+        """PNG растру у статичному каталозі (один файл на key); повертає його URL"""
+        from PIL import Image
+
+        name = hashlib.sha1(repr(key).encode()).hexdigest()[:16] + ".png"
+        path = os.path.join(self.static_dir, name)
+        if key is None or not os.path.exists(path):
+            os.makedirs(self.static_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            Image.fromarray(np.asarray(image, dtype=np.uint8)).save(tmp_path, format='PNG')
+            os.replace(tmp_path, path)
+        return f"{self.static_url}/{name}"
+
+    def set_overlay(self, image: Optional[np.ndarray], bounds: Optional[List[List[float]]] = None,
+                    key=None, opacity: float = 0.6):
+        """Растровий шар (напр. з CoverageService.render_overlay); PNG записується лише при зміні key
+
+        Фігура містить лише URL растру, тож оновлення карти не пересилають зображення.
+        """
+        if image is None:
+            self.overlay_key = None
+            self._overlay_layer = None
+            return
+        if key is not None and key == self.overlay_key:
+            return
+
+        (south, west), (north, east) = bounds
+        self.overlay_key = key
+        self._overlay_layer = dict(
+            sourcetype='image',
+            source=self._write_overlay(image, key),
+            coordinates=[[west, north], [east, north], [east, south], [west, south]],
+            opacity=opacity,
+            below='traces'
+        )
+
+    def update_users(self, user_ids: Sequence, latitudes: Sequence[float],
+                     longitudes: Sequence[float], rsrp: Sequence[float]):
+        """Нові позиції та RSRP усіх UE (лише масиви - без перебудови карти)"""
+        self.user_ids = np.asarray(user_ids, dtype=object)
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.rsrp = np.asarray(rsrp, dtype=np.float64)
+
+    def _cluster_bins(self, zoom: int) -> np.ndarray:
+        """Номер кластера кожного UE за сіткою пікселів масштабу zoom"""
+        tile_x, tile_y = lonlat_to_tile(self.longitudes, self.latitudes, zoom)
+        bin_x = np.floor(tile_x * 256 / self.cluster_px).astype(np.int64)
+        bin_y = np.floor(tile_y * 256 / self.cluster_px).astype(np.int64)
+        _, inverse = np.unique(bin_x * (1 << 32) + bin_y, return_inverse=True)
+        return inverse.ravel()
+
+    def decimate(self, zoom: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """UE для відображення: усі точки або кластери за сіткою пікселів масштабу zoom
+
+        Без zoom обирається найдетальніший масштаб (не більший за
+        cluster_maxzoom), за якого кластерів не більше за max_points.
+        """
+        n = len(self.latitudes)
+        if n <= self.max_points:
+            return {
+                'lat': self.latitudes, 'lon': self.longitudes, 'rsrp': self.rsrp,
+                'count': np.ones(n, dtype=np.int64), 'ids': self.user_ids
+            }
+
+        if zoom is not None:
+            inverse = self._cluster_bins(zoom)
+        else:
+            for zoom in range(self.cluster_maxzoom, -1, -1):
+                inverse = self._cluster_bins(zoom)
+                if inverse.max() < self.max_points:
+                    break
+
+        count = np.bincount(inverse)
+        return {
+            'lat': np.bincount(inverse, weights=self.latitudes) / count,
+            'lon': np.bincount(inverse, weights=self.longitudes) / count,
+            'rsrp': np.bincount(inverse, weights=self.rsrp) / count,
+            'count': count,
+            'ids': None
+        }
+
+    def _user_trace(self) -> go.Scattermap:
+        points = self.decimate()
+        clustered = points['ids'] is None
+
+        if clustered:
+            # Попередньо агреговані точки; кількість UE - у розмірі маркера
+            size = np.clip(6 + 3 * np.log2(points['count']), 6, 30)
+            customdata = np.column_stack([points['count'], points['rsrp']])
+            hovertemplate = "UE: %{customdata[0]:.0f}<br>Середня RSRP: %{customdata[1]:.1f} дБм<extra></extra>"
+        else:
+            size = 8
+            customdata = np.column_stack([points['ids'], points['rsrp']])
+            hovertemplate = "<b>User %{customdata[0]}</b><br>RSRP: %{customdata[1]:.1f} дБм<extra></extra>"
+
+        return go.Scattermap(
+            lat=points['lat'],
+            lon=points['lon'],
+            mode='markers',
+            marker=dict(size=size, color=points['rsrp'], colorscale=RSRP_COLORSCALE,
+                        cmin=RSRP_RANGE[0], cmax=RSRP_RANGE[1], opacity=0.85),
+            customdata=customdata,
+            hovertemplate=hovertemplate,
+            # Кластеризація в браузері за поточним масштабом карти
+            cluster=dict(enabled=True, maxzoom=self.cluster_maxzoom, color='#4575b4', opacity=0.8,
+                         size=[16, 22, 30], step=[50, 500]),
+            name=f"Користувачі ({len(self.latitudes)})"
+        )
+
+    def figure(self) -> go.Figure:
+        """Фігура карти: кешований шар сот, посилання на растр покриття та один трейс UE"""
+        data = [self._user_trace()]
+        if self._cell_trace is not None:
+            data.append(self._cell_trace)
+
+        fig = go.Figure(data=data)
+        fig.update_layout(
+            map=dict(
+                style=self.map_style,
+                center=dict(lat=self.center[0], lon=self.center[1]),
+                zoom=self.zoom,
+                layers=[self._overlay_layer] if self._overlay_layer else []
+            ),
+            # Стан масштабу/панорами користувача зберігається між оновленнями
+            uirevision='live-map',
+            margin=dict(l=0, r=0, t=0, b=0),
+            height=self.height,
+            showlegend=False
+        )
+        return fig
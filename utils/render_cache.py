@@ -0,0 +1,106 @@
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+import pandas as pd
+import plotly.graph_objects as go
+
+
+# Масиви точок трас Plotly, що визначають розмір фігури
+FIGURE_ARRAY_PROPS = ('x', 'y', 'z', 'lat', 'lon', 'text', 'hovertext', 'customdata')
+FIGURE_BYTES_PER_VALUE = 16
+FIGURE_TRACE_OVERHEAD = 2048
+FIGURE_LAYOUT_OVERHEAD = 8192
+
+
+def estimate_figure_size(fig: go.Figure) -> int:
+    """Оцінка розміру фігури за кількістю точок трас (без серіалізації)"""
+    size = FIGURE_LAYOUT_OVERHEAD
+    for trace in fig.data:
+        size += FIGURE_TRACE_OVERHEAD
+        for prop in FIGURE_ARRAY_PROPS:
+            value = getattr(trace, prop, None)
+            if value is not None and not isinstance(value, str) and hasattr(value, '__len__'):
+                size += len(value) * FIGURE_BYTES_PER_VALUE
+    return size
+
+
+def estimate_size(obj: Any) -> int:
+    """Приблизний розмір об'єкта кешу в байтах"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, go.Figure):
+        return estimate_figure_size(obj)
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_size(item) for item in obj)
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+
+class RenderCache:
+    """LRU-кеш підготовлених DataFrame та фігур Plotly з ключем за версією стану
+
+    Елемент визначається назвою та версією даних, від яких він залежить
+    (напр. кількість подій, номер кроку симуляції). Поки версія не
+    змінилась, повторні перезапуски сторінок повертають готовий об'єкт без
+    перебудови. Найдавніше використані елементи витісняються при
+    перевищенні max_entries або max_bytes. Кешовані об'єкти спільні для
+    всіх сесій, тому їх не можна змінювати після побудови.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # ключ -> (значення, розмір)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, name: str, version: Hashable, build: Callable[[], Any]) -> Any:
+        """Значення для (name, version) з кешу або результат build()"""
+        key = (name, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Побудова поза блокуванням: інші сесії не чекають на повільну фігуру
+        value = build()
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.total_bytes += size
+                self._evict_locked()
+        return value
+
+    def _evict_locked(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+
+    def invalidate(self, name: str = None):
+        """Видалення елементів з назвою name (або всіх)"""
+        with self._lock:
+            for key in [k for k in self._entries if name is None or k[0] == name]:
+                self.total_bytes -= self._entries.pop(key)[1]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests * 100 if requests else 0.0
+            }
@@ -1,14 +1,13 @@
+import os
 import streamlit as st
 import numpy as np
 import pandas as pd
-import folium
-from streamlit_folium import st_folium
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
-import time
-import random
-from geopy.distance import geodesic
+from utils.coverage import CoverageService
+from utils.dashboard_state import get_shared_dashboard, get_session_id
+from utils.live_map import LiveMapLayer
 
 # Налаштування сторінки
 st.set_page_config(
@@ -18,248 +17,61 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Ініціалізація стану сесії
-if 'network_active' not in st.session_state:
-    st.session_state.network_active = False
-if 'users' not in st.session_state:
-    st.session_state.users = []
-if 'base_stations' not in st.session_state:
-    # Створення мережі базових станцій
-    st.session_state.base_stations = [
-        {'id': 'BS001', 'name': 'Центральна', 'lat': 49.2328, 'lon': 28.4810, 'power': 45, 'users': 0, 'load': 0},
-        {'id': 'BS002', 'name': 'Північна', 'lat': 49.2520, 'lon': 28.4590, 'power': 42, 'users': 0, 'load': 0},
-        {'id': 'BS003', 'name': 'Східна', 'lat': 49.2180, 'lon': 28.5120, 'power': 40, 'users': 0, 'load': 0},
-        {'id': 'BS004', 'name': 'Західна', 'lat': 49.2290, 'lon': 28.4650, 'power': 43, 'users': 0, 'load': 0},
-        {'id': 'BS005', 'name': 'Південна', 'lat': 49.2150, 'lon': 28.4420, 'power': 41, 'users': 0, 'load': 0},
-    ]
-if 'handover_events' not in st.session_state:
-    st.session_state.handover_events = []
-if 'network_metrics' not in st.session_state:
-    st.session_state.network_metrics = {
-        'total_handovers': 0,
-        'successful_handovers': 0,
-        'failed_handovers': 0,
-        'average_rsrp': -85,
-        'network_throughput': 0,
-        'active_users': 0
-    }
-
-# Функції симуляції
-def calculate_rsrp(user_lat, user_lon, bs_lat, bs_lon, bs_power):
-    """Розрахунок RSRP на основі відстані та потужності"""
-    distance = geodesic((user_lat, user_lon), (bs_lat, bs_lon)).kilometers
-    if distance == 0:
-        distance = 0.001
-    
-    # Спрощена модель втрат на трасі
-    path_loss = 128.1 + 37.6 * np.log10(distance)
-    rsrp = bs_power - path_loss + np.random.normal(0, 2)  # +шум
-    return max(-120, min(-40, rsrp))
-
-def find_best_bs(user_lat, user_lon, base_stations):
-    """Знаходження найкращої базової станції"""
-    best_bs = None
-    best_rsrp = -999
-    
-    for bs in base_stations:
-        rsrp = calculate_rsrp(user_lat, user_lon, bs['lat'], bs['lon'], bs['power'])
-        if rsrp > best_rsrp:
-            best_rsrp = rsrp
-            best_bs = bs
-    
-    return best_bs, best_rsrp
-
-def create_network_map():
-    """Створення карти мережі"""
-    center = [49.2328, 28.4810]
-    m = folium.Map(location=center, zoom_start=12, tiles='OpenStreetMap')
-    
-    # Додавання базових станцій
-    for bs in st.session_state.base_stations:
-        # Визначення кольору залежно від навантаження
-        if bs['load'] < 30:
-            color = 'green'
-        elif bs['load'] < 70:
-            color = 'orange'
-        else:
-            color = 'red'
-        
-        folium.Marker(
-            [bs['lat'], bs['lon']],
-            popup=f"""
-            <div style="font-family: Arial; font-size: 12px;">
-                <b>{bs['name']}</b><br>
-                ID: {bs['id']}<br>
-                Потужність: {bs['power']} дБм<br>
-                Користувачі: {bs['users']}<br>
-                Навантаження: {bs['load']:.1f}%
-            </div>
-            """,
-            icon=folium.Icon(color=color, icon='tower-broadcast', prefix='fa'),
-            tooltip=f"{bs['name']} ({bs['load']:.1f}% load)"
-        ).add_to(m)
-        
-        # Зона покриття
-        folium.Circle(
-            location=[bs['lat'], bs['lon']],
-            radius=2000,  # 2 км
-            color=color,
-            fillColor=color,
-            fillOpacity=0.1,
-            weight=2
-        ).add_to(m)
-    
-    # Додавання активних користувачів
-    for user in st.session_state.users:
-        if user['active']:
-            # Визначення кольору залежно від якості сигналу
-            if user['rsrp'] > -70:
-                user_color = 'green'
-            elif user['rsrp'] > -90:
-                user_color = 'orange'
-            else:
-                user_color = 'red'
-            
-            folium.Marker(
-                [user['lat'], user['lon']],
-                popup=f"""
-                <div style="font-family: Arial; font-size: 12px;">
-                    <b>User {user['id']}</b><br>
-                    RSRP: {user['rsrp']:.1f} дБм<br>
-                    Serving BS: {user['serving_bs']}<br>
-                    Швидкість: {user['speed']} км/год<br>
-                    Throughput: {user['throughput']:.1f} Мбіт/с
-                </div>
-                """,
-                icon=folium.Icon(color=user_color, icon='mobile', prefix='fa'),
-                tooltip=f"User {user['id']} (RSRP: {user['rsrp']:.1f} дБм)"
-            ).add_to(m)
-    
-    return m
-
-def generate_new_user():
-    """Генерація нового користувача"""
-    user_id = f"UE{len(st.session_state.users)+1:03d}"
-    
-    # Випадкова позиція в межах Вінниці
-    lat = 49.2328 + np.random.uniform(-0.03, 0.03)
-    lon = 28.4810 + np.random.uniform(-0.05, 0.05)
-    
-    # Знаходження найкращої BS
-    best_bs, rsrp = find_best_bs(lat, lon, st.session_state.base_stations)
-    
-    user = {
-        'id': user_id,
-        'lat': lat,
-        'lon': lon,
-        'serving_bs': best_bs['id'] if best_bs else None,
-        'rsrp': rsrp,
-        'speed': np.random.choice([5, 20, 60, 90]),  # км/год
-        'direction': np.random.uniform(0, 360),  # градуси
-        'throughput': np.random.uniform(10, 100),  # Мбіт/с
-        'active': True,
-        'handover_count': 0,
-        'last_handover': None
-    }
-    
-    return user
-
-def simulate_user_movement():
-    """Симуляція руху користувачів"""
-    for user in st.session_state.users:
-        if not user['active']:
-            continue
-        
-        # Розрахунок нової позиції
-        speed_ms = user['speed'] * 1000 / 3600  # м/с
-        distance = speed_ms * 1  # за 1 секунду
-        
-        # Конвертація в градуси (приблизно)
-        lat_change = (distance * np.cos(np.radians(user['direction']))) / 111111
-        lon_change = (distance * np.sin(np.radians(user['direction']))) / (111111 * np.cos(np.radians(user['lat'])))
-        
-        user['lat'] += lat_change
-        user['lon'] += lon_change
-        
-        # Обмеження межами міста
-        user['lat'] = np.clip(user['lat'], 49.20, 49.27)
-        user['lon'] = np.clip(user['lon'], 28.42, 28.55)
-        
-        # Випадкова зміна напряму (5% шанс)
-        if np.random.random() < 0.05:
-            user['direction'] = np.random.uniform(0, 360)
-        
-        # Перевірка необхідності хендовера
-        check_handover(user)
-
-def check_handover(user):
-    """Перевірка необхідності хендовера"""
-    current_bs = next((bs for bs in st.session_state.base_stations if bs['id'] == user['serving_bs']), None)
-    if not current_bs:
-        return
-    
-    # Розрахунок RSRP від поточної BS
-    current_rsrp = calculate_rsrp(user['lat'], user['lon'], current_bs['lat'], current_bs['lon'], current_bs['power'])
-    
-    # Знаходження найкращої BS
-    best_bs, best_rsrp = find_best_bs(user['lat'], user['lon'], st.session_state.base_stations)
-    
-    # Критерій хендовера: покращення > 5 дБ
-    if best_bs and best_bs['id'] != user['serving_bs'] and best_rsrp > current_rsrp + 5:
-        # Виконання хендовера
-        execute_handover(user, best_bs, current_rsrp, best_rsrp)
-    else:
-        user['rsrp'] = current_rsrp
-
-def execute_handover(user, new_bs, old_rsrp, new_rsrp):
-    """Виконання хендовера"""
-    old_bs_id = user['serving_bs']
-    
-    # Оновлення користувача
-    user['serving_bs'] = new_bs['id']
-    user['rsrp'] = new_rsrp
-    user['handover_count'] += 1
-    user['last_handover'] = datetime.now()
-    
-    # Визначення успішності хендовера
-    success = new_rsrp > old_rsrp + 3  # мінімальне покращення 3 дБ
-    
-    # Збереження події
-    handover_event = {
-        'timestamp': datetime.now(),
-        'user_id': user['id'],
-        'old_bs': old_bs_id,
-        'new_bs': new_bs['id'],
-        'old_rsrp': old_rsrp,
-        'new_rsrp': new_rsrp,
-        'improvement': new_rsrp - old_rsrp,
-        'success': success
-    }
-    
-    st.session_state.handover_events.append(handover_event)
-    
-    # Оновлення метрик
-    st.session_state.network_metrics['total_handovers'] += 1
-    if success:
-        st.session_state.network_metrics['successful_handovers'] += 1
+# Одна фонова симуляція на процес; сесії лише читають знімки, керує одна з них
+dashboard = get_shared_dashboard()
+session_id = get_session_id()
+runner = dashboard.runner
+simulation = dashboard.simulation
+
+dashboard.touch(session_id)
+if not dashboard.has_active_owner:
+    dashboard.acquire_control(session_id)
+is_owner = dashboard.is_owner(session_id)
+
+COVERAGE_BOUNDS = (49.20, 28.42, 49.27, 28.55)  # south, west, north, east
+COVERAGE_LAYER_NAMES = {
+    "Немає": None,
+    "Найкращий сервер": "best_server",
+    "RSRP": "rsrp",
+    "SINR": "sinr"
+}
+
+@st.cache_resource
+def get_coverage_service():
+    """Спільний сервіс тайлів покриття (дисковий кеш між сесіями)"""
+    return CoverageService(runner.snapshot()['base_stations'], cache_dir=".coverage_cache")
+
+def create_network_map(state, coverage_layer=None, coverage_zoom=13):
+    """Оновлення живої карти мережі: шар сот, растр покриття та UE одним трейсом"""
+    if 'live_map' not in st.session_state:
+        # Streamlit віддає ./static поруч з головним скриптом за URL app/static/...
+        st.session_state.live_map = LiveMapLayer(
+            center=(49.2328, 28.4810), zoom=12,
+            static_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "coverage"))
+    live_map = st.session_state.live_map
+    
+    live_map.set_cells(state['base_stations'])
+    
+    # Растр покриття з кешованих тайлів (PNG перекодується лише при зміні конфігурації)
+    if coverage_layer:
+        coverage = get_coverage_service()
+        coverage.update_cells(state['base_stations'])
+        overlay_key = (coverage_layer, coverage_zoom, coverage.configuration_key())
+        if overlay_key != live_map.overlay_key:
+            image, bounds = coverage.render_overlay(COVERAGE_BOUNDS, coverage_zoom, coverage_layer)
+            live_map.set_overlay(image, bounds, key=overlay_key)
     else:
-        st.session_state.network_metrics['failed_handovers'] += 1
-
-def update_network_metrics():
-    """Оновлення мережевих метрик"""
-    active_users = [u for u in st.session_state.users if u['active']]
-    st.session_state.network_metrics['active_users'] = len(active_users)
+        live_map.set_overlay(None)
     
-    if active_users:
-        avg_rsrp = np.mean([u['rsrp'] for u in active_users])
-        avg_throughput = np.mean([u['throughput'] for u in active_users])
-        st.session_state.network_metrics['average_rsrp'] = avg_rsrp
-        st.session_state.network_metrics['network_throughput'] = avg_throughput * len(active_users)
+    active_users = [u for u in state['users'] if u['active']]
+    live_map.update_users(
+        [u['id'] for u in active_users],
+        [u['lat'] for u in active_users],
+        [u['lon'] for u in active_users],
+        [u['rsrp'] for u in active_users]
+    )
     
-    # Оновлення навантаження BS
-    for bs in st.session_state.base_stations:
-        bs['users'] = len([u for u in active_users if u['serving_bs'] == bs['id']])
-        bs['load'] = min(100, bs['users'] * 20)  # 20% на користувача
+    return live_map.figure()
 
 # Головний інтерфейс
 st.title("🌐 LTE Network Simulator")
@@ -268,108 +80,132 @@ st.markdown("### Інтерактивний симулятор мережі LTE
 # Sidebar управління
 st.sidebar.header("🎛️ Управління симуляцією")
 
+# Керування доступне лише сесії-власнику, інші сесії - переглядачі
+if is_owner:
+    st.sidebar.caption("🎮 Ви керуєте симуляцією")
+else:
+    st.sidebar.caption("👁️ Режим перегляду: симуляцією керує інша сесія")
+    if st.sidebar.button("🎮 Взяти керування"):
+        if dashboard.acquire_control(session_id):
+            st.rerun()
+        st.sidebar.warning("Власник керування ще активний")
+
 # Кнопки управління
-if st.sidebar.button("🚀 Запустити мережу" if not st.session_state.network_active else "⏹️ Зупинити мережу"):
-    st.session_state.network_active = not st.session_state.network_active
+if st.sidebar.button("🚀 Запустити мережу" if not runner.running else "⏹️ Зупинити мережу",
+                     disabled=not is_owner):
+    if not dashboard.set_running(session_id, not runner.running):
+        st.sidebar.warning("Поточний крок симуляції ще виконується, спробуйте ще раз")
 
-if st.session_state.network_active:
+if runner.running:
     st.sidebar.success("✅ Мережа активна")
 else:
     st.sidebar.info("⏸️ Мережа зупинена")
 
 # Налаштування симуляції
 st.sidebar.subheader("⚙️ Параметри")
-max_users = st.sidebar.slider("Максимум користувачів", 5, 50, 20)
-user_spawn_rate = st.sidebar.slider("Швидкість появи користувачів", 0.1, 2.0, 0.5)
+max_users = st.sidebar.slider("Максимум користувачів", 5, 50, simulation.max_users, disabled=not is_owner)
+user_spawn_rate = st.sidebar.slider("Швидкість появи користувачів", 0.1, 2.0,
+                                    float(simulation.user_spawn_rate), disabled=not is_owner)
+step_interval = st.sidebar.slider("Інтервал кроку симуляції (с)", 0.1, 5.0,
+                                  float(runner.interval_s), 0.1, disabled=not is_owner)
+refresh_interval = st.sidebar.slider("Оновлення сторінки (с)", 1, 10, 2)
+
+if is_owner:
+    simulation.max_users = max_users
+    simulation.user_spawn_rate = user_spawn_rate
+    runner.interval_s = step_interval
+
+st.sidebar.subheader("🗺️ Покриття")
+coverage_layer_name = st.sidebar.selectbox("Шар покриття", list(COVERAGE_LAYER_NAMES.keys()), index=1)
+coverage_zoom = st.sidebar.select_slider("Деталізація растру", options=[11, 12, 13, 14], value=13)
 
 # Кнопка додавання користувача
-if st.sidebar.button("➕ Додати користувача"):
-    if len(st.session_state.users) < max_users:
-        new_user = generate_new_user()
-        st.session_state.users.append(new_user)
+if st.sidebar.button("➕ Додати користувача", disabled=not is_owner):
+    dashboard.control(session_id, simulation.add_user)
 
 # Кнопка очищення
-if st.sidebar.button("🗑️ Очистити всіх користувачів"):
-    st.session_state.users = []
-    st.session_state.handover_events = []
-
-# Основний контент
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.subheader("🗺️ Карта мережі")
-    
-    # Створення та відображення карти
-    network_map = create_network_map()
-    map_data = st_folium(network_map, width=700, height=500, returned_objects=["last_clicked"])
-
-with col2:
-    st.subheader("📊 Метрики мережі")
-    
-    # Оновлення метрик
-    update_network_metrics()
-    
-    # Відображення метрик
-    metrics = st.session_state.network_metrics
-    
-    st.metric("Активні користувачі", metrics['active_users'])
-    st.metric("Всього хендоверів", metrics['total_handovers'])
-    
-    if metrics['total_handovers'] > 0:
-        success_rate = (metrics['successful_handovers'] / metrics['total_handovers']) * 100
-        st.metric("Успішність хендоверів", f"{success_rate:.1f}%")
-    
-    st.metric("Середня RSRP", f"{metrics['average_rsrp']:.1f} дБм")
-    st.metric("Пропускна здатність", f"{metrics['network_throughput']:.1f} Мбіт/с")
-
-# Статус базових станцій
-st.subheader("📡 Статус базових станцій")
-
-bs_data = []
-for bs in st.session_state.base_stations:
-    bs_data.append({
-        'ID': bs['id'],
-        'Назва': bs['name'],
-        'Потужність (дБм)': bs['power'],
-        'Користувачі': bs['users'],
-        'Навантаження (%)': f"{bs['load']:.1f}"
-    })
-
-st.dataframe(pd.DataFrame(bs_data), use_container_width=True)
-
-# Останні хендовери
-if st.session_state.handover_events:
-    st.subheader("🔄 Останні хендовери")
-    
-    recent_handovers = st.session_state.handover_events[-5:]  # Останні 5
-    ho_data = []
-    
-    for ho in reversed(recent_handovers):
-        ho_data.append({
-            'Час': ho['timestamp'].strftime('%H:%M:%S'),
-            'Користувач': ho['user_id'],
-            'Від': ho['old_bs'],
-            'До': ho['new_bs'],
-            'Покращення (дБ)': f"{ho['improvement']:.1f}",
-            'Статус': '✅ Успішно' if ho['success'] else '❌ Невдало'
+if st.sidebar.button("🗑️ Очистити всіх користувачів", disabled=not is_owner):
+    dashboard.control(session_id, simulation.clear_users)
+
+# Основний контент оновлюється фрагментом у власному темпі, не блокуючи симуляцію.
+# Фрагмент перезапускається завжди (симуляцію можуть запустити з іншої сесії),
+# а нові дані визначаються за версією знімка.
+@st.fragment(run_every=refresh_interval)
+def render_network_view():
+    dashboard.touch(session_id)
+    state = runner.snapshot()
+    map_key = (state['version']['state'], coverage_layer_name, coverage_zoom)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.subheader("🗺️ Карта мережі")
+        
+        # Карта перебудовується лише при новому знімку або зміні шару покриття
+        if st.session_state.get('network_map_key') != map_key:
+            st.session_state.network_map = create_network_map(
+                state, COVERAGE_LAYER_NAMES[coverage_layer_name], coverage_zoom)
+            st.session_state.network_map_key = map_key
+        network_map = st.session_state.network_map
+        st.plotly_chart(network_map, use_container_width=True, key="network_map")
+    
+    with col2:
+        st.subheader("📊 Метрики мережі")
+        
+        # Відображення метрик
+        metrics = state['network_metrics']
+        
+        st.metric("Активні користувачі", metrics['active_users'])
+        st.metric("Всього хендоверів", metrics['total_handovers'])
+        
+        if metrics['total_handovers'] > 0:
+            success_rate = (metrics['successful_handovers'] / metrics['total_handovers']) * 100
+            st.metric("Успішність хендоверів", f"{success_rate:.1f}%")
+        
+        st.metric("Середня RSRP", f"{metrics['average_rsrp']:.1f} дБм")
+        st.metric("Пропускна здатність", f"{metrics['network_throughput']:.1f} Мбіт/с")
+    
+    # Статус базових станцій
+    st.subheader("📡 Статус базових станцій")
+    
+    bs_data = []
+    for bs in state['base_stations']:
+        bs_data.append({
+            'ID': bs['id'],
+            'Назва': bs['name'],
+            'Потужність (дБм)': bs['power'],
+            'Користувачі': bs['users'],
+            'Навантаження (%)': f"{bs['load']:.1f}"
         })
     
-    if ho_data:
-        st.dataframe(pd.DataFrame(ho_data), use_container_width=True)
-
-# Автоматичне оновлення
-if st.session_state.network_active:
-    # Додавання нових користувачів
-    if len(st.session_state.users) < max_users and np.random.random() < user_spawn_rate * 0.1:
-        new_user = generate_new_user()
-        st.session_state.users.append(new_user)
+    st.dataframe(pd.DataFrame(bs_data), use_container_width=True)
     
-    # Симуляція руху
-    simulate_user_movement()
+    # Останні хендовери
+    if state['recent_handover_events']:
+        st.subheader("🔄 Останні хендовери")
+        
+        recent_handovers = state['recent_handover_events'][-5:]  # Останні 5
+        ho_data = []
+        
+        for ho in reversed(recent_handovers):
+            ho_data.append({
+                'Час': ho['timestamp'].strftime('%H:%M:%S'),
+                'Користувач': ho['user_id'],
+                'Від': ho['old_bs'],
+                'До': ho['new_bs'],
+                'Покращення (дБ)': f"{ho['improvement']:.1f}",
+                'Статус': '✅ Успішно' if ho['success'] else '❌ Невдало'
+            })
+        
+        if ho_data:
+            st.dataframe(pd.DataFrame(ho_data), use_container_width=True)
     
-    # Автоматичне оновлення через 2 секунди
-    time.sleep(2)
-    st.rerun()
+    status = runner.get_status()
+    st.caption(f"Кроків симуляції: {status['step_count']} · "
+               f"тривалість кроку: {status['last_step_duration'] * 1000:.1f} мс · "
+               f"переглядачів: {dashboard.viewer_count()}")
+
+render_network_view()
 
 # Інформаційна панель
 with st.expander("ℹ️ Про симулятор"):